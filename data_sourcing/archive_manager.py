@@ -0,0 +1,253 @@
+import os
+import logging
+from contextlib import nullcontext
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+from urllib.parse import quote
+import pandas as pd
+from data_sourcing.database_manager import DatabaseManager
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PARQUET_AVAILABLE = True
+except ImportError:
+    pa = None
+    pq = None
+    PARQUET_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+class ArchiveManager:
+    """
+    Cold-storage tier for closed trading days.
+
+    Rows of `historical_candles` and `option_chain_data` are exported to Parquet files
+    partitioned by symbol and date, then pruned from SQLite so the database only holds
+    the current day and a small hot working set:
+
+        {root}/historical_candles/symbol=<key>/date=YYYY-MM-DD/<exchange>_<interval>.parquet
+        {root}/option_chain_data/symbol=<key>/date=YYYY-MM-DD/chain.parquet
+
+    Reads use column pruning and memory-mapped I/O.
+    """
+
+    TABLES = ('historical_candles', 'option_chain_data')
+
+    def __init__(self, root: Optional[str] = None, db_manager: Optional[DatabaseManager] = None):
+        """
+        Args:
+            root (Optional[str]): Archive directory (defaults to config "archive_dir" or ./archive).
+            db_manager (Optional[DatabaseManager]): Source database.
+        """
+        if root is None:
+            from python_engine.engine_config import Config
+            root = Config.get('archive_dir', 'archive')
+        self.root = root
+        self.db = db_manager or DatabaseManager()
+
+    @property
+    def enabled(self) -> bool:
+        return PARQUET_AVAILABLE and os.path.isdir(self.root)
+
+    # --- Paths ---
+
+    def _partition_dir(self, table: str, symbol: str, date_str: str) -> str:
+        return os.path.join(self.root, table, f"symbol={quote(symbol, safe='')}", f"date={date_str}")
+
+    def _candle_path(self, symbol: str, exchange: str, interval: str, date_str: str) -> str:
+        return os.path.join(self._partition_dir('historical_candles', symbol, date_str), f"{exchange}_{interval}.parquet")
+
+    def _chain_path(self, symbol: str, date_str: str) -> str:
+        return os.path.join(self._partition_dir('option_chain_data', symbol, date_str), "chain.parquet")
+
+    def has_candles(self, symbol: str, exchange: str, interval: str, date_str: str) -> bool:
+        return os.path.exists(self._candle_path(symbol, exchange, interval, date_str))
+
+    def has_option_chain(self, symbol: str, date_str: str) -> bool:
+        return os.path.exists(self._chain_path(symbol, date_str))
+
+    # --- Reads ---
+
+    def _read(self, path: str, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        if columns:
+            schema_names = pq.read_schema(path, memory_map=True).names
+            columns = [c for c in columns if c in schema_names]
+        return pq.read_table(path, columns=columns, memory_map=True).to_pandas()
+
+    def read_candles(self, symbol: str, exchange: str, interval: str, from_date, to_date,
+                     columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """
+        Reads archived candles for every archived day in [from_date, to_date].
+
+        Returns:
+            pd.DataFrame: Rows within the range (empty if nothing is archived).
+        """
+        if not self.enabled:
+            return pd.DataFrame()
+        start, end = pd.to_datetime(from_date), pd.to_datetime(to_date)
+        frames = []
+        for day in pd.date_range(start.normalize(), end.normalize(), freq='D'):
+            path = self._candle_path(symbol, exchange, interval, day.strftime('%Y-%m-%d'))
+            if os.path.exists(path):
+                frames.append(self._read(path, columns))
+        if not frames:
+            return pd.DataFrame()
+        df = pd.concat(frames, ignore_index=True)
+        if 'timestamp' in df.columns:
+            ts = pd.to_datetime(df['timestamp'])
+            end_inclusive = end if (end.hour or end.minute or end.second) else end + timedelta(days=1) - timedelta(seconds=1)
+            df = df[(ts >= start) & (ts <= end_inclusive)]
+        return df
+
+    def read_option_chain(self, symbol: str, date_str: str, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        if not self.enabled or not self.has_option_chain(symbol, date_str):
+            return pd.DataFrame()
+        return self._read(self._chain_path(symbol, date_str), columns)
+
+    def merge_candles(self, db_df: Optional[pd.DataFrame], symbol: str, exchange: str, interval: str,
+                      from_date, to_date) -> Optional[pd.DataFrame]:
+        """Unions archived candles with rows read from SQLite (SQLite wins on duplicate timestamps)."""
+        if not self.enabled or from_date is None or to_date is None:
+            return db_df
+        archived = self.read_candles(symbol, exchange, interval, from_date, to_date)
+        if archived.empty:
+            return db_df
+        if db_df is None or db_df.empty:
+            return archived
+        archived['timestamp'] = pd.to_datetime(archived['timestamp'])
+        live = db_df.copy()
+        live['timestamp'] = pd.to_datetime(live['timestamp'])
+        merged = pd.concat([archived, live], ignore_index=True).drop_duplicates('timestamp', keep='last')
+        merged['timestamp'] = merged['timestamp'].dt.strftime('%Y-%m-%d %H:%M:%S')
+        return merged
+
+    def merge_option_chain(self, db_df: Optional[pd.DataFrame], symbol: str, date_str: str,
+                           columns: Optional[List[str]] = None) -> Optional[pd.DataFrame]:
+        """
+        Unions an archived chain day with rows read from SQLite. SQLite wins on duplicate
+        (timestamp, strike), so a day re-enriched or backfilled after export is served with
+        its new values until it is exported again.
+        """
+        if columns:
+            columns = list(dict.fromkeys(['timestamp', 'strike', *columns]))
+        archived = self.read_option_chain(symbol, date_str, columns)
+        if archived.empty:
+            return db_df
+        if db_df is None or db_df.empty:
+            return archived
+        live = db_df[[c for c in db_df.columns if c in archived.columns]] if columns else db_df.copy()
+        archived['timestamp'] = pd.to_datetime(archived['timestamp'])
+        live['timestamp'] = pd.to_datetime(live['timestamp'])
+        merged = pd.concat([archived, live], ignore_index=True).drop_duplicates(['timestamp', 'strike'], keep='last')
+        merged['timestamp'] = merged['timestamp'].dt.strftime('%Y-%m-%d %H:%M:%S')
+        return merged.sort_values(['timestamp', 'strike']).reset_index(drop=True)
+
+    # --- Export / prune ---
+
+    def _write(self, df: pd.DataFrame, path: str) -> None:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = path + ".tmp"
+        pq.write_table(pa.Table.from_pandas(df, preserve_index=False), tmp_path, compression='zstd')
+        os.replace(tmp_path, path)
+
+    def _closed_days(self, table: str, before_date: str) -> List[str]:
+        with self.db as db:
+            rows = db.conn.execute(
+                f"SELECT DISTINCT ts_min / 1440 FROM {table} WHERE ts_min < ?",
+                (self.db.day_bounds(before_date)[0],)
+            ).fetchall()
+        return sorted(datetime.fromtimestamp(r[0] * 86400, timezone.utc).strftime('%Y-%m-%d') for r in rows if r[0] is not None)
+
+    def export_day(self, date_str: str, prune: bool = True) -> int:
+        """
+        Exports one trading day of candles and option chain snapshots to Parquet.
+
+        Args:
+            date_str (str): Day to archive (YYYY-MM-DD).
+            prune (bool): Delete the exported rows from SQLite once written.
+
+        Returns:
+            int: Number of rows archived.
+        """
+        if not PARQUET_AVAILABLE:
+            logger.warning("[ArchiveManager] pyarrow is not installed; archive export skipped.")
+            return 0
+
+        bounds = self.db.day_bounds(date_str)
+        # Writers serialize on the class-level lock: holding it from the read through the
+        # prune means no row can land in the day between being read and being deleted
+        with (self.db._lock if prune else nullcontext()):
+            with self.db as db:
+                candles = pd.read_sql_query(
+                    "SELECT * FROM historical_candles WHERE ts_min >= ? AND ts_min < ? ORDER BY ts_min",
+                    db.conn, params=bounds)
+                chain = pd.read_sql_query(
+                    "SELECT * FROM option_chain_data WHERE ts_min >= ? AND ts_min < ? ORDER BY ts_min, strike",
+                    db.conn, params=bounds)
+
+            archived = self._export_frames(date_str, candles, chain)
+
+            if prune and (not candles.empty or not chain.empty):
+                with self.db as db:
+                    db.conn.execute("DELETE FROM historical_candles WHERE ts_min >= ? AND ts_min < ?", bounds)
+                    db.conn.execute("DELETE FROM option_chain_data WHERE ts_min >= ? AND ts_min < ?", bounds)
+                    db.conn.commit()
+
+        logger.info(f"[ArchiveManager] Archived {date_str}: {len(candles)} candles, {len(chain)} chain rows.")
+        return archived
+
+    def _export_frames(self, date_str: str, candles: pd.DataFrame, chain: pd.DataFrame) -> int:
+        """Writes one day's rows to their Parquet partitions, merging with earlier exports."""
+        archived = 0
+        for (symbol, exchange, interval), group in candles.groupby(['symbol', 'exchange', 'interval']):
+            path = self._candle_path(symbol, exchange, interval, date_str)
+            if os.path.exists(path):
+                # Merge with a previous export of the same partition; SQLite rows win
+                group = pd.concat([self._read(path), group]).drop_duplicates('timestamp', keep='last')
+            self._write(group.sort_values('timestamp'), path)
+            archived += len(group)
+
+        for symbol, group in chain.groupby('symbol'):
+            path = self._chain_path(symbol, date_str)
+            if os.path.exists(path):
+                group = pd.concat([self._read(path), group]).drop_duplicates(['timestamp', 'strike'], keep='last')
+            self._write(group.sort_values(['timestamp', 'strike']), path)
+            archived += len(group)
+        return archived
+
+    def archive_closed_days(self, hot_days: int = 1, prune: bool = True) -> int:
+        """
+        Archives every day older than the hot window (today counts as day 1).
+
+        Args:
+            hot_days (int): Number of most recent calendar days kept in SQLite.
+            prune (bool): Delete archived rows from SQLite.
+
+        Returns:
+            int: Total rows archived.
+        """
+        cutoff = (datetime.now() - timedelta(days=max(hot_days, 1) - 1)).strftime('%Y-%m-%d')
+        days = sorted(set(d for table in self.TABLES for d in self._closed_days(table, cutoff)))
+        total = sum(self.export_day(day, prune=prune) for day in days)
+        if prune and days:
+            with self.db as db:
+                # Return freed pages to the OS; WAL checkpoint first so the file actually shrinks
+                db.conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+                db.conn.execute("VACUUM")
+        return total
+
+if __name__ == "__main__":
+    import argparse
+    logging.basicConfig(level=logging.INFO, format='[%(asctime)s] [%(levelname)s] - %(message)s')
+    parser = argparse.ArgumentParser(description="Archive closed trading days to Parquet")
+    parser.add_argument("--date", type=str, help="Archive a single day (YYYY-MM-DD)")
+    parser.add_argument("--hot-days", type=int, default=1, help="Calendar days to keep in SQLite")
+    parser.add_argument("--keep", action="store_true", help="Export without deleting rows from SQLite")
+    args = parser.parse_args()
+
+    manager = ArchiveManager()
+    if args.date:
+        manager.export_day(args.date, prune=not args.keep)
+    else:
+        manager.archive_closed_days(hot_days=args.hot_days, prune=not args.keep)
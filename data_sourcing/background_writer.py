@@ -0,0 +1,177 @@
+import atexit
+import queue
+import threading
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+class BackgroundWriter:
+    """
+    Write-behind queue for DatabaseManager.
+
+    Callers enqueue candles, option chain snapshots, market stats and trades without
+    blocking; a daemon thread drains the queue and applies every pending write in a
+    single transaction per flush interval (group commit). Each item runs inside its own
+    SAVEPOINT so one bad payload does not discard the rest of the batch.
+
+    Attributes:
+        flush_interval (float): Seconds between group commits.
+        max_batch (int): Maximum number of queued items applied per transaction.
+    """
+
+    _WRITERS = {
+        'candles': '_write_historical_candles',
+        'option_chain': '_write_option_chain',
+        'market_stats': '_write_market_stats',
+        'trade': '_write_trade',
+    }
+
+    def __init__(self, db_manager, flush_interval: float = 1.0, max_batch: int = 5000):
+        """
+        Args:
+            db_manager (DatabaseManager): Manager whose database receives the writes.
+            flush_interval (float): Seconds between group commits.
+            max_batch (int): Maximum items per transaction.
+        """
+        self.db_manager = db_manager
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self._queue = queue.Queue()
+        self._stop_event = threading.Event()
+        self._flush_requested = threading.Event()
+        # Writes enqueued but not yet committed (or dropped); flush waits for zero
+        self._pending = 0
+        self._pending_cond = threading.Condition()
+        self._thread = None
+
+        # Telemetry
+        self.enqueued = 0
+        self.written = 0
+        self.failed = 0
+        self.flushes = 0
+        self.last_flush_latency = 0.0
+        self.max_flush_latency = 0.0
+        self.last_batch_size = 0
+
+    @property
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive() and not self._stop_event.is_set()
+
+    @property
+    def queue_depth(self) -> int:
+        return self._queue.qsize()
+
+    def is_writer_thread(self) -> bool:
+        return threading.current_thread() is self._thread
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="db-write-behind", daemon=True)
+        self._thread.start()
+        atexit.register(self.stop)
+
+    def enqueue(self, kind: str, *args) -> None:
+        """Queues a write; returns immediately. `kind` is one of candles/option_chain/market_stats/trade."""
+        if kind not in self._WRITERS:
+            raise ValueError(f"Unknown write kind: {kind}")
+        with self._pending_cond:
+            self._pending += 1
+            self.enqueued += 1
+        self._queue.put_nowait((kind, args))
+
+    def flush(self, timeout: float = None) -> bool:
+        """Requests an immediate flush and waits until every write enqueued so far is committed."""
+        if not self.is_running:
+            self._drain()
+            return True
+        self._flush_requested.set()
+        with self._pending_cond:
+            return self._pending_cond.wait_for(lambda: self._pending == 0, timeout)
+
+    def stop(self, timeout: float = 10.0) -> None:
+        """Stops the writer, guaranteeing that everything queued so far is committed."""
+        if self._thread is None:
+            return
+        self._stop_event.set()
+        self._flush_requested.set()
+        if self._thread.is_alive() and not self.is_writer_thread():
+            self._thread.join(timeout)
+        # Anything enqueued after the thread exited is written synchronously
+        self._drain()
+        try:
+            atexit.unregister(self.stop)
+        except Exception:
+            pass
+
+    def get_stats(self) -> dict:
+        return {
+            'queue_depth': self.queue_depth,
+            'enqueued': self.enqueued,
+            'written': self.written,
+            'failed': self.failed,
+            'flushes': self.flushes,
+            'last_batch_size': self.last_batch_size,
+            'last_flush_latency_ms': round(self.last_flush_latency * 1000, 3),
+            'max_flush_latency_ms': round(self.max_flush_latency * 1000, 3),
+        }
+
+    def _run(self) -> None:
+        while not self._stop_event.is_set():
+            self._flush_requested.wait(self.flush_interval)
+            self._flush_requested.clear()
+            self._drain()
+        self._drain()
+
+    def _drain(self) -> None:
+        while True:
+            batch = []
+            while len(batch) < self.max_batch:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            if not batch:
+                return
+            try:
+                self._write_batch(batch)
+            finally:
+                with self._pending_cond:
+                    self._pending -= len(batch)
+                    if self._pending == 0:
+                        self._pending_cond.notify_all()
+
+    def _write_batch(self, batch) -> None:
+        start = time.perf_counter()
+        db_manager = self.db_manager
+        written = failed = 0
+        with db_manager._lock:
+            with db_manager as db:
+                try:
+                    db.conn.execute("BEGIN")
+                    for i, (kind, args) in enumerate(batch):
+                        db.conn.execute(f"SAVEPOINT wb_{i}")
+                        try:
+                            getattr(db_manager, self._WRITERS[kind])(db, *args)
+                            db.conn.execute(f"RELEASE wb_{i}")
+                            written += 1
+                        except Exception as e:
+                            db.conn.execute(f"ROLLBACK TO wb_{i}")
+                            db.conn.execute(f"RELEASE wb_{i}")
+                            failed += 1
+                            logger.error(f"[BackgroundWriter] Dropped {kind} write: {e}")
+                    db.conn.commit()
+                except Exception as e:
+                    logger.error(f"[BackgroundWriter] Group commit of {len(batch)} writes failed: {e}")
+                    db.conn.rollback()
+                    written, failed = 0, len(batch)
+
+        latency = time.perf_counter() - start
+        self.written += written
+        self.failed += failed
+        self.flushes += 1
+        self.last_batch_size = len(batch)
+        self.last_flush_latency = latency
+        self.max_flush_latency = max(self.max_flush_latency, latency)
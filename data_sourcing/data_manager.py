@@ -7,12 +7,17 @@ import pandas as pd
 from datetime import datetime, timedelta
 from python_engine.utils.instrument_loader import InstrumentLoader
 from data_sourcing.database_manager import DatabaseManager
+from data_sourcing.archive_manager import ArchiveManager
+from data_sourcing.minute_grid_cache import MinuteGridCache
+from data_sourcing.sentiment_service import SentimentService
 from python_engine.models.data_models import VolumeBar, Sentiment
 
 class DataManager:
     def __init__(self, access_token=None):
         self.db_manager = DatabaseManager()
         self.db_manager.initialize_database()
+        self.archive = ArchiveManager(db_manager=self.db_manager)
+        self.candle_grid = MinuteGridCache(lambda key, day: self.get_historical_candles(key, from_date=day, to_date=day, mode='backtest'))
         self.instrument_loader = InstrumentLoader()
         self.fno_instruments = {}
         from python_engine.engine_config import Config
@@ -21,6 +26,7 @@ class DataManager:
         except Exception as e:
             print(f"[DataManager] Warning: Could not load config.json: {e}")
 
+        self.sentiment_service = SentimentService(self, ttl=Config.get('sentiment_cache_ttl', 60.0))
         self.tv_client = TVDatafeedClient() if Config.get('use_tvdatafeed', False) else None
 
         self.upstox_client = UpstoxClient(access_token=access_token)
@@ -97,6 +103,8 @@ class DataManager:
         if from_date is None: from_date = to_date - timedelta(days=5)
 
         local_data = self.db_manager.get_historical_candles(canonical_symbol, exchange, interval, from_date, to_date)
+        storage_key = SymbolMaster.get_upstox_key(canonical_symbol) or canonical_symbol
+        local_data = self.archive.merge_candles(local_data, storage_key, exchange, interval, from_date, to_date)
         if local_data is not None and not local_data.empty:
             local_data['timestamp_dt'] = pd.to_datetime(local_data['timestamp'])
             sorted_df = local_data.sort_values('timestamp_dt')
@@ -153,11 +161,18 @@ class DataManager:
 
         return None
 
+    def read_option_chain(self, symbol, date_str, columns=None):
+        """Stored chain snapshots of one day: Parquet archive for closed days, overridden by any SQLite rows."""
+        local_data = self.db_manager.get_option_chain(symbol, date_str)
+        if self.archive.enabled and self.archive.has_option_chain(symbol, date_str):
+            return self.archive.merge_option_chain(local_data, symbol, date_str, columns)
+        return local_data
+
     def get_option_chain(self, symbol, date=None, mode='backtest'):
         target_date = datetime.strptime(date, '%Y-%m-%d') if date else datetime.now()
         date_str = target_date.strftime('%Y-%m-%d')
 
-        local_data = self.db_manager.get_option_chain(symbol, date_str)
+        local_data = self.read_option_chain(symbol, date_str)
         if local_data is not None and not local_data.empty:
             return local_data.to_dict('records')
 
@@ -254,6 +269,9 @@ class DataManager:
 
     def get_historical_candle_for_timestamp(self, symbol, timestamp):
         dt = datetime.fromtimestamp(timestamp)
+        # Closed sessions are served from the per-day minute grid (one query per instrument/day)
+        if dt.date() < datetime.now().date() and self.candle_grid.in_session(dt):
+            return self.candle_grid.get_candle(symbol, dt)
         df = self.get_historical_candles(symbol, n_bars=10, from_date=dt-timedelta(seconds=30), to_date=dt+timedelta(seconds=30))
         if df is not None and not df.empty:
             df['diff'] = (pd.to_datetime(df['timestamp']) - dt).abs()
@@ -267,9 +285,14 @@ class DataManager:
         symbol_prefix = "BANKNIFTY" if "BANK" in underlying_symbol.upper() else "NIFTY"
         datetime_str = datetime.fromtimestamp(timestamp).strftime('%Y-%m-%d %H:%M:%S')
         try:
-            with self.db_manager as db:
-                query = "SELECT * FROM option_chain_data WHERE symbol = ? AND timestamp <= ? ORDER BY timestamp DESC LIMIT 500"
-                df = pd.read_sql_query(query, db.conn, params=(canonical_symbol, datetime_str))
+            if self.archive.enabled and self.archive.has_option_chain(canonical_symbol, datetime_str[:10]):
+                # Archived day: Parquet partition overlaid with any newer SQLite rows
+                df = self.read_option_chain(canonical_symbol, datetime_str[:10])
+                df = df[df['timestamp'] <= datetime_str].sort_values('timestamp', ascending=False).head(500)
+            else:
+                with self.db_manager as db:
+                    query = "SELECT * FROM option_chain_data WHERE symbol = ? AND ts_min <= ? ORDER BY ts_min DESC LIMIT 500"
+                    df = pd.read_sql_query(query, db.conn, params=(canonical_symbol, DatabaseManager.to_epoch_minute(datetime_str)))
             if df.empty: return None, None
             expiry_str = df['expiry'].iloc[0]
             atm_strike_val = self.calculate_atm_strike(symbol_prefix, spot_price)
@@ -301,48 +324,43 @@ class DataManager:
             if ce > 0: return round(pe / ce, 2)
         return 1.0
 
-    def get_current_sentiment(self, symbol, timestamp=None, mode='backtest'):
-        pcr = self.get_pcr(symbol, timestamp=timestamp, mode=mode)
-        oi_above, oi_below = 0.0, 0.0
-        chain = None
-        try:
-            full_symbol = "NSE_INDEX|Nifty 50" if "NIFTY" in symbol else "NSE_INDEX|Nifty Bank"
-            chain = self.get_option_chain(full_symbol, mode=mode)
-            if chain:
-                df = pd.DataFrame(chain)
-                spot = self.get_last_traded_price(full_symbol)
-                if not df.empty and spot:
-                    calls, puts = df[df['strike'] > spot], df[df['strike'] < spot]
-                    if not calls.empty: oi_above = calls.loc[calls['call_oi'].idxmax()]['strike']
-                    if not puts.empty: oi_below = puts.loc[puts['put_oi'].idxmax()]['strike']
-        except Exception as e: pass
-        smart_trend = "Neutral"
-        try:
-            date_str = pd.to_datetime(timestamp, unit='s').strftime('%Y-%m-%d')
-            stats = self.db_manager.get_market_stats(symbol, date_str, pd.to_datetime(timestamp, unit='s').strftime('%Y-%m-%d %H:%M:%S'))
-            if not stats.empty: smart_trend = stats.iloc[-1].get('smart_trend', 'Neutral')
-        except Exception as e: pass
-        vol_pcr = 1.0
-        net_vol_rsi = 50.0
-        try:
-            if chain:
-                df = pd.DataFrame(chain)
-                total_call_vol = df['call_volume'].sum() if 'call_volume' in df.columns else 0
-                total_put_vol = df['put_volume'].sum() if 'put_volume' in df.columns else 0
-                vol_pcr = round(total_put_vol / total_call_vol, 4) if total_call_vol > 0 else 1.0
-                if timestamp:
-                    date_str = pd.to_datetime(timestamp, unit='s').strftime('%Y-%m-%d')
-                    stats = self.db_manager.get_market_stats(symbol, date_str, date_str)
-                    if not stats.empty: net_vol_rsi = stats.iloc[-1].get('net_vol_rsi', 50.0)
-        except Exception as e: pass
-        return Sentiment(pcr=pcr, advances=0, declines=0, pcr_velocity=0.0, oi_wall_above=oi_above, oi_wall_below=oi_below, smart_trend=smart_trend, volume_pcr=vol_pcr, net_vol_rsi=net_vol_rsi)
-    def get_option_delta(self, instrument_key):
-        """Returns the delta for the given option instrument key from the DB."""
+    def get_current_sentiment(self, symbol, timestamp=None, mode='backtest', spot=None, chain=None):
+        """
+        Sentiment snapshot for the minute containing `timestamp`, built once per
+        (symbol, minute) and served from the SentimentService cache afterwards.
+        Pass `spot` / `chain` when already at hand to skip the LTP and chain fetches.
+        """
+        return self.sentiment_service.get(symbol, timestamp=timestamp, mode=mode, spot=spot, chain=chain)
+
+    def get_option_delta(self, instrument_key, underlying_symbol=None, timestamp=None):
+        """
+        Returns the delta of an option from the stored chain snapshots, as of `timestamp`
+        when given (latest otherwise). Archived days are read from the Parquet partition
+        overlaid with any newer SQLite rows, which needs `underlying_symbol` and `timestamp`
+        to locate the partition.
+        """
+        columns = ['timestamp', 'strike', 'call_instrument_key', 'put_instrument_key', 'call_delta', 'put_delta']
+        datetime_str = datetime.fromtimestamp(timestamp).strftime('%Y-%m-%d %H:%M:%S') if timestamp else None
+        canonical_symbol = SymbolMaster.get_canonical_ticker(underlying_symbol) if underlying_symbol else None
         try:
-            with self.db_manager as db:
-                query = "SELECT call_delta, put_delta FROM option_chain_data WHERE (call_instrument_key = ? OR put_instrument_key = ?) ORDER BY timestamp DESC LIMIT 1"
-                row = db.conn.execute(query, (instrument_key, instrument_key)).fetchone()
-                if row:
-                    return row[0] if row[0] != 0 else row[1]
+            if datetime_str and canonical_symbol and self.archive.enabled and self.archive.has_option_chain(canonical_symbol, datetime_str[:10]):
+                df = self.read_option_chain(canonical_symbol, datetime_str[:10], columns=columns)
+                df = df[((df['call_instrument_key'] == instrument_key) | (df['put_instrument_key'] == instrument_key))
+                        & (df['timestamp'] <= datetime_str)]
+                df = df.sort_values('timestamp', ascending=False).head(1)
+            else:
+                query = f"SELECT {', '.join(columns)} FROM option_chain_data WHERE (call_instrument_key = ? OR put_instrument_key = ?)"
+                params = [instrument_key, instrument_key]
+                if datetime_str:
+                    query += " AND ts_min <= ?"
+                    params.append(DatabaseManager.to_epoch_minute(datetime_str))
+                with self.db_manager as db:
+                    df = pd.read_sql_query(query + " ORDER BY ts_min DESC LIMIT 1", db.conn, params=params)
+            if not df.empty:
+                row = df.iloc[0]
+                delta = row['call_delta'] if row['call_instrument_key'] == instrument_key else row['put_delta']
+                if pd.notna(delta) and delta != 0:
+                    # Puts carry a negative delta; callers scale price moves by its magnitude
+                    return abs(float(delta))
         except Exception as e: pass
         return 0.5 # Default
@@ -1,65 +1,184 @@
 import sqlite3
+import time
+import logging
 import pandas as pd
 from datetime import datetime
 import threading
 
+logger = logging.getLogger(__name__)
+
 class DatabaseManager:
     _lock = threading.Lock() # Class-level lock to serialize writes across all instances
 
+    # Connection pool: one long-lived connection per (thread, database file), shared by
+    # every DatabaseManager instance so that a context entry no longer pays for a connect.
+    _pool = threading.local()
+    _pool_lock = threading.Lock()
+    _all_connections = []
+    _generation = 0  # Bumped by close_all() so other threads reconnect on their next entry
+
+    # Active write-behind writers keyed by database file (see enable_write_behind)
+    _writers = {}
+
+    # Cumulative bulk-write throughput per table: {table: {'rows', 'batches', 'seconds'}}
+    _write_stats = {}
+
+    # Cumulative read counts and time per query kind: {name: {'reads', 'rows', 'seconds', 'max_seconds'}}
+    _read_stats = {}
+
+    # SQLite tuning applied once per pooled connection. Override any key through the
+    # "sqlite_pragmas" block in config.json (e.g. {"synchronous": "FULL"}).
+    DEFAULT_PRAGMAS = {
+        'journal_mode': 'WAL',        # Readers (UI, engine) never block on the writer
+        'synchronous': 'NORMAL',      # Durable across app crashes; safe with WAL
+        'cache_size': -65536,         # Negative value is in KiB (64 MB page cache)
+        'mmap_size': 268435456,       # 256 MB memory-mapped reads
+        'temp_store': 'MEMORY',
+        'busy_timeout': 5000          # ms to wait on a competing writer before "database is locked"
+    }
+
     def __init__(self, db_name='sos_master_data.db'):
         self.db_name = db_name
-        self._local = threading.local()
 
     @property
     def conn(self):
-        return getattr(self._local, 'conn', None)
+        entry = self._pool_entry()
+        return entry['conn'] if entry and entry['depth'] > 0 else None
 
-    @conn.setter
-    def conn(self, value):
-        self._local.conn = value
+    def _pool_entry(self):
+        registry = getattr(self._pool, 'connections', None)
+        return registry.get(self.db_name) if registry else None
+
+    @classmethod
+    def _get_pragmas(cls):
+        pragmas = dict(cls.DEFAULT_PRAGMAS)
+        try:
+            from python_engine.engine_config import Config
+            pragmas.update(Config.get('sqlite_pragmas', {}) or {})
+        except ImportError:
+            pass
+        return pragmas
+
+    def _connect(self):
+        pragmas = self._get_pragmas()
+        timeout = pragmas.get('busy_timeout', 5000) / 1000.0
+        conn = sqlite3.connect(self.db_name, check_same_thread=False, timeout=timeout)
+        for name, value in pragmas.items():
+            try:
+                conn.execute(f"PRAGMA {name} = {value}")
+            except sqlite3.Error as e:
+                print(f"[DatabaseManager] Could not apply PRAGMA {name}={value}: {e}")
+        with self._pool_lock:
+            self._all_connections.append(conn)
+        return conn
 
     def _normalize_df_timestamps(self, df, column='timestamp'):
-        """Normalizes timestamps in a DataFrame to the nearest minute (seconds=00)."""
+        """
+        Normalizes timestamps in a DataFrame to the nearest minute (seconds=00) and
+        derives the integer `ts_min` (epoch minutes) column from the same parse.
+        """
         if df is None or df.empty or column not in df.columns:
             return df
-        df[column] = pd.to_datetime(df[column]).dt.floor('min').dt.strftime('%Y-%m-%d %H:%M:%S')
+        dt = self._to_wall_clock(df[column]).dt.floor('min')
+        df[column] = dt.dt.strftime('%Y-%m-%d %H:%M:%S')
+        df['ts_min'] = self._epoch_minutes(dt)
         return df
 
-    def _normalize_timestamp(self, ts, floor=True):
-        """Normalizes a single timestamp string or datetime object."""
-        if not ts: return ts
-        dt = pd.to_datetime(ts)
-        # If it's a date-only (00:00:00), we should treat it as start/end of day
-        if dt.hour == 0 and dt.minute == 0 and dt.second == 0:
-            if floor:
-                return dt.strftime('%Y-%m-%d 00:00:00')
-            else:
-                return dt.strftime('%Y-%m-%d 23:59:59')
-
-        if floor:
-            return dt.floor('min').strftime('%Y-%m-%d %H:%M:%S')
+    @staticmethod
+    def _to_wall_clock(series):
+        """Parses to datetime64, dropping any timezone while keeping the local wall-clock time."""
+        dt = pd.to_datetime(series)
+        if getattr(dt.dt, 'tz', None) is not None:
+            dt = dt.dt.tz_localize(None)
+        return dt
+
+    @staticmethod
+    def _epoch_minutes(dt_series):
+        """
+        Minutes since 1970-01-01 00:00 of the naive wall-clock time, i.e. exactly what
+        SQLite computes with strftime('%s', timestamp) / 60.
+        """
+        return dt_series.values.astype('datetime64[m]').astype('int64')
+
+    @classmethod
+    def to_epoch_minute(cls, ts):
+        """Epoch minute (floored) for a single timestamp string, datetime or unix-seconds value."""
+        if isinstance(ts, (int, float)):
+            return int(ts // 60)
+        dt = pd.Timestamp(ts)
+        if dt.tzinfo is not None:
+            dt = dt.tz_localize(None)
+        return int(dt.value // 60_000_000_000)
+
+    @classmethod
+    def day_bounds(cls, date_str):
+        """Half-open [start, end) epoch-minute range covering one calendar day."""
+        start = cls.to_epoch_minute(pd.Timestamp(date_str).normalize())
+        return start, start + 1440
+
+    def _minute_range(self, from_date, to_date):
+        """
+        Half-open epoch-minute range for a query window. A date-only `to_date` covers the
+        whole day; otherwise the minute containing `to_date` is included. A missing bound
+        leaves that side of the range open.
+        """
+        start = self.to_epoch_minute(pd.Timestamp(from_date).floor('min')) if from_date else 0
+        if not to_date:
+            return start, 2 ** 62
+        end_dt = pd.Timestamp(to_date)
+        if end_dt.hour == 0 and end_dt.minute == 0 and end_dt.second == 0:
+            end = self.to_epoch_minute(end_dt) + 1440
         else:
-            # For end of range, we might want to include the whole minute
-            return dt.floor('min').replace(second=59).strftime('%Y-%m-%d %H:%M:%S')
+            end = self.to_epoch_minute(end_dt.floor('min')) + 1
+        return start, end
 
     def __enter__(self):
-        # Re-entrant context manager using thread-local depth tracking
-        if not hasattr(self._local, 'depth'):
-            self._local.depth = 0
+        # Re-entrant context manager: depth is tracked per pooled connection so that nested
+        # contexts across different DatabaseManager instances share one transaction scope.
+        if not hasattr(self._pool, 'connections'):
+            self._pool.connections = {}
 
-        if self._local.depth == 0:
-            # Using check_same_thread=False with thread-local storage provides maximum compatibility
-            self.conn = sqlite3.connect(self.db_name, check_same_thread=False)
+        entry = self._pool.connections.get(self.db_name)
+        if entry is None or (entry['depth'] == 0 and entry['generation'] != DatabaseManager._generation):
+            entry = {'conn': self._connect(), 'depth': 0, 'generation': DatabaseManager._generation}
+            self._pool.connections[self.db_name] = entry
 
-        self._local.depth += 1
+        entry['depth'] += 1
         return self
 
     def __exit__(self, exc_type, exc_val, exc_tb):
-        self._local.depth -= 1
-        if self._local.depth == 0:
-            if self.conn:
-                self.conn.close()
-                self.conn = None
+        entry = self._pool_entry()
+        if entry is None:
+            return
+        entry['depth'] -= 1
+        if entry['depth'] == 0 and entry['conn'].in_transaction:
+            # Connections outlive the context now; discard uncommitted work exactly as the
+            # old close-on-exit behaviour did, so no write lock is held between calls.
+            entry['conn'].rollback()
+
+    def close(self):
+        """Closes the calling thread's pooled connection to this database."""
+        registry = getattr(self._pool, 'connections', None)
+        entry = registry.pop(self.db_name, None) if registry else None
+        if entry:
+            with self._pool_lock:
+                if entry['conn'] in self._all_connections:
+                    self._all_connections.remove(entry['conn'])
+            entry['conn'].close()
+
+    @classmethod
+    def close_all(cls):
+        """Closes every pooled connection across all threads (call on process shutdown)."""
+        with cls._pool_lock:
+            connections, DatabaseManager._all_connections = DatabaseManager._all_connections, []
+            DatabaseManager._generation += 1
+        for conn in connections:
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+        if hasattr(cls._pool, 'connections'):
+            cls._pool.connections = {}
 
     def _execute_query(self, query, params=(), commit=False):
         with self as db:
@@ -69,6 +188,117 @@ class DatabaseManager:
                 db.conn.commit()
             return cursor
 
+    @staticmethod
+    def _iter_rows(df, cols):
+        """Yields DB-ready row tuples column-wise (NaN -> NULL, numpy scalars -> Python types)."""
+        arrays = []
+        for col in cols:
+            series = df[col]
+            if pd.api.types.is_datetime64_any_dtype(series):
+                series = series.dt.strftime('%Y-%m-%d %H:%M:%S')
+            arrays.append(series.to_numpy(dtype=object, na_value=None))
+        return zip(*arrays)
+
+    def _bulk_upsert(self, db, table, df, cols, conflict_cols, positive_only_cols=()):
+        """
+        Streams a DataFrame into `table` with a single executemany INSERT ... ON CONFLICT DO UPDATE.
+
+        Columns in `positive_only_cols` keep their stored value unless the incoming value is > 0
+        (used for candle volume/OI, which some sources report as zero).
+        Returns the number of rows written; throughput is accumulated in `_write_stats`.
+        """
+        if df is None or df.empty or not cols:
+            return 0
+
+        update_cols = [c for c in cols if c not in conflict_cols]
+        assignments = [
+            f"{c} = CASE WHEN excluded.{c} > 0 THEN excluded.{c} ELSE {table}.{c} END"
+            if c in positive_only_cols else f"{c} = excluded.{c}"
+            for c in update_cols
+        ]
+        conflict_action = f"DO UPDATE SET {', '.join(assignments)}" if assignments else "DO NOTHING"
+        query = f"""
+            INSERT INTO {table} ({', '.join(cols)})
+            VALUES ({', '.join('?' * len(cols))})
+            ON CONFLICT({', '.join(conflict_cols)}) {conflict_action}
+        """
+
+        start = time.perf_counter()
+        db.conn.executemany(query, self._iter_rows(df, cols))
+        elapsed = time.perf_counter() - start
+
+        rows = len(df)
+        stats = self._write_stats.setdefault(table, {'rows': 0, 'batches': 0, 'seconds': 0.0})
+        stats['rows'] += rows
+        stats['batches'] += 1
+        stats['seconds'] += elapsed
+        rate = rows / elapsed if elapsed > 0 else float('inf')
+        log = logger.info if rows >= 1000 else logger.debug
+        log(f"[DatabaseManager] Upserted {rows} rows into {table} in {elapsed * 1000:.1f} ms ({rate:,.0f} rows/s)")
+        return rows
+
+    # --- Write-behind (optional background writer) ---
+
+    def enable_write_behind(self, flush_interval=1.0, max_batch=5000):
+        """
+        Routes store_* calls for this database file through a background writer that
+        group-commits queued writes once per `flush_interval` seconds. Returns the writer.
+        """
+        from data_sourcing.background_writer import BackgroundWriter
+        with self._pool_lock:
+            writer = self._writers.get(self.db_name)
+            if writer is None or not writer.is_running:
+                writer = BackgroundWriter(DatabaseManager(self.db_name), flush_interval=flush_interval, max_batch=max_batch)
+                writer.start()
+                self._writers[self.db_name] = writer
+        return writer
+
+    def disable_write_behind(self):
+        """Flushes pending writes and returns to synchronous store_* calls."""
+        with self._pool_lock:
+            writer = self._writers.pop(self.db_name, None)
+        if writer:
+            writer.stop()
+
+    def get_write_behind(self):
+        return self._writers.get(self.db_name)
+
+    def _enqueue_write(self, kind, *args):
+        writer = self._writers.get(self.db_name)
+        if writer is None or not writer.is_running or writer.is_writer_thread():
+            return False
+        writer.enqueue(kind, *args)
+        return True
+
+    def _read_df(self, name, query, params=()):
+        """Runs a SELECT into a DataFrame, accumulating count, rows and time in `_read_stats`."""
+        start = time.perf_counter()
+        with self as db:
+            df = pd.read_sql_query(query, db.conn, params=params)
+        elapsed = time.perf_counter() - start
+        stats = self._read_stats.setdefault(name, {'reads': 0, 'rows': 0, 'seconds': 0.0, 'max_seconds': 0.0})
+        stats['reads'] += 1
+        stats['rows'] += len(df)
+        stats['seconds'] += elapsed
+        stats['max_seconds'] = max(stats['max_seconds'], elapsed)
+        return df
+
+    @classmethod
+    def get_read_stats(cls):
+        """Returns cumulative read counts, rows and mean/max latency per query kind."""
+        return {
+            name: dict(stats, mean_ms=(stats['seconds'] * 1000 / stats['reads'] if stats['reads'] else 0.0))
+            for name, stats in list(cls._read_stats.items())
+        }
+
+    @classmethod
+    def get_write_stats(cls):
+        """Returns cumulative bulk-write counts and rows/sec per table."""
+        return {
+            table: dict(stats, rows_per_sec=(stats['rows'] / stats['seconds'] if stats['seconds'] > 0 else 0.0))
+            for table, stats in list(cls._write_stats.items())
+        }
+
     def initialize_database(self):
         with self._lock:
             # Create historical_candles table
@@ -84,6 +314,7 @@ class DatabaseManager:
                     close REAL,
                     volume INTEGER,
                     oi INTEGER,
+                    ts_min INTEGER,
                     PRIMARY KEY (symbol, exchange, interval, timestamp)
                 )
             ''', commit=True)
@@ -113,6 +344,7 @@ class DatabaseManager:
                     put_theta REAL,
                     call_trend TEXT,
                     put_trend TEXT,
+                    ts_min INTEGER,
                     PRIMARY KEY (symbol, timestamp, strike)
                 )
             ''', commit=True)
@@ -157,6 +389,7 @@ class DatabaseManager:
                     volume_pcr REAL,
                     net_vol_rsi REAL,
                     smart_trend TEXT,
+                    ts_min INTEGER,
                     PRIMARY KEY (symbol, timestamp)
                 )
             ''', commit=True)
@@ -239,111 +472,129 @@ class DatabaseManager:
                         print(f"[DatabaseManager] Migrating trades: adding {col} column")
                         db.conn.execute(f"ALTER TABLE trades ADD COLUMN {col} {dtype}")
 
+                # 4. Integer epoch-minute column + composite range indexes
+                self._migrate_epoch_minutes(db)
+
                 db.conn.commit()
         except Exception as e:
             print(f"[DatabaseManager] Migration failed: {e}")
 
+    # Composite indexes serving half-open `ts_min` range scans
+    _TS_INDEXES = {
+        'historical_candles': ('idx_candles_symbol_ts', 'symbol, exchange, interval, ts_min'),
+        'option_chain_data': ('idx_chain_symbol_ts', 'symbol, ts_min, strike'),
+        'market_stats': ('idx_stats_symbol_ts', 'symbol, ts_min'),
+    }
+
+    def _migrate_epoch_minutes(self, db):
+        """
+        Adds and backfills `ts_min` on older databases, then creates the range indexes.
+        Existing rows are only ever updated in place, never rewritten or dropped.
+        """
+        for table, (index_name, index_cols) in self._TS_INDEXES.items():
+            columns = [info[1] for info in db.conn.execute(f"PRAGMA table_info({table})").fetchall()]
+            if 'ts_min' not in columns:
+                print(f"[DatabaseManager] Migrating {table}: adding ts_min column")
+                db.conn.execute(f"ALTER TABLE {table} ADD COLUMN ts_min INTEGER")
+            backfilled = db.conn.execute(
+                f"UPDATE {table} SET ts_min = CAST(strftime('%s', timestamp) AS INTEGER) / 60 "
+                f"WHERE ts_min IS NULL AND timestamp IS NOT NULL"
+            ).rowcount
+            if backfilled:
+                print(f"[DatabaseManager] Backfilled ts_min for {backfilled} rows in {table}")
+            db.conn.execute(f"CREATE INDEX IF NOT EXISTS {index_name} ON {table} ({index_cols})")
+            # Safety net for writers that bypass the store_* methods (raw INSERT ... SELECT)
+            db.conn.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS trg_{table}_ts_min AFTER INSERT ON {table}
+                WHEN NEW.ts_min IS NULL AND NEW.timestamp IS NOT NULL
+                BEGIN
+                    UPDATE {table} SET ts_min = CAST(strftime('%s', NEW.timestamp) AS INTEGER) / 60
+                    WHERE rowid = NEW.rowid;
+                END
+            """)
+        db.conn.execute("CREATE INDEX IF NOT EXISTS idx_trades_entry_time ON trades (entry_time)")
+
     def store_trade(self, trade_data: dict):
         """
         Stores or updates a trade in the database.
         """
+        if self._enqueue_write('trade', trade_data):
+            return
         with self._lock:
-            query = '''
-                INSERT OR REPLACE INTO trades (
-                    trade_id, pattern_id, symbol, instrument_key, side, entry_time, entry_price,
-                    exit_time, exit_price, stop_loss, take_profit, sl_price, tp_price,
-                    quantity, status, exit_reason, outcome, pnl
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            '''
-            params = (
-                trade_data.get('trade_id'),
-                trade_data.get('pattern_id'),
-                trade_data.get('symbol'),
-                trade_data.get('instrument_key'),
-                trade_data.get('side'),
-                trade_data.get('entry_time'),
-                trade_data.get('entry_price'),
-                trade_data.get('exit_time'),
-                trade_data.get('exit_price'),
-                trade_data.get('stop_loss'),
-                trade_data.get('take_profit'),
-                trade_data.get('sl_price'),
-                trade_data.get('tp_price'),
-                trade_data.get('quantity'),
-                trade_data.get('status', 'OPEN'),
-                trade_data.get('exit_reason'),
-                trade_data.get('outcome'),
-                trade_data.get('pnl')
-            )
-            self._execute_query(query, params, commit=True)
+            with self as db:
+                self._write_trade(db, trade_data)
+                db.conn.commit()
+
+    def _write_trade(self, db, trade_data: dict):
+        query = '''
+            INSERT OR REPLACE INTO trades (
+                trade_id, pattern_id, symbol, instrument_key, side, entry_time, entry_price,
+                exit_time, exit_price, stop_loss, take_profit, sl_price, tp_price,
+                quantity, status, exit_reason, outcome, pnl
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        '''
+        params = (
+            trade_data.get('trade_id'),
+            trade_data.get('pattern_id'),
+            trade_data.get('symbol'),
+            trade_data.get('instrument_key'),
+            trade_data.get('side'),
+            trade_data.get('entry_time'),
+            trade_data.get('entry_price'),
+            trade_data.get('exit_time'),
+            trade_data.get('exit_price'),
+            trade_data.get('stop_loss'),
+            trade_data.get('take_profit'),
+            trade_data.get('sl_price'),
+            trade_data.get('tp_price'),
+            trade_data.get('quantity'),
+            trade_data.get('status', 'OPEN'),
+            trade_data.get('exit_reason'),
+            trade_data.get('outcome'),
+            trade_data.get('pnl')
+        )
+        db.conn.execute(query, params)
 
     def store_historical_candles(self, symbol, exchange, interval, candles_df):
         """
         Stores historical candle data in the database.
-        Uses INSERT OR REPLACE to handle duplicate entries based on the primary key.
+        Upserts on the primary key; volume and OI are only overwritten when the new value is > 0.
         """
+        if self._enqueue_write('candles', symbol, exchange, interval, candles_df.copy()):
+            return
         with self._lock:
-            from python_engine.utils.symbol_master import MASTER as SymbolMaster
-            instrument_key = SymbolMaster.get_upstox_key(symbol)
-            if not instrument_key:
-                instrument_key = symbol  # Fallback for symbols not in master
-
             with self as db:
-                df_to_insert = candles_df.copy()
-                df_to_insert['symbol'] = instrument_key
-                df_to_insert['exchange'] = exchange
-                df_to_insert['interval'] = interval
-
-                # Data Type Coercion and Formatting
-                df_to_insert = self._normalize_df_timestamps(df_to_insert)
-                if 'oi' not in df_to_insert.columns:
-                    df_to_insert['oi'] = 0
-                df_to_insert['oi'] = pd.to_numeric(df_to_insert['oi'], errors='coerce').fillna(0).astype(int)
-                for col in ['open', 'high', 'low', 'close']:
-                     df_to_insert[col] = pd.to_numeric(df_to_insert[col], errors='coerce')
-                df_to_insert['volume'] = pd.to_numeric(df_to_insert['volume'], errors='coerce').fillna(0).astype(int)
-
-
-                table_cols = ['symbol', 'exchange', 'interval', 'timestamp', 'open', 'high', 'low', 'close', 'volume', 'oi']
-                df_to_insert = df_to_insert[table_cols]
-
                 try:
-                    # Use to_sql with a temporary table for robust insertion
-                    df_to_insert.to_sql('temp_historical_candles', db.conn, if_exists='replace', index=False)
-
-                    # Compatible Upsert Pattern (Works on SQLite < 3.24)
-                    # 1. Update existing rows with data from temp table
-                    # We protect OI and Volume by only updating them if the new value is > 0
-                    update_query = f"""
-                        UPDATE historical_candles
-                        SET
-                            open = (SELECT t.open FROM temp_historical_candles t WHERE t.symbol = historical_candles.symbol AND t.exchange = historical_candles.exchange AND t.interval = historical_candles.interval AND t.timestamp = historical_candles.timestamp),
-                            high = (SELECT t.high FROM temp_historical_candles t WHERE t.symbol = historical_candles.symbol AND t.exchange = historical_candles.exchange AND t.interval = historical_candles.interval AND t.timestamp = historical_candles.timestamp),
-                            low = (SELECT t.low FROM temp_historical_candles t WHERE t.symbol = historical_candles.symbol AND t.exchange = historical_candles.exchange AND t.interval = historical_candles.interval AND t.timestamp = historical_candles.timestamp),
-                            close = (SELECT t.close FROM temp_historical_candles t WHERE t.symbol = historical_candles.symbol AND t.exchange = historical_candles.exchange AND t.interval = historical_candles.interval AND t.timestamp = historical_candles.timestamp),
-                            volume = COALESCE((SELECT t.volume FROM temp_historical_candles t WHERE t.symbol = historical_candles.symbol AND t.exchange = historical_candles.exchange AND t.interval = historical_candles.interval AND t.timestamp = historical_candles.timestamp AND t.volume > 0), historical_candles.volume),
-                            oi = COALESCE((SELECT t.oi FROM temp_historical_candles t WHERE t.symbol = historical_candles.symbol AND t.exchange = historical_candles.exchange AND t.interval = historical_candles.interval AND t.timestamp = historical_candles.timestamp AND t.oi > 0), historical_candles.oi)
-                        WHERE EXISTS (
-                            SELECT 1 FROM temp_historical_candles t
-                            WHERE t.symbol = historical_candles.symbol AND t.exchange = historical_candles.exchange AND t.interval = historical_candles.interval AND t.timestamp = historical_candles.timestamp
-                        )
-                    """
-                    db.conn.execute(update_query)
-
-                    # 2. Insert new rows that don't exist yet
-                    insert_query = f"""
-                        INSERT OR IGNORE INTO historical_candles ({', '.join(table_cols)})
-                        SELECT {', '.join(table_cols)} FROM temp_historical_candles
-                    """
-                    db.conn.execute(insert_query)
+                    self._write_historical_candles(db, symbol, exchange, interval, candles_df)
                     db.conn.commit()
-
                 except Exception as e:
                     print(f"Error storing historical candles for {symbol}: {e}")
                     db.conn.rollback()
-                finally:
-                    # Clean up the temporary table
-                    db.conn.execute("DROP TABLE IF EXISTS temp_historical_candles")
+
+    def _write_historical_candles(self, db, symbol, exchange, interval, candles_df):
+        from python_engine.utils.symbol_master import MASTER as SymbolMaster
+        instrument_key = SymbolMaster.get_upstox_key(symbol)
+        if not instrument_key:
+            instrument_key = symbol  # Fallback for symbols not in master
+
+        df_to_insert = candles_df.copy()
+        df_to_insert['symbol'] = instrument_key
+        df_to_insert['exchange'] = exchange
+        df_to_insert['interval'] = interval
+
+        # Data Type Coercion and Formatting
+        df_to_insert = self._normalize_df_timestamps(df_to_insert)
+        if 'oi' not in df_to_insert.columns:
+            df_to_insert['oi'] = 0
+        df_to_insert['oi'] = pd.to_numeric(df_to_insert['oi'], errors='coerce').fillna(0).astype(int)
+        for col in ['open', 'high', 'low', 'close']:
+             df_to_insert[col] = pd.to_numeric(df_to_insert[col], errors='coerce')
+        df_to_insert['volume'] = pd.to_numeric(df_to_insert['volume'], errors='coerce').fillna(0).astype(int)
+
+        table_cols = ['symbol', 'exchange', 'interval', 'timestamp', 'open', 'high', 'low', 'close', 'volume', 'oi', 'ts_min']
+        self._bulk_upsert(db, 'historical_candles', df_to_insert, table_cols,
+                          conflict_cols=['symbol', 'exchange', 'interval', 'timestamp'],
+                          positive_only_cols=('volume', 'oi'))
 
     def get_historical_candles(self, symbol, exchange, interval, from_date, to_date):
         from python_engine.utils.symbol_master import MASTER as SymbolMaster
@@ -351,65 +602,54 @@ class DatabaseManager:
         if not instrument_key:
             instrument_key = symbol # Fallback
 
-        # Ensure the date range covers the specific time if provided
-        start_date_str = self._normalize_timestamp(from_date)
-        end_date_str = self._normalize_timestamp(to_date, floor=False)
+        # Half-open epoch-minute range; a date-only to_date covers the whole day
+        start_min, end_min = self._minute_range(from_date, to_date)
 
-        with self as db:
-            query = """
-                SELECT * FROM historical_candles
-                WHERE symbol = ? AND exchange = ? AND interval = ? AND timestamp BETWEEN ? AND ?
-                ORDER BY timestamp DESC
-            """
-            return pd.read_sql_query(query, db.conn, params=(instrument_key, exchange, interval, start_date_str, end_date_str))
+        query = """
+            SELECT * FROM historical_candles
+            WHERE symbol = ? AND exchange = ? AND interval = ? AND ts_min >= ? AND ts_min < ?
+            ORDER BY ts_min DESC
+        """
+        return self._read_df('historical_candles', query, (instrument_key, exchange, interval, start_min, end_min))
 
     def store_option_chain(self, symbol, option_chain_df, date=None):
+        if self._enqueue_write('option_chain', symbol, option_chain_df.copy(), date):
+            return
         with self._lock:
             with self as db:
-                date_str = date if date else datetime.now().strftime('%Y-%m-%d')
                 try:
-                    df_to_insert = option_chain_df.copy()
-                    df_to_insert['symbol'] = symbol
-                    if 'timestamp' not in df_to_insert.columns:
-                         target_date = datetime.strptime(date_str, '%Y-%m-%d')
-                         df_to_insert['timestamp'] = target_date.strftime('%Y-%m-%d %H:%M:%S')
-
-                    df_to_insert = self._normalize_df_timestamps(df_to_insert)
-                    df_to_insert.to_sql('temp_option_chain', db.conn, if_exists='replace', index=False)
-
-                    cols = ['symbol', 'timestamp', 'strike', 'expiry', 'call_oi_chg', 'put_oi_chg',
-                            'call_instrument_key', 'put_instrument_key', 'call_oi', 'put_oi',
-                            'call_ltp', 'put_ltp', 'call_volume', 'put_volume',
-                            'call_iv', 'put_iv', 'call_delta', 'put_delta',
-                            'call_theta', 'put_theta', 'call_trend', 'put_trend']
-                    actual_cols = [c for c in cols if c in df_to_insert.columns]
-
-                    # Efficient UPSERT using INSERT ... ON CONFLICT (Requires SQLite 3.24+)
-                    cols_to_update = [c for c in actual_cols if c not in ['symbol', 'timestamp', 'strike']]
-                    update_clause = ", ".join([f"{c} = excluded.{c}" for c in cols_to_update])
-
-                    upsert_query = f"""
-                        INSERT INTO option_chain_data ({', '.join(actual_cols)})
-                        SELECT {', '.join(actual_cols)} FROM temp_option_chain
-                        ON CONFLICT(symbol, timestamp, strike) DO UPDATE SET {update_clause}
-                    """
-                    db.conn.execute(upsert_query)
+                    self._write_option_chain(db, symbol, option_chain_df, date)
                     db.conn.commit()
                 except Exception as e:
                     print(f"Error storing option chain for {symbol}: {e}")
                     db.conn.rollback()
-                finally:
-                    db.conn.execute("DROP TABLE IF EXISTS temp_option_chain")
+
+    def _write_option_chain(self, db, symbol, option_chain_df, date=None):
+        date_str = date if date else datetime.now().strftime('%Y-%m-%d')
+        df_to_insert = option_chain_df.copy()
+        df_to_insert['symbol'] = symbol
+        if 'timestamp' not in df_to_insert.columns:
+             target_date = datetime.strptime(date_str, '%Y-%m-%d')
+             df_to_insert['timestamp'] = target_date.strftime('%Y-%m-%d %H:%M:%S')
+
+        df_to_insert = self._normalize_df_timestamps(df_to_insert)
+
+        cols = ['symbol', 'timestamp', 'strike', 'expiry', 'call_oi_chg', 'put_oi_chg',
+                'call_instrument_key', 'put_instrument_key', 'call_oi', 'put_oi',
+                'call_ltp', 'put_ltp', 'call_volume', 'put_volume',
+                'call_iv', 'put_iv', 'call_delta', 'put_delta',
+                'call_theta', 'put_theta', 'call_trend', 'put_trend', 'ts_min']
+        actual_cols = [c for c in cols if c in df_to_insert.columns]
+
+        self._bulk_upsert(db, 'option_chain_data', df_to_insert, actual_cols,
+                          conflict_cols=['symbol', 'timestamp', 'strike'])
 
     def get_option_chain(self, symbol, for_date):
-        with self as db:
-            query = "SELECT * FROM option_chain_data WHERE symbol = ? AND DATE(timestamp) = ?"
-            return pd.read_sql_query(query, db.conn, params=(symbol, for_date))
+        query = "SELECT * FROM option_chain_data WHERE symbol = ? AND ts_min >= ? AND ts_min < ?"
+        return self._read_df('option_chain', query, (symbol, *self.day_bounds(for_date)))
 
     def get_instrument_master(self):
-        with self as db:
-            query = "SELECT * FROM instrument_master"
-            return pd.read_sql_query(query, db.conn)
+        return self._read_df('instrument_master', "SELECT * FROM instrument_master")
 
     def store_instrument_master(self, df):
         """
@@ -418,32 +658,19 @@ class DatabaseManager:
         with self._lock:
             with self as db:
                 try:
-                    df.to_sql('temp_instrument_master', db.conn, if_exists='replace', index=False)
-
                     cursor = db.conn.cursor()
                     cursor.execute("PRAGMA table_info(instrument_master)")
                     target_cols = [info[1] for info in cursor.fetchall()]
-                    cursor.execute("PRAGMA table_info(temp_instrument_master)")
-                    source_cols = [info[1] for info in cursor.fetchall()]
-                    common_cols = [c for c in target_cols if c in source_cols]
+                    common_cols = [c for c in target_cols if c in df.columns]
 
                     if not common_cols: return
 
-                    cols_to_update = [c for c in common_cols if c != 'instrument_key']
-                    update_clause = ", ".join([f"{c} = excluded.{c}" for c in cols_to_update])
-
-                    upsert_query = f"""
-                        INSERT INTO instrument_master ({', '.join(common_cols)})
-                        SELECT {', '.join(common_cols)} FROM temp_instrument_master
-                        ON CONFLICT(instrument_key) DO UPDATE SET {update_clause}
-                    """
-                    db.conn.execute(upsert_query)
+                    self._bulk_upsert(db, 'instrument_master', df, common_cols,
+                                      conflict_cols=['instrument_key'])
                     db.conn.commit()
                 except Exception as e:
                     print(f"[DatabaseManager] Error storing instrument master: {e}")
                     db.conn.rollback()
-                finally:
-                    db.conn.execute("DROP TABLE IF EXISTS temp_instrument_master")
 
     def store_holidays(self, holiday_list):
         with self._lock:
@@ -463,49 +690,43 @@ class DatabaseManager:
         """
         Stores enriched market statistics in the database.
         """
+        if self._enqueue_write('market_stats', symbol, stats_df.copy()):
+            return
         with self._lock:
             with self as db:
-                df_to_insert = stats_df.copy()
-                df_to_insert['symbol'] = symbol
-
-                # Ensure timestamp format
-                # DON'T NORMALIZE if it's already string formatted from outside to avoid floor(min) issues if it was already floored
-                # df_to_insert = self._normalize_df_timestamps(df_to_insert)
-
                 try:
-                    df_to_insert.to_sql('temp_market_stats', db.conn, if_exists='replace', index=False)
-
-                    cols = ['symbol', 'timestamp', 'pcr', 'pcr_velocity', 'advances', 'declines', 'oi_wall_above', 'oi_wall_below', 'call_oi', 'put_oi', 'smart_trend', 'volume_pcr', 'net_vol_rsi']
-                    # filter columns that exist in df
-                    actual_cols = [c for c in cols if c in df_to_insert.columns]
-
-                    cols_to_update = [c for c in actual_cols if c not in ['symbol', 'timestamp']]
-                    update_clause = ", ".join([f"{c} = excluded.{c}" for c in cols_to_update])
-
-                    upsert_query = f"""
-                        INSERT INTO market_stats ({', '.join(actual_cols)})
-                        SELECT {', '.join(actual_cols)} FROM temp_market_stats
-                        ON CONFLICT(symbol, timestamp) DO UPDATE SET {update_clause}
-                    """
-                    db.conn.execute(upsert_query)
+                    self._write_market_stats(db, symbol, stats_df)
                     db.conn.commit()
                 except Exception as e:
                     print(f"Error storing market stats for {symbol}: {e}")
                     db.conn.rollback()
-                finally:
-                    db.conn.execute("DROP TABLE IF EXISTS temp_market_stats")
+
+    def _write_market_stats(self, db, symbol, stats_df):
+        df_to_insert = stats_df.copy()
+        df_to_insert['symbol'] = symbol
+
+        # Ensure timestamp format
+        # DON'T NORMALIZE if it's already string formatted from outside to avoid floor(min) issues if it was already floored
+        # df_to_insert = self._normalize_df_timestamps(df_to_insert)
+        if 'timestamp' in df_to_insert.columns:
+            df_to_insert['ts_min'] = self._epoch_minutes(self._to_wall_clock(df_to_insert['timestamp']).dt.floor('min'))
+
+        cols = ['symbol', 'timestamp', 'pcr', 'pcr_velocity', 'advances', 'declines', 'oi_wall_above', 'oi_wall_below', 'call_oi', 'put_oi', 'smart_trend', 'volume_pcr', 'net_vol_rsi', 'ts_min']
+        # filter columns that exist in df
+        actual_cols = [c for c in cols if c in df_to_insert.columns]
+
+        self._bulk_upsert(db, 'market_stats', df_to_insert, actual_cols,
+                          conflict_cols=['symbol', 'timestamp'])
 
     def get_market_stats(self, symbol, from_date, to_date):
         """
         Retrieves market statistics for a given symbol and date range.
         """
-        start_date_str = self._normalize_timestamp(from_date)
-        end_date_str = self._normalize_timestamp(to_date, floor=False)
+        start_min, end_min = self._minute_range(from_date, to_date)
 
-        with self as db:
-            query = """
-                SELECT * FROM market_stats
-                WHERE symbol = ? AND timestamp BETWEEN ? AND ?
-                ORDER BY timestamp ASC
-            """
-            return pd.read_sql_query(query, db.conn, params=(symbol, start_date_str, end_date_str))
+        query = """
+            SELECT * FROM market_stats
+            WHERE symbol = ? AND ts_min >= ? AND ts_min < ?
+            ORDER BY ts_min ASC
+        """
+        return self._read_df('market_stats', query, (symbol, start_min, end_min))
@@ -6,10 +6,9 @@ import logging
 from typing import List, Dict, Optional, Any
 from datetime import datetime, timedelta
 from data_sourcing.data_manager import DataManager
-from data_sourcing.database_manager import DatabaseManager
 from python_engine.utils.symbol_master import MASTER as SymbolMaster
 from python_engine.engine_config import Config
-from python_engine.utils.math_engine import MathEngine
+from data_sourcing.stats_enricher import compute_net_vol_rsi, enrich_snapshots
 
 # Standardized Logging Format
 logging.basicConfig(
@@ -73,6 +72,9 @@ class IngestionManager:
 
             if not force:
                 existing_candles = self.db_manager.get_historical_candles(canonical_symbol, 'NSE', '1m', date_str, date_str)
+                # Days already moved to the Parquet archive count as ingested
+                storage_key = SymbolMaster.get_upstox_key(canonical_symbol) or canonical_symbol
+                existing_candles = self.data_manager.archive.merge_candles(existing_candles, storage_key, 'NSE', '1m', date_str, date_str)
                 if existing_candles is not None and not existing_candles.empty:
                     existing_stats = self.db_manager.get_market_stats(canonical_symbol, date_str, date_str)
                     has_oi = (existing_candles['oi'] > 0).any()
@@ -91,8 +93,8 @@ class IngestionManager:
 
                     # Ensure all ingestion uses the standardized canonical symbol
                     with self.db_manager as ctx:
-                        ctx.conn.execute("INSERT OR REPLACE INTO option_chain_data (symbol, timestamp, strike, expiry, call_oi_chg, put_oi_chg, call_instrument_key, put_instrument_key, call_oi, put_oi) "
-                                      "SELECT ?, timestamp, strike, expiry, call_oi_chg, put_oi_chg, call_instrument_key, put_instrument_key, call_oi, put_oi FROM option_chain_data WHERE symbol = ?", (canonical_symbol, prefix))
+                        ctx.conn.execute("INSERT OR REPLACE INTO option_chain_data (symbol, timestamp, strike, expiry, call_oi_chg, put_oi_chg, call_instrument_key, put_instrument_key, call_oi, put_oi, ts_min) "
+                                      "SELECT ?, timestamp, strike, expiry, call_oi_chg, put_oi_chg, call_instrument_key, put_instrument_key, call_oi, put_oi, ts_min FROM option_chain_data WHERE symbol = ?", (canonical_symbol, prefix))
                         ctx.conn.commit()
                 except Exception as e:
                     logger.error(f"    - run_backfill failed: {e}")
@@ -119,10 +121,10 @@ class IngestionManager:
             strike_step = 100 if "BANK" in canonical_symbol.upper() else 50
             strikes = range(int(low_strike) - strike_step*2, int(high_strike) + strike_step*3, strike_step)
 
-            with self.db_manager as db:
-                query = "SELECT DISTINCT strike, expiry, call_instrument_key, put_instrument_key FROM option_chain_data WHERE symbol = ? AND DATE(timestamp) = ? AND strike IN ({})".format(','.join([str(s) for s in strikes]))
-                df = pd.read_sql_query(query, db.conn, params=(canonical_symbol, date_str))
-
+            columns = ['strike', 'expiry', 'call_instrument_key', 'put_instrument_key']
+            df = self.data_manager.read_option_chain(canonical_symbol, date_str, columns=columns)
+            if df is None or df.empty: return
+            df = df.loc[df['strike'].isin(list(strikes)), columns].drop_duplicates()
             if df.empty: return
 
             unique_keys = set()
@@ -166,11 +168,9 @@ class IngestionManager:
             index_map = index_candles.set_index('ts_str')['close'].to_dict()
             index_open_map = index_candles.set_index('ts_str')['open'].to_dict()
 
-            with self.db_manager as db:
-                query = "SELECT * FROM option_chain_data WHERE symbol = ? AND DATE(timestamp) = ?"
-                df = pd.read_sql_query(query, db.conn, params=(symbol, date_str))
-
-            if df.empty: return
+            # Archived days are re-enriched from their Parquet partition
+            df = self.data_manager.read_option_chain(symbol, date_str)
+            if df is None or df.empty: return
 
             df['timestamp_dt'] = pd.to_datetime(df['timestamp'])
             df['ts_str'] = df['timestamp_dt'].dt.strftime('%Y-%m-%d %H:%M:%S')
@@ -180,98 +180,28 @@ class IngestionManager:
             df['call_oi_1m'] = df.groupby('strike')['call_oi'].diff().fillna(0)
             df['put_oi_1m'] = df.groupby('strike')['put_oi'].diff().fillna(0)
 
-            processed_snapshots, stats_list = [], []
-            R, prev_pcr = 0.1, None
-
             # Pre-calculate Volume Metrics for RSI
             volume_stats = df.groupby('ts_str').agg({
                 'call_volume': 'sum',
                 'put_volume': 'sum'
             }).reset_index()
             volume_stats['net_vol'] = volume_stats['call_volume'] - volume_stats['put_volume']
+            volume_stats['net_vol_rsi'] = compute_net_vol_rsi(volume_stats['net_vol'])
+            rsi_map = volume_stats.set_index('ts_str')['net_vol_rsi'].to_dict()
 
-            def compute_rsi(series, window=5):
-                delta = series.diff()
-                gain = (delta.where(delta > 0, 0)).rolling(window=window).mean()
-                loss = (-delta.where(delta < 0, 0)).rolling(window=window).mean()
-                rs = gain / loss.replace(0, np.nan)
-                return (100 - (100 / (1 + rs))).fillna(50)
+            df, stats_df = enrich_snapshots(df, index_map, index_open_map,
+                                            lambda spot: self.data_manager.calculate_atm_strike(symbol, spot))
+            if df.empty: return
 
-            volume_stats['net_vol_rsi'] = compute_rsi(volume_stats['net_vol'])
-            rsi_map = volume_stats.set_index('ts_str')['net_vol_rsi'].to_dict()
+            # Velocity against the previous enriched snapshot
+            pcr = stats_df['pcr'].to_numpy()
+            stats_df.insert(2, 'pcr_velocity', np.round(np.diff(pcr, prepend=pcr[0]), 4))
+            stats_df['net_vol_rsi'] = [round(rsi_map.get(ts, 50.0), 2) for ts in stats_df['timestamp']]
 
-            for ts_str, group in df.groupby('ts_str'):
-                spot = index_map.get(ts_str)
-                spot_open = index_open_map.get(ts_str)
-
-                if spot is None:
-                    # Fallback to closest match logic
-                    continue
-
-                total_call_oi = group['call_oi'].sum()
-                total_put_oi = group['put_oi'].sum()
-                pcr = round(total_put_oi / total_call_oi, 4) if total_call_oi > 0 else 1.0
-                pcr_velocity = round(pcr - prev_pcr, 4) if prev_pcr is not None else 0.0
-                prev_pcr = pcr
-
-                                # Volume PCR Calculation
-                total_call_vol = group['call_volume'].sum()
-                total_put_vol = group['put_volume'].sum()
-                vol_pcr = round(total_put_vol / total_call_vol, 4) if total_call_vol > 0 else 1.0
-                net_vol_rsi = round(rsi_map.get(ts_str, 50.0), 2)
-
-                oi_wall_above = group.loc[group['call_oi'].idxmax()]['strike'] if total_call_oi > 0 else 0
-                oi_wall_below = group.loc[group['put_oi'].idxmax()]['strike'] if total_put_oi > 0 else 0
-
-                expiry_str = group['expiry'].iloc[0] if 'expiry' in group.columns and group['expiry'].iloc[0] else None
-                ts_dt = pd.to_datetime(ts_str)
-                if expiry_str:
-                    expiry_dt = pd.to_datetime(expiry_str).replace(hour=15, minute=30)
-                    T = max(0, (expiry_dt - ts_dt).total_seconds() / (365 * 24 * 3600))
-                else: T = 0
-
-                group_p = group.copy()
-                price_dir = 1 if (spot_open and spot > spot_open) else -1 if (spot_open and spot < spot_open) else 0
-
-                # Note: Greeks calculation still requires row-wise logic due to MathEngine dependency,
-                # but we minimize overhead by pre-filtering.
-                for idx, row in group_p.iterrows():
-                    iv_c = MathEngine.calculate_iv(row['call_ltp'], spot, row['strike'], T, R, 'CE') if row['call_ltp'] is not None and row['call_ltp'] > 0 and T > 0 else 0.0
-                    g_c = MathEngine.calculate_greeks(spot, row['strike'], T, R, iv_c, 'CE') if iv_c > 0 else {'delta':0, 'theta':0}
-                    iv_p = MathEngine.calculate_iv(row['put_ltp'], spot, row['strike'], T, R, 'PE') if row['put_ltp'] is not None and row['put_ltp'] > 0 and T > 0 else 0.0
-                    g_p = MathEngine.calculate_greeks(spot, row['strike'], T, R, iv_p, 'PE') if iv_p > 0 else {'delta':0, 'theta':0}
-
-                    group_p.at[idx, 'call_iv'], group_p.at[idx, 'call_delta'], group_p.at[idx, 'call_theta'] = iv_c, g_c['delta'], g_c['theta']
-                    group_p.at[idx, 'put_iv'], group_p.at[idx, 'put_delta'], group_p.at[idx, 'put_theta'] = iv_p, g_p['delta'], g_p['theta']
-                    group_p.at[idx, 'call_trend'] = MathEngine.get_smart_trend(price_dir, row['call_oi_1m'])
-                    group_p.at[idx, 'put_trend'] = MathEngine.get_smart_trend(-price_dir, row['put_oi_1m'])
-
-                processed_snapshots.append(group_p)
-
-                # Derive market-wide Smart Trend from ATM options
-                atm_strike = self.data_manager.calculate_atm_strike(symbol, spot)
-                atm_options = group_p[abs(group_p['strike'] - atm_strike) <= 100]
-                all_trends = [t for t in (atm_options['call_trend'].tolist() + atm_options['put_trend'].tolist()) if t != 'Neutral']
-                market_trend = max(set(all_trends), key=all_trends.count) if all_trends else "Neutral"
-
-                stats_list.append({
-                    'timestamp': ts_str, 'pcr': pcr, 'pcr_velocity': pcr_velocity,
-                    'oi_wall_above': oi_wall_above, 'oi_wall_below': oi_wall_below,
-                    'call_oi': total_call_oi, 'put_oi': total_put_oi,
-                    'smart_trend': market_trend, 'advances': 0, 'declines': 0, 'volume_pcr': vol_pcr, 'net_vol_rsi': net_vol_rsi
-                })
-
-            if processed_snapshots:
-                full_df = pd.concat(processed_snapshots).reset_index(drop=True)
-                chunk_size = 500
-                for i in range(0, len(full_df), chunk_size):
-                    chunk = full_df.iloc[i : i + chunk_size]
-                    self.db_manager.store_option_chain(symbol, chunk, date=date_str)
-
-            if stats_list:
-                stats_df = pd.DataFrame(stats_list)
-                self.db_manager.store_market_stats(symbol, stats_df)
-                logger.info(f"      [OK] Stored {len(stats_df)} market stats snapshots.")
+            # Bulk upsert streams all rows in a single transaction; no manual chunking needed
+            self.db_manager.store_option_chain(symbol, df, date=date_str)
+            self.db_manager.store_market_stats(symbol, stats_df)
+            logger.info(f"      [OK] Stored {len(stats_df)} market stats snapshots.")
         except Exception as e:
             logger.error(f"Stats enrichment failed: {e}")
             traceback.print_exc()
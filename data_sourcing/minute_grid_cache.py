@@ -0,0 +1,113 @@
+import logging
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Optional, Tuple
+import numpy as np
+import pandas as pd
+from python_engine.models.data_models import VolumeBar
+
+logger = logging.getLogger(__name__)
+
+class MinuteGridCache:
+    """
+    Dense per-day OHLCV grid for backtest candle lookups.
+
+    The first lookup for an (instrument_key, date) pair loads that day's 1-minute candles
+    in one query and scatters them into NumPy arrays indexed by session minute
+    (09:15 -> slot 0, 15:29 -> slot 374). Every later lookup is an array index.
+    Days that have no data are cached as well, so they are not re-queried; the miss
+    counter shows how often a position had no candle to evaluate against.
+    """
+
+    SESSION_START = timedelta(hours=9, minutes=15)
+    SESSION_SLOTS = 375
+    FIELDS = ('open', 'high', 'low', 'close', 'volume')
+
+    def __init__(self, loader: Callable[[str, str], Optional[pd.DataFrame]], max_grids: int = 256):
+        """
+        Args:
+            loader (Callable): `loader(instrument_key, date_str)` returning that day's candles.
+            max_grids (int): Number of (instrument, day) grids kept in memory (LRU).
+        """
+        self._loader = loader
+        self.max_grids = max_grids
+        self._grids: "OrderedDict[Tuple[str, str], Optional[Dict[str, np.ndarray]]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.loads = 0
+
+    def _load(self, symbol: str, date_str: str) -> Optional[Dict[str, np.ndarray]]:
+        self.loads += 1
+        df = self._loader(symbol, date_str)
+        if df is None or df.empty:
+            logger.debug(f"[MinuteGridCache] No candles for {symbol} on {date_str}")
+            return None
+
+        ts = pd.to_datetime(df['timestamp']).dt.floor('min')
+        slots = ((ts - (pd.Timestamp(date_str) + self.SESSION_START)) // pd.Timedelta(minutes=1)).to_numpy()
+        in_session = (slots >= 0) & (slots < self.SESSION_SLOTS)
+        slots = slots[in_session].astype(np.int64)
+
+        grid = {}
+        for field in self.FIELDS:
+            arr = np.full(self.SESSION_SLOTS, np.nan)
+            arr[slots] = pd.to_numeric(df[field], errors='coerce').to_numpy(dtype=float)[in_session]
+            grid[field] = arr
+        return grid
+
+    def _grid(self, symbol: str, date_str: str) -> Optional[Dict[str, np.ndarray]]:
+        key = (symbol, date_str)
+        if key in self._grids:
+            self._grids.move_to_end(key)
+            return self._grids[key]
+        grid = self._load(symbol, date_str)
+        self._grids[key] = grid
+        if len(self._grids) > self.max_grids:
+            self._grids.popitem(last=False)
+        return grid
+
+    def slot_of(self, dt: datetime) -> int:
+        """Session minute index of `dt` (may fall outside [0, SESSION_SLOTS))."""
+        session_open = datetime.combine(dt.date(), datetime.min.time()) + self.SESSION_START
+        return int((dt - session_open).total_seconds() // 60)
+
+    def in_session(self, dt: datetime) -> bool:
+        return 0 <= self.slot_of(dt) < self.SESSION_SLOTS
+
+    def get_candle(self, symbol: str, dt: datetime) -> Optional[VolumeBar]:
+        """
+        Nearest candle to `dt` among the minutes a +/-30s window touches: the minute
+        containing `dt`, then its neighbour on the side `dt` leans towards.
+        """
+        slot = self.slot_of(dt)
+        grid = self._grid(symbol, dt.strftime('%Y-%m-%d'))
+        if grid is not None:
+            close = grid['close']
+            candidates = (slot + 1, slot) if dt.second > 30 else (slot, slot - 1 if dt.second < 30 else slot + 1)
+            for idx in candidates:
+                if 0 <= idx < self.SESSION_SLOTS and not np.isnan(close[idx]):
+                    self.hits += 1
+                    bar_time = pd.Timestamp(dt.date()) + self.SESSION_START + pd.Timedelta(minutes=idx)
+                    volume = grid['volume'][idx]
+                    return VolumeBar(
+                        symbol=symbol,
+                        timestamp=bar_time.timestamp(),
+                        open=float(grid['open'][idx]),
+                        high=float(grid['high'][idx]),
+                        low=float(grid['low'][idx]),
+                        close=float(close[idx]),
+                        volume=0 if np.isnan(volume) else int(volume)
+                    )
+        self.misses += 1
+        return None
+
+    def clear(self) -> None:
+        self._grids.clear()
+
+    def get_stats(self) -> dict:
+        return {
+            'grids': len(self._grids),
+            'loads': self.loads,
+            'hits': self.hits,
+            'misses': self.misses,
+        }
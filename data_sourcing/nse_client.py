@@ -1,5 +1,6 @@
 import requests
 import time
+from python_engine.utils.metrics_registry import track_call
 
 class NSEClient:
     def __init__(self):
@@ -49,6 +50,7 @@ class NSEClient:
             print(f"[NSE] Request failed: {e}")
         return None
 
+    @track_call('nse')
     def get_option_chain(self, symbol, indices=True):
         instrument_type = "Indices" if indices else "Equities"
         url = f"{self.base_url}/api/option-chain-v3"
@@ -58,6 +60,7 @@ class NSEClient:
         self.session.headers.update(headers)
         return self._make_get_request(url, params=params)
 
+    @track_call('nse')
     def get_market_breadth(self):
         url = f"{self.base_url}/api/live-analysis-advance"
         headers = self.headers.copy()
@@ -85,6 +88,7 @@ class NSEClient:
             "2026-12-25"  # Christmas
         ]
 
+    @track_call('nse')
     def get_indices(self):
         """
         Fetches the current data for all NSE indices.
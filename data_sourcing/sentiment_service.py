@@ -0,0 +1,144 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import replace
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+import pandas as pd
+from python_engine.models.data_models import Sentiment
+
+logger = logging.getLogger(__name__)
+
+class SentimentService:
+    """
+    Per-(symbol, minute) Sentiment snapshots with TTL-based invalidation.
+
+    A miss builds the whole snapshot from one market_stats read (PCR, PCR velocity,
+    Smart Trend and Net Vol RSI as of that minute) and one option chain (walls around
+    spot and volume PCR from the newest snapshot in it). Every later request for the
+    same symbol and minute is served from memory until the entry is older than `ttl`
+    seconds or invalidated.
+    """
+
+    def __init__(self, data_manager: Any, ttl: float = 60.0, max_entries: int = 1024):
+        """
+        Args:
+            data_manager (Any): DataManager providing the database, option chain and LTP.
+            ttl (float): Seconds a snapshot stays valid.
+            max_entries (int): Snapshots kept in memory (LRU).
+        """
+        self.data_manager = data_manager
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, int], Tuple[float, Sentiment]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+
+    def get(self, symbol: str, timestamp: Optional[float] = None, mode: str = 'backtest',
+            spot: Optional[float] = None, chain: Optional[List[Dict[str, Any]]] = None) -> Sentiment:
+        """
+        Returns the sentiment snapshot of `symbol` for the minute containing `timestamp`.
+
+        Args:
+            symbol (str): Canonical ticker (e.g. NIFTY, BANKNIFTY).
+            timestamp (Optional[float]): Epoch seconds; defaults to now.
+            mode (str): 'live' allows remote fetches for the chain and spot.
+            spot (Optional[float]): Index price at the minute; fetched if not given.
+            chain (Optional[List[Dict[str, Any]]]): Option chain the caller already holds.
+
+        Returns:
+            Sentiment: A copy of the cached snapshot (callers may adjust fields).
+        """
+        if timestamp is None:
+            timestamp = time.time()
+        key = (symbol, int(timestamp) // 60)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if now - entry[0] <= self.ttl:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return replace(entry[1])
+                self.expired += 1
+            self.misses += 1
+
+        sentiment = self._compute(symbol, timestamp, mode, spot, chain)
+        with self._lock:
+            self._entries[key] = (now, sentiment)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return replace(sentiment)
+
+    def invalidate(self, symbol: Optional[str] = None) -> None:
+        """Drops cached snapshots (all, or one symbol's), e.g. after new stats are stored."""
+        with self._lock:
+            if symbol is None:
+                self._entries.clear()
+            else:
+                for key in [k for k in self._entries if k[0] == symbol]:
+                    del self._entries[key]
+
+    def _compute(self, symbol: str, timestamp: float, mode: str,
+                 spot: Optional[float], chain: Optional[List[Dict[str, Any]]]) -> Sentiment:
+        sentiment = Sentiment(pcr=1.0, advances=0, declines=0, pcr_velocity=0.0, oi_wall_above=0.0, oi_wall_below=0.0,
+                              smart_trend="Neutral", volume_pcr=1.0, net_vol_rsi=50.0)
+        dt = datetime.fromtimestamp(timestamp)
+
+        # 1. Stats as of this minute (same as-of view the backtest aligns per bar)
+        has_stats = False
+        try:
+            stats = self.data_manager.db_manager.get_market_stats(symbol, dt.strftime('%Y-%m-%d'), dt.strftime('%Y-%m-%d %H:%M:%S'))
+            if not stats.empty:
+                row = stats.iloc[-1]
+                has_stats = True
+                sentiment.pcr = float(row.get('pcr') or 1.0)
+                sentiment.pcr_velocity = float(row.get('pcr_velocity') or 0.0)
+                sentiment.smart_trend = row.get('smart_trend') or "Neutral"
+                sentiment.net_vol_rsi = float(row.get('net_vol_rsi') or 50.0)
+                sentiment.volume_pcr = float(row.get('volume_pcr') or 1.0)
+                sentiment.oi_wall_above = float(row.get('oi_wall_above') or 0.0)
+                sentiment.oi_wall_below = float(row.get('oi_wall_below') or 0.0)
+        except Exception as e:
+            logger.debug(f"[SentimentService] Stats lookup failed for {symbol}: {e}")
+
+        # 2. Walls around spot and volume PCR from the newest chain snapshot
+        full_symbol = "NSE_INDEX|Nifty 50" if "NIFTY" in symbol and "BANK" not in symbol else "NSE_INDEX|Nifty Bank"
+        try:
+            if chain is None:
+                chain = self.data_manager.get_option_chain(full_symbol, mode=mode)
+            df = pd.DataFrame(chain or [])
+            if not df.empty and 'strike' in df.columns:
+                if 'timestamp' in df.columns and df['timestamp'].nunique() > 1:
+                    stamps = pd.to_datetime(df['timestamp'])
+                    df = df[stamps == stamps.max()]
+                if not has_stats and 'call_oi' in df.columns and 'put_oi' in df.columns:
+                    # No stored stats yet for the day: PCR straight from the chain
+                    total_call_oi = df['call_oi'].sum()
+                    if total_call_oi > 0:
+                        sentiment.pcr = round(float(df['put_oi'].sum() / total_call_oi), 4)
+                if 'call_volume' in df.columns and 'put_volume' in df.columns:
+                    total_call_vol = df['call_volume'].sum()
+                    if total_call_vol > 0:
+                        sentiment.volume_pcr = round(float(df['put_volume'].sum() / total_call_vol), 4)
+                if spot is None:
+                    spot = self.data_manager.get_last_traded_price(full_symbol, mode=mode)
+                if spot:
+                    calls, puts = df[df['strike'] > spot], df[df['strike'] < spot]
+                    if not calls.empty: sentiment.oi_wall_above = float(calls.loc[calls['call_oi'].idxmax()]['strike'])
+                    if not puts.empty: sentiment.oi_wall_below = float(puts.loc[puts['put_oi'].idxmax()]['strike'])
+        except Exception as e:
+            logger.debug(f"[SentimentService] Chain lookup failed for {symbol}: {e}")
+        return sentiment
+
+    def get_stats(self) -> dict:
+        return {
+            'entries': len(self._entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'expired': self.expired,
+        }
@@ -0,0 +1,249 @@
+import logging
+from typing import Any, Callable, Dict, Optional, Tuple
+import numpy as np
+import pandas as pd
+from python_engine.utils.greeks_engine import GreeksEngine
+from python_engine.utils.indicator_engine import WilderRsi
+from python_engine.utils.math_engine import MathEngine
+
+logger = logging.getLogger(__name__)
+
+RISK_FREE_RATE = 0.1
+NET_VOL_RSI_WINDOW = 5
+
+def compute_net_vol_rsi(series: pd.Series, window: int = NET_VOL_RSI_WINDOW) -> pd.Series:
+    """
+    Wilder RSI of the net (call - put) option volume series.
+
+    Runs the same streaming WilderRsi that NetVolumeRsi keeps live, so a day
+    replayed here gives exactly the values the live poller produced.
+    """
+    rsi = WilderRsi(window)
+    return pd.Series([rsi.update(float(x)) for x in series.fillna(0)], index=series.index, dtype=float)
+
+class NetVolumeRsi:
+    """
+    Per-symbol streaming Wilder RSI of net option volume, restarted every trading day.
+
+    Each update is O(1); the value is 50 until `window` changes have been seen.
+    """
+
+    def __init__(self, window: int = NET_VOL_RSI_WINDOW):
+        """
+        Args:
+            window (int): RSI period in snapshots.
+        """
+        self.window = window
+        self._states: Dict[str, Tuple[str, WilderRsi]] = {}
+
+    def update(self, symbol: str, day: str, net_vol: float) -> float:
+        """
+        Args:
+            symbol (str): Symbol the volume belongs to.
+            day (str): Trading day (YYYY-MM-DD) of the snapshot.
+            net_vol (float): Total call volume minus total put volume.
+
+        Returns:
+            float: The updated RSI.
+        """
+        state = self._states.get(symbol)
+        if state is None or state[0] != day:
+            state = self._states[symbol] = (day, WilderRsi(self.window))
+        return state[1].update(float(net_vol))
+
+    def reset(self, symbol: Optional[str] = None) -> None:
+        if symbol is None:
+            self._states.clear()
+        else:
+            self._states.pop(symbol, None)
+
+def enrich_snapshots(df: pd.DataFrame, spot_map: Dict[str, float], open_map: Dict[str, float],
+                     atm_strike: Callable[[float], float], r: float = RISK_FREE_RATE) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Greeks, Smart Trend and per-snapshot market stats for one or more chain snapshots.
+
+    Args:
+        df (pd.DataFrame): Chain rows sorted by (timestamp, strike) with `ts_str`,
+            `call_oi_1m` and `put_oi_1m` columns.
+        spot_map (Dict[str, float]): ts_str -> index close.
+        open_map (Dict[str, float]): ts_str -> index open.
+        atm_strike (Callable[[float], float]): Spot -> ATM strike.
+        r (float): Risk-free rate.
+
+    Returns:
+        Tuple[pd.DataFrame, pd.DataFrame]: Enriched chain rows and one stats row per
+        snapshot (without `pcr_velocity` / `net_vol_rsi`, which depend on earlier
+        snapshots). Snapshots without a spot are dropped.
+    """
+    # Snapshots without an index candle are skipped (no spot to price against)
+    df = df[df['ts_str'].isin(spot_map.keys())].reset_index(drop=True)
+    if df.empty:
+        return df, pd.DataFrame()
+    grouped = df.groupby('ts_str', sort=True)
+    snap = grouped.agg(
+        call_oi=('call_oi', 'sum'), put_oi=('put_oi', 'sum'),
+        call_volume=('call_volume', 'sum'), put_volume=('put_volume', 'sum')
+    )
+    snap_of_row = grouped.ngroup().to_numpy()
+    ts_keys = snap.index.to_series()
+    spot = ts_keys.map(spot_map).to_numpy(dtype=float)
+    spot_open = ts_keys.map(open_map).to_numpy(dtype=float)
+
+    # Snapshot-level PCR and volume PCR
+    total_call_oi, total_put_oi = snap['call_oi'].to_numpy(), snap['put_oi'].to_numpy()
+    with np.errstate(divide='ignore', invalid='ignore'):
+        pcr = np.where(total_call_oi > 0, np.round(total_put_oi / total_call_oi, 4), 1.0)
+        vol_pcr = np.where(snap['call_volume'].to_numpy() > 0,
+                           np.round(snap['put_volume'].to_numpy() / snap['call_volume'].to_numpy(), 4), 1.0)
+
+    # OI walls: strike of the first row holding each snapshot's max call/put OI
+    walls = {}
+    for side, total in (('call', total_call_oi), ('put', total_put_oi)):
+        at_max = df[f'{side}_oi'] == grouped[f'{side}_oi'].transform('max')
+        first_max = df[at_max].drop_duplicates('ts_str').set_index('ts_str')['strike']
+        walls[side] = np.where(total > 0, first_max.reindex(snap.index).to_numpy(dtype=float), 0)
+
+    # Time to expiry from each snapshot's first row (expiry day, 15:30)
+    first_rows = df.drop_duplicates('ts_str').set_index('ts_str').reindex(snap.index)
+    expiry = first_rows['expiry'] if 'expiry' in first_rows.columns else pd.Series(None, index=snap.index, dtype=object)
+    expiry_dt = pd.to_datetime(expiry.where(expiry.astype(bool) & expiry.notna()))
+    expiry_dt = expiry_dt.dt.normalize() + pd.Timedelta(hours=15, minutes=30) + (expiry_dt - expiry_dt.dt.floor('min'))
+    T = ((expiry_dt - pd.to_datetime(ts_keys)).dt.total_seconds() / (365 * 24 * 3600)).clip(lower=0).fillna(0).to_numpy()
+
+    # IV, Greeks and per-strike Smart Trend for every row at once
+    row_spot, row_T = spot[snap_of_row], T[snap_of_row]
+    spot_dir = np.sign(spot - spot_open)
+    price_dir = np.where(np.isnan(spot_dir) | (spot_open == 0), 0, spot_dir)[snap_of_row]
+    strikes = df['strike'].to_numpy(dtype=float)
+    for side, is_call in (('call', True), ('put', False)):
+        ltp = pd.to_numeric(df[f'{side}_ltp'], errors='coerce').to_numpy(dtype=float) if f'{side}_ltp' in df.columns \
+            else np.zeros(len(df))
+        solved = GreeksEngine.solve_chain(ltp, row_spot, strikes, row_T, r, is_call)
+        df[f'{side}_iv'] = solved['iv']
+        df[f'{side}_delta'] = np.round(solved['delta'], 4)
+        df[f'{side}_theta'] = np.round(solved['theta'], 4)
+    df['call_trend'] = MathEngine.get_smart_trends(price_dir, df['call_oi_1m'])
+    df['put_trend'] = MathEngine.get_smart_trends(-price_dir, df['put_oi_1m'])
+
+    # Market-wide Smart Trend: most frequent non-neutral trend among ATM +/- 100 strikes
+    # (ties go to the trend seen first, calls before puts, in strike order)
+    atm = np.array([atm_strike(s) for s in spot], dtype=float)
+    near_atm = np.abs(strikes - atm[snap_of_row]) <= 100
+    votes = pd.DataFrame({
+        'snap': np.concatenate([snap_of_row[near_atm]] * 2),
+        'trend': np.concatenate([df['call_trend'].to_numpy()[near_atm], df['put_trend'].to_numpy()[near_atm]]),
+    })
+    votes['order'] = np.arange(len(votes))
+    votes = votes[votes['trend'] != 'Neutral']
+    tally = votes.groupby(['snap', 'trend'], sort=False).agg(count=('order', 'size'), first=('order', 'min')).reset_index()
+    winners = tally.sort_values(['snap', 'count', 'first'], ascending=[True, False, True]).drop_duplicates('snap')
+    market_trend = np.full(len(snap), "Neutral", dtype=object)
+    market_trend[winners['snap'].to_numpy()] = winners['trend'].to_numpy()
+
+    stats_df = pd.DataFrame({
+        'timestamp': snap.index.to_numpy(), 'pcr': pcr,
+        'oi_wall_above': walls['call'], 'oi_wall_below': walls['put'],
+        'call_oi': total_call_oi, 'put_oi': total_put_oi,
+        'smart_trend': market_trend, 'advances': 0, 'declines': 0, 'volume_pcr': vol_pcr,
+    })
+    return df, stats_df
+
+class LiveStatsEnricher:
+    """
+    Streaming counterpart of IngestionManager.calculate_and_store_stats.
+
+    Keeps, per symbol and trading day, the last OI of every strike, the last PCR and
+    the net-volume RSI state, so each new chain snapshot is enriched (Greeks,
+    Smart Trend, market_stats row) in O(strikes) and appended to the database
+    instead of re-processing the whole day. Fed the same snapshots in order, it
+    produces the same rows as the full-day enrichment.
+    """
+
+    def __init__(self, db_manager: Any, atm_strike: Callable[[str, float], float],
+                 r: float = RISK_FREE_RATE, rsi_window: int = NET_VOL_RSI_WINDOW):
+        """
+        Args:
+            db_manager (Any): DatabaseManager used to store enriched rows.
+            atm_strike (Callable[[str, float], float]): (symbol, spot) -> ATM strike.
+            r (float): Risk-free rate.
+            rsi_window (int): Window of the net-volume RSI.
+        """
+        self.db_manager = db_manager
+        self._atm_strike = atm_strike
+        self.r = r
+        self.net_vol_rsi = NetVolumeRsi(rsi_window)
+        self._states: Dict[str, Dict[str, Any]] = {}
+
+    def _state(self, symbol: str, day: str) -> Dict[str, Any]:
+        state = self._states.get(symbol)
+        if state is None or state['day'] != day:
+            state = self._states[symbol] = {
+                'day': day,
+                'prev_oi': pd.DataFrame(columns=['call_oi', 'put_oi'], dtype=float),
+                'prev_pcr': None,
+            }
+        return state
+
+    def on_snapshot(self, symbol: str, timestamp: Any, chain: Any, spot: Optional[float],
+                    spot_open: Optional[float] = None, store: bool = True) -> Optional[Dict[str, Any]]:
+        """
+        Enriches one chain snapshot and appends its rows.
+
+        Args:
+            symbol (str): Canonical symbol the rows are stored under.
+            timestamp (Any): Snapshot time (datetime-like or epoch seconds).
+            chain (Any): List of strike records or a DataFrame.
+            spot (Optional[float]): Index close at the snapshot.
+            spot_open (Optional[float]): Index open of the same candle.
+            store (bool): Write the enriched chain and stats row to the database.
+
+        Returns:
+            Optional[Dict[str, Any]]: The market_stats row, or None if it could not be built.
+        """
+        df = chain.copy() if isinstance(chain, pd.DataFrame) else pd.DataFrame(chain or [])
+        if df.empty or 'strike' not in df.columns:
+            return None
+        if 'timestamp' in df.columns and df['timestamp'].nunique() > 1:
+            # A day's worth of stored rows: only the newest snapshot is new
+            stamps = pd.to_datetime(df['timestamp'])
+            df = df[stamps == stamps.max()]
+        ts = pd.to_datetime(timestamp, unit='s') if isinstance(timestamp, (int, float)) else pd.Timestamp(timestamp)
+        ts_str = ts.strftime('%Y-%m-%d %H:%M:%S')
+        state = self._state(symbol, ts.strftime('%Y-%m-%d'))
+
+        for col in ('call_oi', 'put_oi', 'call_volume', 'put_volume'):
+            if col not in df.columns:
+                df[col] = 0
+        df['timestamp'] = ts_str
+        df['timestamp_dt'] = ts
+        df['ts_str'] = ts_str
+        df = df.sort_values('strike').reset_index(drop=True)
+
+        # 1-minute OI change against each strike's previous snapshot
+        oi = df.drop_duplicates('strike', keep='last').set_index('strike')[['call_oi', 'put_oi']].astype(float)
+        prev = state['prev_oi'].reindex(df['strike'])
+        df['call_oi_1m'] = (df['call_oi'].to_numpy(dtype=float) - prev['call_oi'].to_numpy()).astype(float)
+        df['put_oi_1m'] = (df['put_oi'].to_numpy(dtype=float) - prev['put_oi'].to_numpy()).astype(float)
+        df[['call_oi_1m', 'put_oi_1m']] = df[['call_oi_1m', 'put_oi_1m']].fillna(0)
+        state['prev_oi'] = pd.concat([state['prev_oi'][~state['prev_oi'].index.isin(oi.index)], oi])
+
+        net_vol = float(df['call_volume'].sum() - df['put_volume'].sum())
+        net_vol_rsi = self.net_vol_rsi.update(symbol, state['day'], net_vol)
+
+        if spot is None:
+            return None
+        enriched, stats = enrich_snapshots(df, {ts_str: spot}, {ts_str: spot_open if spot_open is not None else np.nan},
+                                           lambda s: self._atm_strike(symbol, s), self.r)
+        if stats.empty:
+            return None
+
+        pcr = stats['pcr'].iloc[0]
+        prev_pcr = state['prev_pcr']
+        stats.insert(2, 'pcr_velocity', np.round(pcr - prev_pcr, 4) if prev_pcr is not None else 0.0)
+        stats['net_vol_rsi'] = round(net_vol_rsi, 2)
+        state['prev_pcr'] = pcr
+
+        if store:
+            self.db_manager.store_option_chain(symbol, enriched, date=state['day'])
+            self.db_manager.store_market_stats(symbol, stats)
+        return stats.iloc[0].to_dict()
@@ -1,9 +1,11 @@
 import requests
+from python_engine.utils.metrics_registry import track_call
 
 class TrendlyneClient:
     def __init__(self):
         self.base_url = "https://smartoptions.trendlyne.com/phoenix/api"
 
+    @track_call('trendlyne')
     def get_stock_id_for_symbol(self, symbol):
         # Strip common prefixes
         s = symbol.upper()
@@ -33,6 +35,7 @@ class TrendlyneClient:
             print(f"[Trendlyne] Error fetching stock ID for {symbol}: {e}")
             return None
 
+    @track_call('trendlyne')
     def get_expiry_dates(self, stock_id):
         expiry_url = f"{self.base_url}/fno/get-expiry-dates/?mtype=options&stock_id={stock_id}"
         try:
@@ -43,6 +46,7 @@ class TrendlyneClient:
             print(f"[Trendlyne] Error fetching expiry dates: {e}")
             return []
 
+    @track_call('trendlyne')
     def get_live_oi_data(self, stock_id, expiry_date, min_time, max_time):
         url = f"{self.base_url}/live-oi-data/"
         params = {
@@ -1,5 +1,6 @@
 import upstox_client
 import os
+from python_engine.utils.metrics_registry import track_call
 try:
     from python_engine.engine_config import Config as UpstoxConfig
     UPSTOX_AVAILABLE = True
@@ -24,6 +25,7 @@ class UpstoxClient:
         else:
             print("[UpstoxClient] Not initialized due to missing config or library.")
 
+    @track_call('upstox')
     def get_historical_candle_data(self, instrument_key, interval, to_date, from_date):
         if not self.api_client: return None
         history_api = upstox_client.HistoryV3Api(self.api_client)
@@ -58,6 +60,7 @@ class UpstoxClient:
             print(f"[UpstoxClient] API Error in get_historical_candle_data: {e}")
             return None
 
+    @track_call('upstox')
     def get_intra_day_candle_data(self, instrument_key, interval):
         if not self.api_client: return None
         import upstox_client as upstox_sdk
@@ -88,6 +91,7 @@ class UpstoxClient:
         websocket_api = upstox_client.WebsocketApi(self.api_client)
         return websocket_api.get_market_data_feed_authorize(api_version='2.0')
 
+    @track_call('upstox')
     def get_put_call_option_chain(self, instrument_key, expiry_date):
         if not self.api_client: return None
         options_api = upstox_client.OptionsApi(self.api_client)
@@ -96,6 +100,7 @@ class UpstoxClient:
             expiry_date=expiry_date
         )
 
+    @track_call('upstox')
     def get_ltp(self, instrument_keys):
         """
         Fetches the last traded price for one or more instrument keys.
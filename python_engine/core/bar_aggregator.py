@@ -0,0 +1,156 @@
+import logging
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from python_engine.models.data_models import VolumeBar
+
+# Standardized Logging
+logger = logging.getLogger(__name__)
+
+class _OpenBar:
+    """Mutable OHLCV accumulator for one symbol and interval."""
+    __slots__ = ('bucket', 'open', 'high', 'low', 'close', 'volume')
+
+    def __init__(self, bucket: int, open_: float, high: float, low: float, close: float, volume: float):
+        self.bucket = bucket
+        self.open = open_
+        self.high = high
+        self.low = low
+        self.close = close
+        self.volume = volume
+
+    def update(self, high: float, low: float, close: float, volume: float) -> None:
+        if high > self.high: self.high = high
+        if low < self.low: self.low = low
+        self.close = close
+        self.volume += volume
+
+class BarAggregator:
+    """
+    Builds OHLCV bars in memory from WebSocket ticks.
+
+    Ticks (last price, exchange time, traded quantity) update the open 1-minute bar of
+    their symbol. A bar is closed and handed to `on_bar(symbol, interval, bar)` as soon
+    as a tick from a later minute arrives, or when `close_due` is called after the
+    minute has ended (quiet instruments). Bars for longer intervals (e.g. 3, 5, 15, 60
+    minutes) are rolled up from the closed 1-minute bars, on buckets counted from the
+    09:15 IST session open of each day (a 60-minute bar covers 09:15-10:14, ...); the
+    last bucket of the session closes with the 15:29 minute even when it is shorter.
+    Ticks stamped in a minute that has already closed are counted as late and dropped.
+
+    Attributes:
+        intervals (Tuple[int, ...]): Bar sizes in minutes; always includes 1.
+        grace (float): Seconds past a minute's end before `close_due` closes it.
+    """
+
+    # 09:15 IST (UTC+05:30) as a minute of the UTC day, and the 09:15-15:30 session length
+    SESSION_OPEN_MINUTE = 3 * 60 + 45
+    SESSION_MINUTES = 375
+    DAY_MINUTES = 24 * 60
+
+    def __init__(self, on_bar: Callable[[str, int, VolumeBar], None], intervals: Iterable[int] = (1,), grace: float = 1.0):
+        """
+        Args:
+            on_bar (Callable[[str, int, VolumeBar], None]): Called with (symbol, interval, bar)
+                for every closed bar. May run on the feed thread or the caller of `close_due`.
+            intervals (Iterable[int]): Bar sizes in minutes.
+            grace (float): Seconds to wait for late ticks before `close_due` closes a minute.
+        """
+        self.on_bar = on_bar
+        self.intervals = tuple(sorted(set(int(i) for i in intervals) | {1}))
+        self.grace = grace
+        self._bars: Dict[Tuple[str, int], _OpenBar] = {}
+        self._closed_minute: Dict[str, int] = {}
+        self._last_volume: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self.ticks = 0
+        self.late_ticks = 0
+        self.bars_emitted = 0
+
+    def on_tick(self, symbol: str, price: float, ts: float, quantity: float = 0.0,
+                total_volume: Optional[float] = None) -> None:
+        """
+        Adds one trade / price update.
+
+        Args:
+            symbol (str): Instrument the tick belongs to.
+            price (float): Last traded price.
+            ts (float): Exchange time of the tick in epoch seconds.
+            quantity (float): Last traded quantity (used when no cumulative volume is given).
+            total_volume (Optional[float]): Cumulative day volume; bar volume is its increase.
+        """
+        minute = int(ts) // 60
+        closed: List[Tuple[str, int, VolumeBar]] = []
+        with self._lock:
+            self.ticks += 1
+            if minute <= self._closed_minute.get(symbol, -1):
+                self.late_ticks += 1
+                return
+            if total_volume is not None:
+                previous = self._last_volume.get(symbol)
+                quantity = max(total_volume - previous, 0.0) if previous is not None else 0.0
+                self._last_volume[symbol] = total_volume
+
+            current = self._bars.get((symbol, 1))
+            if current is not None and current.bucket != minute:
+                self._close_minute(symbol, closed)
+                current = None
+            if current is None:
+                self._bars[(symbol, 1)] = _OpenBar(minute, price, price, price, price, quantity)
+            else:
+                current.update(price, price, price, quantity)
+        self._emit(closed)
+
+    def close_due(self, now: Optional[float] = None) -> None:
+        """Closes every open minute that ended more than `grace` seconds before `now`."""
+        now = time.time() if now is None else now
+        closed: List[Tuple[str, int, VolumeBar]] = []
+        with self._lock:
+            for symbol, interval in [k for k in self._bars if k[1] == 1]:
+                bar = self._bars.get((symbol, 1))
+                if bar is not None and (bar.bucket + 1) * 60 + self.grace <= now:
+                    self._close_minute(symbol, closed)
+        self._emit(closed)
+
+    def _close_minute(self, symbol: str, closed: List[Tuple[str, int, VolumeBar]]) -> None:
+        """Closes the symbol's open 1-minute bar and rolls it into the longer intervals."""
+        bar = self._bars.pop((symbol, 1))
+        self._closed_minute[symbol] = bar.bucket
+        closed.append((symbol, 1, self._to_volume_bar(symbol, bar)))
+        since_open = (bar.bucket - self.SESSION_OPEN_MINUTE) % self.DAY_MINUTES
+        for interval in self.intervals[1:]:
+            # Buckets hold their first epoch minute
+            bucket = bar.bucket - since_open % interval
+            key = (symbol, interval)
+            rolled = self._bars.get(key)
+            if rolled is not None and rolled.bucket != bucket:
+                # A gap skipped this bucket's last minute: close it now
+                closed.append((symbol, interval, self._to_volume_bar(symbol, self._bars.pop(key))))
+                rolled = None
+            if rolled is None:
+                rolled = self._bars[key] = _OpenBar(bucket, bar.open, bar.high, bar.low, bar.close, bar.volume)
+            else:
+                rolled.update(bar.high, bar.low, bar.close, bar.volume)
+            if (since_open + 1) % interval == 0 or since_open + 1 == self.SESSION_MINUTES:
+                closed.append((symbol, interval, self._to_volume_bar(symbol, self._bars.pop(key))))
+
+    @staticmethod
+    def _to_volume_bar(symbol: str, bar: _OpenBar) -> VolumeBar:
+        return VolumeBar(symbol=symbol, timestamp=bar.bucket * 60, open=bar.open, high=bar.high,
+                         low=bar.low, close=bar.close, volume=int(bar.volume))
+
+    def _emit(self, closed: List[Tuple[str, int, VolumeBar]]) -> None:
+        for symbol, interval, bar in closed:
+            self.bars_emitted += 1
+            try:
+                self.on_bar(symbol, interval, bar)
+            except Exception as e:
+                logger.error(f"[BarAggregator] on_bar failed for {symbol} ({interval}m): {e}")
+
+    def get_stats(self) -> dict:
+        return {
+            'open_bars': len(self._bars),
+            'ticks': self.ticks,
+            'late_ticks': self.late_ticks,
+            'bars_emitted': self.bars_emitted,
+        }
@@ -0,0 +1,144 @@
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Union
+import numpy as np
+from python_engine.models.data_models import VolumeBar
+
+class BarHistory:
+    """
+    Fixed-capacity ring buffer of one symbol's bars, stored column-wise in NumPy arrays.
+
+    Every value is written twice (at `i % capacity` and `i % capacity + capacity`) so the
+    most recent `len(self)` bars are always one contiguous slice of each array; column
+    reads are zero-copy views.
+    """
+
+    FIELDS = ('open', 'high', 'low', 'close', 'volume', 'atr')
+
+    def __init__(self, symbol: str, capacity: int = 200):
+        """
+        Args:
+            symbol (str): Symbol whose bars are stored.
+            capacity (int): Number of most recent bars kept.
+        """
+        self.symbol = symbol
+        self.capacity = capacity
+        self._columns = {field: np.zeros(2 * capacity) for field in self.FIELDS}
+        self._timestamps = np.zeros(2 * capacity, dtype=np.int64)
+        self._count = 0
+
+    def __len__(self) -> int:
+        return min(self._count, self.capacity)
+
+    @property
+    def last_timestamp(self) -> Optional[int]:
+        return int(self._timestamps[(self._count - 1) % self.capacity]) if self._count else None
+
+    def _write(self, slot: int, bar: VolumeBar) -> None:
+        for field, column in self._columns.items():
+            value = getattr(bar, field, 0.0)
+            column[slot] = column[slot + self.capacity] = value if value is not None else np.nan
+        self._timestamps[slot] = self._timestamps[slot + self.capacity] = int(bar.timestamp)
+
+    def append(self, bar: VolumeBar) -> None:
+        """Adds a bar; a bar with the same timestamp as the last one replaces it (live updates)."""
+        if self._count and int(bar.timestamp) == self.last_timestamp:
+            self._write((self._count - 1) % self.capacity, bar)
+            return
+        self._write(self._count % self.capacity, bar)
+        self._count += 1
+
+    def _window(self) -> slice:
+        start = (self._count - len(self)) % self.capacity
+        return slice(start, start + len(self))
+
+    def column(self, field: str) -> np.ndarray:
+        """Read-only view of one field over the buffered bars, oldest first."""
+        source = self._timestamps if field == 'timestamp' else self._columns[field]
+        view = source[self._window()]
+        view.flags.writeable = False
+        return view
+
+    def bar(self, index: int) -> VolumeBar:
+        n = len(self)
+        if index < 0:
+            index += n
+        if not 0 <= index < n:
+            raise IndexError("history index out of range")
+        slot = self._window().start + index
+        return VolumeBar(
+            symbol=self.symbol,
+            timestamp=int(self._timestamps[slot]),
+            open=float(self._columns['open'][slot]),
+            high=float(self._columns['high'][slot]),
+            low=float(self._columns['low'][slot]),
+            close=float(self._columns['close'][slot]),
+            volume=float(self._columns['volume'][slot]),
+            atr=float(self._columns['atr'][slot]),
+        )
+
+    def view(self) -> 'HistoryView':
+        return HistoryView(self)
+
+class HistoryView(Sequence):
+    """
+    Sequence facade over a BarHistory, exposed to strategy expressions as `history`.
+
+    Indexing materializes a VolumeBar on demand; `column(field)` returns the underlying
+    array view without copying. The view is live: it always reflects the buffer's
+    current contents.
+    """
+
+    __slots__ = ('_buffer',)
+
+    def __init__(self, buffer: BarHistory):
+        self._buffer = buffer
+
+    def __len__(self) -> int:
+        return len(self._buffer)
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[VolumeBar, List[VolumeBar]]:
+        if isinstance(index, slice):
+            return [self._buffer.bar(i) for i in range(*index.indices(len(self._buffer)))]
+        return self._buffer.bar(index)
+
+    def __iter__(self) -> Iterator[VolumeBar]:
+        for i in range(len(self._buffer)):
+            yield self._buffer.bar(i)
+
+    def column(self, field: str) -> np.ndarray:
+        return self._buffer.column(field)
+
+class BarHistoryStore:
+    """
+    Per-symbol BarHistory buffers shared by every consumer in the pipeline.
+
+    `on_append` (e.g. IndicatorEngine.on_bar) sees every appended bar, including ones
+    that replace the last bar in place, so stateful consumers never depend on the
+    buffer's capacity to catch up.
+    """
+
+    def __init__(self, capacity: int = 200, on_append: Optional[Callable[[VolumeBar], None]] = None):
+        self.capacity = capacity
+        self.on_append = on_append
+        self._buffers: Dict[str, BarHistory] = {}
+
+    def get(self, symbol: str) -> BarHistory:
+        buffer = self._buffers.get(symbol)
+        if buffer is None:
+            buffer = self._buffers[symbol] = BarHistory(symbol, self.capacity)
+        return buffer
+
+    def append(self, bar: VolumeBar) -> BarHistory:
+        buffer = self.get(bar.symbol)
+        buffer.append(bar)
+        if self.on_append is not None:
+            self.on_append(bar)
+        return buffer
+
+    def view(self, symbol: str) -> HistoryView:
+        return self.get(symbol).view()
+
+    def reset(self, symbol: Optional[str] = None) -> None:
+        if symbol is None:
+            self._buffers.clear()
+        else:
+            self._buffers.pop(symbol, None)
@@ -0,0 +1,170 @@
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional
+from python_engine.models.data_models import MarketEvent, MessageType
+
+# Standardized Logging
+logger = logging.getLogger(__name__)
+
+class EventBus:
+    """
+    Bounded, per-symbol event queues between the feed threads and the pipeline.
+
+    `publish` may be called from any thread. Each symbol gets its own FIFO queue and
+    its own consumer task on the event loop, so a symbol's events are processed in
+    order while a burst on one symbol does not hold back the others. Updates that only
+    matter in their latest form (option chain and sentiment snapshots) are coalesced:
+    a newer one replaces the pending one and moves to the back of the queue. When a
+    queue is full the oldest pending event is dropped. Queue depth, lag (enqueue to
+    dispatch), coalesced and dropped counts are tracked per symbol.
+
+    Attributes:
+        max_depth (int): Maximum pending events per symbol.
+    """
+
+    COALESCED_TYPES = (MessageType.OPTION_CHAIN_UPDATE, MessageType.SENTIMENT_UPDATE)
+
+    def __init__(self, max_depth: int = 256):
+        """
+        Args:
+            max_depth (int): Maximum pending events per symbol before the oldest is dropped.
+        """
+        self.max_depth = max_depth
+        self._queues: Dict[str, Deque[List[Any]]] = {}
+        self._stats: Dict[str, Dict[str, float]] = {}
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._handler: Optional[Callable[[MarketEvent], None]] = None
+        self._signals: Dict[str, asyncio.Event] = {}
+        self._workers: Dict[str, asyncio.Task] = {}
+        self._stopped: Optional[asyncio.Event] = None
+
+    @staticmethod
+    def _symbol_of(event: MarketEvent) -> str:
+        return event.symbol or (event.candle.symbol if event.candle else None) or '*'
+
+    def _new_stats(self) -> Dict[str, float]:
+        return {'published': 0, 'processed': 0, 'coalesced': 0, 'dropped': 0, 'errors': 0,
+                'max_depth': 0, 'last_lag_ms': 0.0, 'max_lag_ms': 0.0, 'total_lag_ms': 0.0}
+
+    def publish(self, event: MarketEvent) -> None:
+        """
+        Queues an event for its symbol (thread-safe).
+
+        Args:
+            event (MarketEvent): Event to dispatch through the pipeline.
+        """
+        symbol = self._symbol_of(event)
+        with self._lock:
+            queue = self._queues.get(symbol)
+            if queue is None:
+                queue = self._queues[symbol] = deque()
+                self._stats[symbol] = self._new_stats()
+            stats = self._stats[symbol]
+            stats['published'] += 1
+
+            if event.type in self.COALESCED_TYPES:
+                pending = next((entry for entry in reversed(queue) if entry[0].type == event.type), None)
+                if pending is not None:
+                    # The stale snapshot is superseded: the newer one takes its place at the tail
+                    # (keeping its enqueue time, so lag still measures how long the state waited)
+                    queue.remove(pending)
+                    queue.append([event, pending[1]])
+                    stats['coalesced'] += 1
+                    return
+            if len(queue) >= self.max_depth:
+                queue.popleft()
+                stats['dropped'] += 1
+                if stats['dropped'] % 100 == 1:
+                    logger.warning(f"[EventBus] {symbol} queue full ({self.max_depth}); dropped {int(stats['dropped'])} events so far")
+            queue.append([event, time.monotonic()])
+            stats['max_depth'] = max(stats['max_depth'], len(queue))
+            loop = self._loop
+
+        if loop is not None and not loop.is_closed():
+            loop.call_soon_threadsafe(self._wake, symbol)
+
+    def _wake(self, symbol: str) -> None:
+        """Loop thread: ensures the symbol's consumer exists and signals pending work."""
+        if self._handler is None:
+            return
+        signal = self._signals.get(symbol)
+        if signal is None:
+            signal = self._signals[symbol] = asyncio.Event()
+            self._workers[symbol] = asyncio.ensure_future(self._consume(symbol, signal))
+        signal.set()
+
+    async def _consume(self, symbol: str, signal: asyncio.Event) -> None:
+        while True:
+            await signal.wait()
+            signal.clear()
+            while True:
+                with self._lock:
+                    queue = self._queues[symbol]
+                    if not queue:
+                        break
+                    event, enqueued = queue.popleft()
+                    stats = self._stats[symbol]
+                lag_ms = (time.monotonic() - enqueued) * 1000
+                try:
+                    self._handler(event)
+                except Exception as e:
+                    stats['errors'] += 1
+                    logger.error(f"[EventBus] Pipeline failed for {symbol}: {e}")
+                stats['processed'] += 1
+                stats['last_lag_ms'] = lag_ms
+                stats['max_lag_ms'] = max(stats['max_lag_ms'], lag_ms)
+                stats['total_lag_ms'] += lag_ms
+                # Let other symbols' consumers run between events
+                await asyncio.sleep(0)
+
+    async def run(self, handler: Callable[[MarketEvent], None]) -> None:
+        """
+        Dispatches queued events to `handler` until `close` is called.
+
+        Args:
+            handler (Callable[[MarketEvent], None]): Runs one event through the pipeline.
+        """
+        self._handler = handler
+        self._stopped = asyncio.Event()
+        with self._lock:
+            self._loop = asyncio.get_running_loop()
+            pending = [symbol for symbol, queue in self._queues.items() if queue]
+        for symbol in pending:
+            self._wake(symbol)
+        try:
+            await self._stopped.wait()
+        finally:
+            for task in self._workers.values():
+                task.cancel()
+            await asyncio.gather(*self._workers.values(), return_exceptions=True)
+            self._workers.clear()
+            self._signals.clear()
+            with self._lock:
+                self._loop = None
+
+    def close(self) -> None:
+        """Stops `run` (thread-safe); events still queued are left undelivered."""
+        loop = self._loop
+        if loop is not None and self._stopped is not None and not loop.is_closed():
+            loop.call_soon_threadsafe(self._stopped.set)
+
+    def depth(self, symbol: Optional[str] = None) -> int:
+        with self._lock:
+            if symbol is not None:
+                return len(self._queues.get(symbol, ()))
+            return sum(len(queue) for queue in self._queues.values())
+
+    def get_stats(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            result = {}
+            for symbol, stats in self._stats.items():
+                row = dict(stats)
+                row['depth'] = len(self._queues[symbol])
+                row['avg_lag_ms'] = stats['total_lag_ms'] / stats['processed'] if stats['processed'] else 0.0
+                del row['total_lag_ms']
+                result[symbol] = row
+            return result
@@ -1,43 +1,216 @@
+import bisect
 import numpy as np
 import logging
-from typing import List, Dict, Optional, Any
+from collections import deque
+from typing import List, Dict, Optional, Any, Deque, Sequence, Tuple
+from numpy.lib.stride_tricks import sliding_window_view
 from python_engine.models.data_models import MarketEvent, VolumeBar, MessageType
 
 # Standardized Logging
 logger = logging.getLogger(__name__)
 
+def detect_pivots(high: np.ndarray, low: np.ndarray,
+                  windows: Sequence[int] = (3, 5, 10)) -> Dict[int, Tuple[np.ndarray, np.ndarray]]:
+    """
+    Batch pivot detection over a whole candle series for several window sizes at once.
+
+    A bar is a Pivot High for window `w` when its high is >= every high in the
+    `2 * w + 1` bars centred on it (Pivot Low: low <= every low). One sliding-window
+    view over the largest window is shared by all window sizes. Bars without `w`
+    confirmed bars on both sides are never pivots.
+
+    Args:
+        high (np.ndarray): Candle highs in time order.
+        low (np.ndarray): Candle lows in time order.
+        windows (Sequence[int]): Window sizes (bars on each side) to evaluate.
+
+    Returns:
+        Dict[int, Tuple[np.ndarray, np.ndarray]]: window -> (is_pivot_high, is_pivot_low) masks.
+    """
+    high = np.asarray(high, dtype=float)
+    low = np.asarray(low, dtype=float)
+    n = len(high)
+    result = {}
+    if not windows:
+        return result
+
+    widest = max(windows)
+    span = 2 * widest + 1
+    # Pad with NaN so every bar has a full (possibly NaN-filled) window centred on it
+    pad = np.full(widest, np.nan)
+    high_windows = sliding_window_view(np.concatenate([pad, high, pad]), span)
+    low_windows = sliding_window_view(np.concatenate([pad, low, pad]), span)
+
+    for w in windows:
+        is_high = np.zeros(n, dtype=bool)
+        is_low = np.zeros(n, dtype=bool)
+        if n >= 2 * w + 1:
+            cols = slice(widest - w, widest + w + 1)
+            mids = slice(w, n - w)
+            with np.errstate(invalid='ignore'):
+                is_high[mids] = high[mids] >= high_windows[mids, cols].max(axis=1)
+                is_low[mids] = low[mids] <= low_windows[mids, cols].min(axis=1)
+        result[w] = (is_high, is_low)
+    return result
+
+class LevelIndex:
+    """
+    Sorted multiset of price levels with O(log n) insertion, removal and
+    nearest-above / nearest-below queries.
+    """
+
+    def __init__(self):
+        self._levels: List[float] = []
+
+    def __len__(self) -> int:
+        return len(self._levels)
+
+    def add(self, price: float) -> None:
+        bisect.insort(self._levels, price)
+
+    def remove(self, price: float) -> None:
+        i = bisect.bisect_left(self._levels, price)
+        if i < len(self._levels) and self._levels[i] == price:
+            del self._levels[i]
+
+    def above(self, price: float) -> Optional[float]:
+        """Smallest level strictly above `price`."""
+        i = bisect.bisect_right(self._levels, price)
+        return self._levels[i] if i < len(self._levels) else None
+
+    def below(self, price: float) -> Optional[float]:
+        """Largest level strictly below `price`."""
+        i = bisect.bisect_left(self._levels, price)
+        return self._levels[i - 1] if i > 0 else None
+
+    def unique(self) -> List[float]:
+        return sorted(set(self._levels))
+
 class MarketStructureHandler:
     """
     Analyzes Market Structure using vectorized Price Action analysis.
 
+    Highs, lows and timestamps live in a preallocated circular buffer sized for the
+    widest pivot window; per-window monotonic deques track the window max/min so pivot
+    detection is O(1) amortized per bar regardless of the window size. Pivot prices
+    of the primary window are kept in sorted LevelIndex structures for O(log n)
+    hurdle lookups; every other configured window only tracks its pivots and regime.
+
     Attributes:
-        window (int): Rolling window size for pivot detection.
-        history_high (np.ndarray): Buffer for high prices.
-        history_low (np.ndarray): Buffer for low prices.
-        pivots_high (List[Dict[str, Any]]): List of identified Pivot Highs.
-        pivots_low (List[Dict[str, Any]]): List of identified Pivot Lows.
-        resistance_levels (List[float]): Sorted list of resistance hurdles.
-        support_levels (List[float]): Sorted list of support hurdles.
+        window (int): Primary pivot window, used for hurdles and the structure regime.
+        windows (Tuple[int, ...]): Every tracked pivot window, including `window`.
+        max_pivots (int): Number of most recent pivots kept per side.
+        pivots_high (Deque[Dict[str, Any]]): Most recent Pivot Highs of the primary window.
+        pivots_low (Deque[Dict[str, Any]]): Most recent Pivot Lows of the primary window.
+        window_pivots (Dict[int, Tuple[Deque, Deque]]): window -> (Pivot Highs, Pivot Lows).
+        resistance_levels (List[float]): Sorted resistance hurdles (pivots + OI wall).
+        support_levels (List[float]): Sorted support hurdles (pivots + OI wall).
     """
 
-    def __init__(self, window: int = 5):
+    def __init__(self, window: int = 5, max_pivots: int = 10, windows: Sequence[int] = ()):
         """
         Initializes the MarketStructureHandler.
 
         Args:
             window (int): The number of bars on each side to confirm a pivot.
+            max_pivots (int): Number of most recent pivots kept per side.
+            windows (Sequence[int]): Additional pivot windows tracked alongside `window`;
+                their regimes are published in `event.market_structure['regimes']`.
         """
         self.window = window
-        self.history_high = np.array([], dtype=float)
-        self.history_low = np.array([], dtype=float)
-        self.history_ts = np.array([], dtype=int)
-
-        self.pivots_high: List[Dict[str, Any]] = []
-        self.pivots_low: List[Dict[str, Any]] = []
-        self.support_levels: List[float] = []
-        self.resistance_levels: List[float] = []
+        self.windows: Tuple[int, ...] = tuple(sorted({window, *windows}))
+        self.max_pivots = max_pivots
         self.max_history = window * 2 + 1
 
+        # Circular buffer (preallocated) + per-window monotonic deques of bar sequence numbers
+        self._capacity = 2 * max(self.windows) + 1
+        self._high_buf = np.zeros(self._capacity, dtype=float)
+        self._low_buf = np.zeros(self._capacity, dtype=float)
+        self._ts_buf = np.zeros(self._capacity, dtype=np.int64)
+        self._count = 0
+        self._max_high: Dict[int, Deque[int]] = {w: deque() for w in self.windows}
+        self._min_low: Dict[int, Deque[int]] = {w: deque() for w in self.windows}
+
+        self.window_pivots: Dict[int, Tuple[Deque[Dict[str, Any]], Deque[Dict[str, Any]]]] = {
+            w: (deque(), deque()) for w in self.windows
+        }
+        self.pivots_high, self.pivots_low = self.window_pivots[window]
+        self._resistance_index = LevelIndex()
+        self._support_index = LevelIndex()
+        self._oi_wall_above: Optional[float] = None
+        self._oi_wall_below: Optional[float] = None
+
+    def reset(self) -> None:
+        """Clears all buffered bars, pivots and hurdles."""
+        self._count = 0
+        for w in self.windows:
+            self._max_high[w].clear()
+            self._min_low[w].clear()
+            for pivots in self.window_pivots[w]:
+                pivots.clear()
+        self._resistance_index = LevelIndex()
+        self._support_index = LevelIndex()
+        self._oi_wall_above = None
+        self._oi_wall_below = None
+
+    def warm_up(self, high: np.ndarray, low: np.ndarray, timestamps: np.ndarray) -> int:
+        """
+        Seeds the handler from prior bars (e.g. previous trading days) in one batch.
+
+        Pivots of every window are found with one `detect_pivots` call instead of
+        replaying the bars, and the circular buffer is filled with the trailing bars, so
+        the next streamed candle
+        continues exactly where a bar-by-bar run over the same data would be.
+
+        Args:
+            high (np.ndarray): Prior candle highs in time order.
+            low (np.ndarray): Prior candle lows in time order.
+            timestamps (np.ndarray): Prior candle timestamps (epoch seconds).
+
+        Returns:
+            int: Number of pivots seeded (highs + lows).
+        """
+        self.reset()
+        high = np.asarray(high, dtype=float)
+        low = np.asarray(low, dtype=float)
+        timestamps = np.asarray(timestamps, dtype=np.int64)
+        if len(high) == 0:
+            return 0
+
+        for w, (is_high, is_low) in detect_pivots(high, low, self.windows).items():
+            # Streaming never checks the middle of the very first window (see on_event)
+            is_high[:w + 1] = False
+            is_low[:w + 1] = False
+            pivots_high, pivots_low = self.window_pivots[w]
+            primary = w == self.window
+            for mask, prices, pivots, index in (
+                    (is_high, high, pivots_high, self._resistance_index if primary else None),
+                    (is_low, low, pivots_low, self._support_index if primary else None)):
+                idx = np.flatnonzero(mask)
+                # Same de-duplication as streaming: skip a pivot repeating the previous timestamp
+                if len(idx) > 1:
+                    idx = idx[np.concatenate([[True], timestamps[idx[1:]] != timestamps[idx[:-1]]])]
+                for i in idx[-self.max_pivots:]:
+                    self._add_pivot(pivots, index, float(prices[i]), int(timestamps[i]))
+
+        for i in range(max(0, len(high) - self._capacity), len(high)):
+            self._push(high[i], low[i], int(timestamps[i]))
+        return len(self.pivots_high) + len(self.pivots_low)
+
+    @property
+    def resistance_levels(self) -> List[float]:
+        levels = self._resistance_index.unique()
+        if self._oi_wall_above:
+            levels.append(self._oi_wall_above)
+        return sorted(levels)
+
+    @property
+    def support_levels(self) -> List[float]:
+        levels = self._support_index.unique()
+        if self._oi_wall_below:
+            levels.append(self._oi_wall_below)
+        return sorted(levels)
+
     def on_event(self, event: MarketEvent) -> None:
         """
         Processes a market event to update structure.
@@ -47,62 +220,82 @@ class MarketStructureHandler:
         """
         if event.type == MessageType.MARKET_UPDATE and event.candle:
             candle = event.candle
-            self.history_high = np.append(self.history_high, candle.high)
-            self.history_low = np.append(self.history_low, candle.low)
-            self.history_ts = np.append(self.history_ts, candle.timestamp)
-
-            if len(self.history_high) > self.max_history:
-                self.history_high = self.history_high[1:]
-                self.history_low = self.history_low[1:]
-                self.history_ts = self.history_ts[1:]
-                self._calculate_pivots_vectorized()
+            self._push(candle.high, candle.low, candle.timestamp)
+
+            # As before the circular buffer: the first full window is only a seed, checks start
+            # once it slides (so the earliest pivot candidate is bar `window + 1`)
+            for w in self.windows:
+                if self._count > 2 * w + 1:
+                    self._calculate_pivots_vectorized(w)
+            if self._count > self.max_history:
                 self._update_hurdles(event)
 
             # Inject structure into event for downstream handlers
             event.market_structure = self.get_immediate_hurdles(candle.close)
             event.market_structure['regime'] = self.get_structure_sentiment()
+            event.market_structure['regimes'] = {w: self.get_structure_sentiment(w) for w in self.windows}
 
-    def _calculate_pivots_vectorized(self) -> None:
-        """Identifies Pivot Highs and Lows using vectorized numpy operations."""
-        mid_idx = self.window
-
-        # Vectorized check: mid point is higher than all others in window
-        is_pivot_high = np.all(self.history_high[mid_idx] >= self.history_high)
-        if is_pivot_high:
-            price = self.history_high[mid_idx]
-            ts = self.history_ts[mid_idx]
-            if not self.pivots_high or self.pivots_high[-1]["timestamp"] != ts:
-                self.pivots_high.append({"price": price, "timestamp": ts})
-                if len(self.pivots_high) > 10: self.pivots_high.pop(0)
-
-        # Vectorized check: mid point is lower than all others in window
-        is_pivot_low = np.all(self.history_low[mid_idx] <= self.history_low)
-        if is_pivot_low:
-            price = self.history_low[mid_idx]
-            ts = self.history_ts[mid_idx]
-            if not self.pivots_low or self.pivots_low[-1]["timestamp"] != ts:
-                self.pivots_low.append({"price": price, "timestamp": ts})
-                if len(self.pivots_low) > 10: self.pivots_low.pop(0)
+    def _push(self, high: float, low: float, ts: int) -> None:
+        seq = self._count
+        slot = seq % self._capacity
+        self._high_buf[slot] = high
+        self._low_buf[slot] = low
+        self._ts_buf[slot] = ts
+        self._count += 1
+
+        for w in self.windows:
+            max_high, min_low = self._max_high[w], self._min_low[w]
+            while max_high and self._high_buf[max_high[-1] % self._capacity] <= high:
+                max_high.pop()
+            max_high.append(seq)
+            while min_low and self._low_buf[min_low[-1] % self._capacity] >= low:
+                min_low.pop()
+            min_low.append(seq)
+
+            oldest = self._count - (2 * w + 1)
+            while max_high[0] < oldest:
+                max_high.popleft()
+            while min_low[0] < oldest:
+                min_low.popleft()
+
+    def _calculate_pivots_vectorized(self, window: int) -> None:
+        """Checks whether the middle bar of the latest `window` span is a Pivot High / Low."""
+        mid_seq = self._count - 1 - window
+        mid_slot = mid_seq % self._capacity
+        ts = int(self._ts_buf[mid_slot])
+        pivots_high, pivots_low = self.window_pivots[window]
+        primary = window == self.window
+
+        # Mid point is a pivot high when it equals the window max (>= all others)
+        price = self._high_buf[mid_slot]
+        if price >= self._high_buf[self._max_high[window][0] % self._capacity]:
+            if not pivots_high or pivots_high[-1]["timestamp"] != ts:
+                self._add_pivot(pivots_high, self._resistance_index if primary else None, price, ts)
+
+        price = self._low_buf[mid_slot]
+        if price <= self._low_buf[self._min_low[window][0] % self._capacity]:
+            if not pivots_low or pivots_low[-1]["timestamp"] != ts:
+                self._add_pivot(pivots_low, self._support_index if primary else None, price, ts)
+
+    def _add_pivot(self, pivots: Deque[Dict[str, Any]], index: Optional[LevelIndex], price: float, ts: int) -> None:
+        pivots.append({"price": price, "timestamp": ts})
+        if index is not None:
+            index.add(price)
+        if len(pivots) > self.max_pivots:
+            removed = pivots.popleft()
+            if index is not None:
+                index.remove(removed["price"])
 
     def _update_hurdles(self, event: MarketEvent) -> None:
         """
-        Updates support and resistance levels based on pivots and OI Walls.
+        Updates the OI Walls used as institutional hurdles alongside the pivot levels.
 
         Args:
             event (MarketEvent): The event containing sentiment/OI data.
         """
-        self.resistance_levels = sorted(list(set([p["price"] for p in self.pivots_high])))
-        self.support_levels = sorted(list(set([p["price"] for p in self.pivots_low])))
-
-        # Add OI Walls as institutional hurdles
-        if event.sentiment:
-            if event.sentiment.oi_wall_above:
-                self.resistance_levels.append(event.sentiment.oi_wall_above)
-            if event.sentiment.oi_wall_below:
-                self.support_levels.append(event.sentiment.oi_wall_below)
-
-        self.resistance_levels.sort()
-        self.support_levels.sort()
+        sentiment = event.sentiment
+        self._oi_wall_above = sentiment.oi_wall_above if sentiment and sentiment.oi_wall_above else None
+        self._oi_wall_below = sentiment.oi_wall_below if sentiment and sentiment.oi_wall_below else None
 
     def get_immediate_hurdles(self, current_price: float) -> Dict[str, Optional[float]]:
         """
@@ -114,24 +307,35 @@ class MarketStructureHandler:
         Returns:
             Dict[str, Optional[float]]: Keys 'support' and 'resistance'.
         """
-        resistance = next((r for r in self.resistance_levels if r > current_price), None)
-        support = next((s for s in reversed(self.support_levels) if s < current_price), None)
+        resistance = self._resistance_index.above(current_price)
+        wall = self._oi_wall_above
+        if wall is not None and wall > current_price and (resistance is None or wall < resistance):
+            resistance = wall
+
+        support = self._support_index.below(current_price)
+        wall = self._oi_wall_below
+        if wall is not None and wall < current_price and (support is None or wall > support):
+            support = wall
         return {"support": support, "resistance": resistance}
 
-    def get_structure_sentiment(self) -> str:
+    def get_structure_sentiment(self, window: Optional[int] = None) -> str:
         """
         Determines market structure sentiment based on Pivot sequences.
 
+        Args:
+            window (Optional[int]): Pivot window to read (default: the primary window).
+
         Returns:
             str: 'BULLISH', 'BEARISH', or 'SIDEWAYS'.
         """
-        if len(self.pivots_high) < 2 or len(self.pivots_low) < 2:
+        pivots_high, pivots_low = self.window_pivots[window or self.window]
+        if len(pivots_high) < 2 or len(pivots_low) < 2:
             return "SIDEWAYS"
 
-        hh = self.pivots_high[-1]["price"] > self.pivots_high[-2]["price"]
-        hl = self.pivots_low[-1]["price"] > self.pivots_low[-2]["price"]
-        lh = self.pivots_high[-1]["price"] < self.pivots_high[-2]["price"]
-        ll = self.pivots_low[-1]["price"] < self.pivots_low[-2]["price"]
+        hh = pivots_high[-1]["price"] > pivots_high[-2]["price"]
+        hl = pivots_low[-1]["price"] > pivots_low[-2]["price"]
+        lh = pivots_high[-1]["price"] < pivots_high[-2]["price"]
+        ll = pivots_low[-1]["price"] < pivots_low[-2]["price"]
 
         if hh and hl: return "BULLISH"
         if lh and ll: return "BEARISH"
@@ -0,0 +1,215 @@
+import numpy as np
+import logging
+from typing import Dict, List, Optional, Tuple
+from python_engine.models.data_models import MarketEvent, MessageType, OIChange, OIChangeMap
+from python_engine.data.option_chain_frame import OptionChainSnapshot
+
+# Standardized Logging
+logger = logging.getLogger(__name__)
+
+class OIWindow:
+    """
+    Ring buffer of per-strike Call/Put OI, one row per minute, covering `window` minutes.
+
+    Rows are NumPy arrays aligned to a sorted strike axis; pushing a snapshot and
+    reading the windowed deltas are O(strikes). A snapshot for the same minute
+    replaces the previous one (live re-polls).
+    """
+
+    def __init__(self, strikes: np.ndarray, window: int):
+        self.window = window
+        self.capacity = window + 1
+        self.strikes = np.asarray(strikes, dtype=float)
+        self._call = np.full((self.capacity, len(self.strikes)), np.nan)
+        self._put = np.full((self.capacity, len(self.strikes)), np.nan)
+        self._minutes = np.full(self.capacity, -1, dtype=np.int64)
+        self._count = 0
+
+    @property
+    def last_minute(self) -> Optional[int]:
+        return int(self._minutes[(self._count - 1) % self.capacity]) if self._count else None
+
+    def _extend(self, strikes: np.ndarray) -> None:
+        """Re-indexes the buffer onto the union of the current and new strikes."""
+        union = np.union1d(self.strikes, strikes)
+        cols = np.searchsorted(union, self.strikes)
+        for name in ('_call', '_put'):
+            grown = np.full((self.capacity, len(union)), np.nan)
+            grown[:, cols] = getattr(self, name)
+            setattr(self, name, grown)
+        self.strikes = union
+
+    def push(self, minute: int, strikes: np.ndarray, call_oi: np.ndarray, put_oi: np.ndarray) -> None:
+        if not np.array_equal(strikes, self.strikes):
+            if not np.isin(strikes, self.strikes).all():
+                self._extend(strikes)
+            cols = np.searchsorted(self.strikes, strikes)
+            call_row = np.full(len(self.strikes), np.nan)
+            put_row = np.full(len(self.strikes), np.nan)
+            call_row[cols], put_row[cols] = call_oi, put_oi
+            call_oi, put_oi = call_row, put_row
+
+        if self._count and self.last_minute == minute:
+            slot = (self._count - 1) % self.capacity
+        else:
+            slot = self._count % self.capacity
+            self._count += 1
+        self._call[slot] = call_oi
+        self._put[slot] = put_oi
+        self._minutes[slot] = minute
+
+    def deltas(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Returns:
+            Tuple: (call_oi, put_oi, call_delta, put_delta) for the latest minute, deltas
+            measured against the oldest snapshot within the window (NaN-free: 0 if unknown).
+        """
+        last = (self._count - 1) % self.capacity
+        now = self._minutes[last]
+        # Oldest buffered minute still inside the window
+        base = last
+        for back in range(1, min(self._count, self.capacity)):
+            slot = (last - back) % self.capacity
+            if self._minutes[slot] < now - self.window:
+                break
+            base = slot
+        with np.errstate(invalid='ignore'):
+            call_delta = np.nan_to_num(self._call[last] - self._call[base])
+            put_delta = np.nan_to_num(self._put[last] - self._put[base])
+        return self._call[last], self._put[last], call_delta, put_delta
+
+class OIChangeHandler:
+    """
+    Streaming OI Change Tracker (system design: `OIChangeMap`).
+
+    Keeps a per-symbol OIWindow of Call/Put OI and attaches, to every event carrying
+    an option chain, the windowed ΔOI per strike with an Addition / Unwinding /
+    Neutral status, the OI walls and the top-N additions and unwindings on each side.
+
+    Attributes:
+        window (int): ΔOI window in minutes.
+        top_n (int): Number of strikes in each top additions / unwindings list.
+    """
+
+    def __init__(self, window: int = 5, top_n: int = 3):
+        """
+        Args:
+            window (int): ΔOI window in minutes.
+            top_n (int): Size of the top additions / unwindings lists.
+        """
+        self.window = window
+        self.top_n = top_n
+        self._windows: Dict[str, OIWindow] = {}
+        self._latest: Dict[str, OIChangeMap] = {}
+
+    def on_event(self, event: MarketEvent) -> None:
+        """
+        Updates the symbol's OI window from the event's chain and attaches the OIChangeMap.
+
+        Args:
+            event (MarketEvent): Event with an option chain (snapshot or list of strikes).
+        """
+        if event.type not in (MessageType.OPTION_CHAIN_UPDATE, MessageType.MARKET_UPDATE):
+            return
+        symbol = event.symbol or (event.candle.symbol if event.candle else None)
+        arrays = self._chain_arrays(event.option_chain)
+        if symbol is None or arrays is None:
+            return
+
+        minute = int(event.timestamp) // 60
+        window = self._windows.get(symbol)
+        # A new trading day starts a fresh window
+        if window is None or window.last_minute is None or window.last_minute // 1440 != minute // 1440:
+            window = self._windows[symbol] = OIWindow(arrays[0], self.window)
+        window.push(minute, *arrays)
+
+        event.oi_changes = self._latest[symbol] = self._build_map(int(event.timestamp), window)
+
+    def get_latest(self, symbol: str) -> Optional[OIChangeMap]:
+        return self._latest.get(symbol)
+
+    def reset(self, symbol: Optional[str] = None) -> None:
+        if symbol is None:
+            self._windows.clear()
+            self._latest.clear()
+        else:
+            self._windows.pop(symbol, None)
+            self._latest.pop(symbol, None)
+
+    @staticmethod
+    def _chain_arrays(chain) -> Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+        """(strikes, call_oi, put_oi) sorted by strike, or None if there is no usable chain."""
+        if isinstance(chain, OptionChainSnapshot):
+            if 'call_oi' not in chain.fields or 'put_oi' not in chain.fields:
+                return None
+            # Columnar backtest snapshot: zero-copy rows, NaN for strikes not quoted yet
+            return chain.strikes, chain.column('call_oi'), chain.column('put_oi')
+        if not chain:
+            return None
+        by_strike = {}
+        for data in chain:
+            get = data.get if isinstance(data, dict) else (lambda name, d=data: getattr(d, name, None))
+            strike = get('strike')
+            if strike is not None:
+                by_strike[float(strike)] = (get('call_oi'), get('put_oi'))
+        if not by_strike:
+            return None
+        strikes = np.array(sorted(by_strike), dtype=float)
+        values = np.array([by_strike[k] for k in strikes], dtype=float)
+        return strikes, values[:, 0], values[:, 1]
+
+    def _build_map(self, timestamp: int, window: OIWindow) -> OIChangeMap:
+        call_oi, put_oi, call_delta, put_delta = window.deltas()
+        strikes = window.strikes
+        quoted = ~(np.isnan(call_oi) & np.isnan(put_oi))
+
+        def status(delta: np.ndarray) -> np.ndarray:
+            return np.select([delta > 0, delta < 0], ["Addition", "Unwinding"], default="Neutral")
+
+        call_status, put_status = status(call_delta), status(put_delta)
+        wall_type = np.full(len(strikes), None, dtype=object)
+        resistance = support = None
+        if not np.isnan(call_oi).all():
+            i = int(np.nanargmax(call_oi))
+            resistance, wall_type[i] = float(strikes[i]), "Resistance"
+        if not np.isnan(put_oi).all():
+            i = int(np.nanargmax(put_oi))
+            support, wall_type[i] = float(strikes[i]), "Support"
+
+        changes: List[OIChange] = []
+        position = np.full(len(strikes), -1)
+        for i in np.flatnonzero(quoted):
+            position[i] = len(changes)
+            changes.append(OIChange(
+                strike=float(strikes[i]),
+                call_delta_oi=float(call_delta[i]),
+                put_delta_oi=float(put_delta[i]),
+                call_status=str(call_status[i]),
+                put_status=str(put_status[i]),
+                oi_wall_type=wall_type[i],
+            ))
+
+        return OIChangeMap(
+            timestamp=timestamp,
+            window_minutes=self.window,
+            changes=changes,
+            top_call_additions=self._top(changes, position, call_delta, quoted, largest=True),
+            top_put_additions=self._top(changes, position, put_delta, quoted, largest=True),
+            top_call_unwindings=self._top(changes, position, call_delta, quoted, largest=False),
+            top_put_unwindings=self._top(changes, position, put_delta, quoted, largest=False),
+            resistance_wall=resistance,
+            support_wall=support,
+        )
+
+    def _top(self, changes: List[OIChange], position: np.ndarray, delta: np.ndarray,
+             quoted: np.ndarray, largest: bool) -> List[OIChange]:
+        """Top-N strikes by ΔOI (additions: largest increases; unwindings: largest decreases)."""
+        score = np.where(quoted, delta if largest else -delta, 0.0)
+        candidates = np.flatnonzero(score > 0)
+        if len(candidates) > self.top_n:
+            # Keep everything tied with the N-th largest so the strike tie-break below is exact
+            cutoff = np.partition(score[candidates], len(candidates) - self.top_n)[len(candidates) - self.top_n]
+            candidates = candidates[score[candidates] >= cutoff]
+        # Largest change first; ties by strike
+        ordered = candidates[np.lexsort((candidates, -score[candidates]))][:self.top_n]
+        return [changes[position[i]] for i in ordered]
@@ -1,13 +1,20 @@
-from typing import Dict, List
+from typing import Dict, List, Optional
 from python_engine.models.data_models import MarketEvent, OptionChainData, MessageType
+from python_engine.data.option_chain_frame import OptionChainSnapshot
 
 class OptionChainHandler:
     def __init__(self):
         self._latest_option_chain: Dict[int, OptionChainData] = {}
+        # Columnar snapshot (backtest); materialized into the dict only when requested
+        self._latest_snapshot: Optional[OptionChainSnapshot] = None
 
     def on_event(self, event: MarketEvent):
         if event.type in (MessageType.OPTION_CHAIN_UPDATE, MessageType.MARKET_UPDATE):
-            if event.option_chain:
+            if isinstance(event.option_chain, OptionChainSnapshot):
+                # Already the latest row per strike as of this bar
+                self._latest_snapshot = event.option_chain
+            elif event.option_chain:
+                self._merge_snapshot()
                 for data in event.option_chain:
                     strike = getattr(data, 'strike', data.get('strike')) if not isinstance(data, dict) else data.get('strike')
                     if strike is not None:
@@ -19,5 +26,15 @@ class OptionChainHandler:
                         else:
                             self._latest_option_chain[strike] = data
 
+    def _merge_snapshot(self):
+        if self._latest_snapshot is not None:
+            for data in self._latest_snapshot:
+                self._latest_option_chain[data.strike] = data
+            self._latest_snapshot = None
+
+    def get_latest_snapshot(self) -> Optional[OptionChainSnapshot]:
+        return self._latest_snapshot
+
     def get_latest_option_chain(self) -> Dict[int, OptionChainData]:
+        self._merge_snapshot()
         return self._latest_option_chain
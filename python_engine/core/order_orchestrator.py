@@ -1,11 +1,11 @@
 import uuid
-from asteval import Interpreter
+import logging
 from data_sourcing.data_manager import DataManager
 from python_engine.models.data_models import PatternState, PatternDefinition, MarketEvent, VolumeBar
 from python_engine.models.trade import Position, Trade, TradeSide, TradeOutcome
 from python_engine.core.trade_logger import TradeLog
 from python_engine.utils.dot_dict import DotDict
-from python_engine.utils.mvel_functions import MVEL_FUNCTIONS
+from python_engine.utils.expression_compiler import compile_expression
 from python_engine.utils.symbol_master import MASTER as SymbolMaster
 
 
@@ -15,7 +15,6 @@ class OrderOrchestrator:
         self._data_manager = data_manager
         self._mode = mode
         self._open_positions = {}
-        self._asteval = Interpreter(symtable=MVEL_FUNCTIONS)
 
     def on_event(self, event: MarketEvent):
         # 1. If this event IS the instrument we have a position in (e.g. the Option itself)
@@ -90,6 +89,15 @@ class OrderOrchestrator:
         return None, None, None
 
 
+    @staticmethod
+    def _evaluate(expression: str, context: dict):
+        """Evaluates a pre-compiled execution expression; errors yield None."""
+        try:
+            return compile_expression(expression).evaluate(context)
+        except Exception as e:
+            logging.error(f"Error evaluating execution expression '{expression}': {e}")
+            return None
+
     def execute_trade(self, state: PatternState, definition: PatternDefinition, candle, history, prev_candle):
         # Allow multiple strategies to trade the same underlying, but only one position per strategy-underlying pair
         pos_key_prefix = f"{state.symbol}_{definition.pattern_id}"
@@ -98,7 +106,7 @@ class OrderOrchestrator:
         if pattern_underlying_open:
             return
 
-        self._asteval.symtable.update({
+        context = {
             'candle': candle,
             'vars': DotDict(state.captured_variables),
             'history': history,
@@ -107,12 +115,12 @@ class OrderOrchestrator:
             'high': candle.high,
             'low': candle.low,
             'open': candle.open
-        })
+        }
 
-        spot_entry_price = self._asteval.eval(definition.execution.entry)
-        spot_stop_loss = self._asteval.eval(definition.execution.sl)
-        self._asteval.symtable.update({'entry': spot_entry_price, 'sl': spot_stop_loss})
-        spot_take_profit = self._asteval.eval(definition.execution.tp)
+        spot_entry_price = self._evaluate(definition.execution.entry, context)
+        spot_stop_loss = self._evaluate(definition.execution.sl, context)
+        context.update({'entry': spot_entry_price, 'sl': spot_stop_loss})
+        spot_take_profit = self._evaluate(definition.execution.tp, context)
 
         side = TradeSide(definition.execution.side.upper())
         original_side = side
@@ -153,7 +161,7 @@ class OrderOrchestrator:
 
                 # We need a simple way to estimate the option's SL/TP from the index's SL/TP.
                 # Using a fixed delta is a common approximation.
-                delta = self._data_manager.get_option_delta(symbol_to_trade)
+                delta = self._data_manager.get_option_delta(instrument_key_to_trade, state.symbol, candle.timestamp)
                 price_difference_sl = abs(spot_entry_price - spot_stop_loss)
                 price_difference_tp = abs(spot_take_profit - spot_entry_price)
 
@@ -1,15 +1,26 @@
 import json
+import logging
 import os
-from typing import Dict, Optional
-from python_engine.models.data_models import MarketEvent, MessageType, PatternDefinition
+from typing import Dict, Optional, Sequence
+from python_engine.models.data_models import MarketEvent, MessageType, PatternDefinition, Sentiment, VolumeBar
 from python_engine.core.pattern_state_machine import PatternStateMachine
+from python_engine.core.bar_history import BarHistoryStore
+from python_engine.core.vectorized_pattern_evaluator import VectorizedPatternEvaluator, PatternTrigger
 from python_engine.core.price_registry import PriceRegistry
 from python_engine.utils.dataclass_factory import from_dict
+from python_engine.utils.expression_compiler import compile_definition
+from python_engine.utils.indicator_engine import INDICATORS
+
+logger = logging.getLogger(__name__)
 
 class PatternMatcherHandler:
-    def __init__(self, strategies_dir: str):
+    def __init__(self, strategies_dir: str, bar_history: Optional[BarHistoryStore] = None):
         self._pattern_definitions = self._load_patterns(strategies_dir)
+        # One ring buffer per symbol, shared by every strategy's machine
+        self._bar_history = bar_history or BarHistoryStore(on_append=INDICATORS.on_bar)
         self._active_state_machines: Dict[str, PatternStateMachine] = {}
+        # (symbol, bar timestamp) -> precomputed trigger, when a vectorized plan is active
+        self._planned_triggers: Optional[Dict[tuple, PatternTrigger]] = None
 
     def _load_patterns(self, strategies_dir: str) -> Dict[str, PatternDefinition]:
         definitions = {}
@@ -17,21 +28,61 @@ class PatternMatcherHandler:
             if filename.endswith(".json"):
                 with open(os.path.join(strategies_dir, filename)) as f:
                     data = json.load(f)
-                    definitions[data["pattern_id"]] = from_dict(PatternDefinition, data)
+                    definition = from_dict(PatternDefinition, data)
+                    # Parse and validate every expression once; machines share the compiled forms
+                    compile_definition(definition)
+                    definitions[data["pattern_id"]] = definition
         return definitions
 
+    def plan_backtest(self, bars: Sequence[VolumeBar], sentiments: Sequence[Optional[Sentiment]]) -> int:
+        """
+        Precomputes every trigger of a backtest with the vectorized evaluator; subsequent
+        events for these bars replay the plan instead of stepping the machines.
+
+        Args:
+            bars (Sequence[VolumeBar]): Backtest candles in time order.
+            sentiments (Sequence[Optional[Sentiment]]): Sentiment aligned to each bar.
+
+        Returns:
+            int: Number of triggers found.
+        """
+        if not VectorizedPatternEvaluator.supports(self._pattern_definitions):
+            # Strategies reading per-event pipeline output (e.g. oi_changes) are stepped bar by bar
+            logger.info("[PatternMatcherHandler] Strategies reference streaming-only inputs; vectorized plan skipped.")
+            return 0
+        plan = VectorizedPatternEvaluator(self._pattern_definitions, self._bar_history.capacity).plan(bars, sentiments)
+        self._planned_triggers = {(bars[i].symbol, bars[i].timestamp): trigger for i, trigger in plan.items()}
+        return len(plan)
+
+    def clear_plan(self) -> None:
+        self._planned_triggers = None
+
+    def _replay_plan(self, event: MarketEvent, candle) -> None:
+        trigger = self._planned_triggers.get((candle.symbol, candle.timestamp))
+        if trigger:
+            machine = PatternStateMachine.from_snapshot(
+                trigger.definition, candle.symbol, trigger.state, trigger.history, trigger.prev_candle
+            )
+            self._active_state_machines[f"{candle.symbol}:{trigger.definition.pattern_id}"] = machine
+            event.triggered_machine = machine
+
     def on_event(self, event: MarketEvent):
         event.triggered_machine = None
         if event.type in (MessageType.MARKET_UPDATE, MessageType.CANDLE_UPDATE):
             candle = event.candle
             if candle:
                 PriceRegistry.update_price(candle.symbol, candle.close)
+                self._bar_history.append(candle)
+                if self._planned_triggers is not None:
+                    self._replay_plan(event, candle)
+                    return
                 for definition in self._pattern_definitions.values():
                     machine_key = f"{candle.symbol}:{definition.pattern_id}"
                     state_machine = self._active_state_machines.setdefault(
-                        machine_key, PatternStateMachine(definition, candle.symbol)
+                        machine_key, PatternStateMachine(definition, candle.symbol,
+                                                         history=self._bar_history.view(candle.symbol))
                     )
-                    state_machine.evaluate(candle, event.sentiment, event.screener_data)
+                    state_machine.evaluate(candle, event.sentiment, event.screener_data, event.oi_changes)
                     if state_machine.is_triggered():
                         event.triggered_machine = state_machine
                         state_machine.consume_trigger()
@@ -1,25 +1,40 @@
-from python_engine.models.data_models import PatternDefinition, PatternState, VolumeBar, Sentiment, Phase
-from python_engine.utils.mvel_functions import MVEL_FUNCTIONS
+from python_engine.models.data_models import PatternDefinition, PatternState, VolumeBar, Sentiment, Phase, OIChangeMap
+from python_engine.utils.expression_compiler import compile_expression
 from python_engine.utils.dot_dict import DotDict
-from typing import Dict, Optional, List
+from python_engine.core.bar_history import BarHistory
+from typing import Dict, Optional, List, Sequence
 import logging
-from asteval import Interpreter
 
 class PatternStateMachine:
-    def __init__(self, definition: PatternDefinition, symbol: str, initial_state: Optional[PatternState] = None):
+    def __init__(self, definition: PatternDefinition, symbol: str, initial_state: Optional[PatternState] = None,
+                 history: Optional[Sequence[VolumeBar]] = None):
         self._definition = definition
         self._symbol = symbol
         self._state = initial_state if initial_state else PatternState(definition.pattern_id, symbol, definition.phases[0].id)
         self._is_triggered = False
-        self._history: List[VolumeBar] = []
-        self._prev_candle: Optional[VolumeBar] = None
         self._MAX_HISTORY = 200
-        self._asteval = Interpreter(symtable=MVEL_FUNCTIONS)
+        # A shared history is appended by its owner (PatternMatcherHandler); standalone machines keep their own
+        if history is None:
+            self._own_history: Optional[BarHistory] = BarHistory(symbol, self._MAX_HISTORY)
+            self._history: Sequence[VolumeBar] = self._own_history.view()
+        else:
+            self._own_history = None
+            self._history = history
+        self._prev_candle: Optional[VolumeBar] = None
+        self._context: Dict[str, object] = {}
+
+    @classmethod
+    def from_snapshot(cls, definition: PatternDefinition, symbol: str, state: PatternState,
+                      history: Sequence[VolumeBar], prev_candle: Optional[VolumeBar]) -> 'PatternStateMachine':
+        """Rebuilds a machine at a known state (used by the vectorized backtest planner)."""
+        machine = cls(definition, symbol, initial_state=state, history=history)
+        machine._prev_candle = prev_candle
+        return machine
 
-    def evaluate(self, candle: VolumeBar, sentiment: Sentiment, screener_data: Dict[str, float]):
-        self._history.append(candle)
-        if len(self._history) > self._MAX_HISTORY:
-            self._history.pop(0)
+    def evaluate(self, candle: VolumeBar, sentiment: Sentiment, screener_data: Dict[str, float],
+                 oi_changes: Optional[OIChangeMap] = None):
+        if self._own_history is not None:
+            self._own_history.append(candle)
 
         current_phase = self._get_current_phase()
         if not current_phase:
@@ -33,7 +48,7 @@ class PatternStateMachine:
             if regime_config and hasattr(regime_config, 'allow_entry') and not regime_config.allow_entry:
                 return
 
-        self._build_context(candle, sentiment, screener_data)
+        self._build_context(candle, sentiment, screener_data, oi_changes)
 
         if self._check_conditions(current_phase.conditions):
             self._capture_variables(current_phase.capture)
@@ -51,7 +66,7 @@ class PatternStateMachine:
 
         for condition in conditions:
             try:
-                if not self._asteval.eval(condition):
+                if not compile_expression(condition).evaluate(self._context):
                     return False
             except Exception as e:
                 logging.error(f"Error evaluating condition '{condition}': {e}")
@@ -64,24 +79,28 @@ class PatternStateMachine:
 
         for name, expression in captures.items():
             try:
-                value = self._asteval.eval(expression)
+                value = compile_expression(expression).evaluate(self._context)
                 if isinstance(value, (int, float)):
                     self._state.capture(name, float(value))
             except Exception as e:
                 logging.error(f"Error capturing variable '{name}': {e}")
 
-    def _build_context(self, candle: VolumeBar, sentiment: Sentiment, screener_data: Dict[str, float]):
-        self._asteval.symtable['candle'] = candle
-        self._asteval.symtable['sentiment'] = sentiment
-        self._asteval.symtable['vars'] = DotDict(self._state.captured_variables)
-        self._asteval.symtable['screener'] = screener_data or {}
-        self._asteval.symtable['prev_candle'] = self._prev_candle or candle
-        self._asteval.symtable['history'] = self._history
-        self._asteval.symtable['volume'] = float(candle.volume)
-        self._asteval.symtable['close'] = candle.close
-        self._asteval.symtable['high'] = candle.high
-        self._asteval.symtable['low'] = candle.low
-        self._asteval.symtable['open'] = candle.open
+    def _build_context(self, candle: VolumeBar, sentiment: Sentiment, screener_data: Dict[str, float],
+                       oi_changes: Optional[OIChangeMap] = None):
+        self._context = {
+            'candle': candle,
+            'sentiment': sentiment,
+            'vars': DotDict(self._state.captured_variables),
+            'screener': screener_data or {},
+            'prev_candle': self._prev_candle or candle,
+            'history': self._history,
+            'volume': float(candle.volume),
+            'close': candle.close,
+            'high': candle.high,
+            'low': candle.low,
+            'open': candle.open,
+            'oi_changes': oi_changes,
+        }
 
     def _get_current_phase(self) -> Optional[Phase]:
         for phase in self._definition.phases:
@@ -121,7 +140,7 @@ class PatternStateMachine:
         return self._definition
 
     @property
-    def history(self) -> List[VolumeBar]:
+    def history(self) -> Sequence[VolumeBar]:
         return self._history
 
     @property
@@ -0,0 +1,185 @@
+import json
+import logging
+import threading
+import time
+from typing import Any, Dict, List, Optional, Sequence
+from python_engine.models.data_models import MarketEvent
+
+# Standardized Logging
+logger = logging.getLogger(__name__)
+
+class LatencyHistogram:
+    """
+    HDR-style log-linear histogram of integer durations (microseconds).
+
+    Values below 2**SUB_BITS get one bucket each; above that, every power-of-two range
+    is split into 2**(SUB_BITS - 1) equal buckets, so any recorded value is known to
+    within ~3% at a fixed memory cost. Recording is an index computation and an
+    increment; percentiles walk the buckets.
+    """
+
+    SUB_BITS = 6
+    MAX_EXPONENT = 40
+
+    _SUB = 1 << SUB_BITS
+    _HALF = _SUB >> 1
+
+    def __init__(self):
+        self.counts: List[int] = [0] * (self._SUB + self.MAX_EXPONENT * self._HALF)
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+    def _index(self, value: int) -> int:
+        if value < self._SUB:
+            return value
+        exp = min(value.bit_length() - self.SUB_BITS, self.MAX_EXPONENT)
+        return self._SUB + (exp - 1) * self._HALF + min((value >> exp) - self._HALF, self._HALF - 1)
+
+    def _value_at(self, index: int) -> int:
+        """Upper bound of a bucket."""
+        if index < self._SUB:
+            return index
+        exp = (index - self._SUB) // self._HALF + 1
+        mantissa = (index - self._SUB) % self._HALF + self._HALF
+        return ((mantissa + 1) << exp) - 1
+
+    def record(self, value: int) -> None:
+        value = int(value) if value > 0 else 0
+        self.counts[value if value < self._SUB else self._index(value)] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def percentile(self, q: float) -> int:
+        """Value at or below which `q` percent of the recordings fall (bucket upper bound)."""
+        if not self.count:
+            return 0
+        rank = max(1, int(round(q / 100.0 * self.count)))
+        seen = 0
+        for index, n in enumerate(self.counts):
+            seen += n
+            if n and seen >= rank:
+                return min(self._value_at(index), self.max)
+        return self.max
+
+    def reset(self) -> None:
+        self.__init__()
+
+    def summary(self) -> Dict[str, float]:
+        """Count plus mean / p50 / p90 / p99 / max in microseconds."""
+        return {
+            'count': self.count,
+            'mean_us': round(self.total / self.count, 1) if self.count else 0.0,
+            'p50_us': self.percentile(50),
+            'p90_us': self.percentile(90),
+            'p99_us': self.percentile(99),
+            'max_us': self.max,
+        }
+
+class PipelineMetrics:
+    """
+    Per-handler latency, event and exception counts for the TradingEngine pipeline.
+
+    `dispatch` runs an event through the handlers, timing each `on_event` call into the
+    handler's LatencyHistogram. Events that end in a signal (a triggered pattern)
+    also record the whole pipeline pass and, when `track_event_age` is on (live), the
+    age of the event at signal time: wall clock minus the event timestamp, which for
+    bar events includes the bar's own interval.
+
+    Attributes:
+        enabled (bool): Record timings; when off, `dispatch` is a plain handler loop.
+        track_event_age (bool): Record event timestamp to signal latency.
+    """
+
+    SIGNAL = 'pipeline_to_signal'
+    EVENT_AGE = 'event_to_signal'
+
+    def __init__(self, enabled: bool = True, track_event_age: bool = False):
+        """
+        Args:
+            enabled (bool): Record timings.
+            track_event_age (bool): Record event timestamp to signal latency (live feeds).
+        """
+        self.enabled = enabled
+        self.track_event_age = track_event_age
+        self._histograms: Dict[str, LatencyHistogram] = {}
+        self._errors: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def _histogram(self, name: str) -> LatencyHistogram:
+        histogram = self._histograms.get(name)
+        if histogram is None:
+            histogram = self._histograms.setdefault(name, LatencyHistogram())
+            self._errors.setdefault(name, 0)
+        return histogram
+
+    def dispatch(self, pipeline: Sequence[Any], event: MarketEvent) -> None:
+        """
+        Runs `event` through `pipeline` in order, recording per-handler wall time.
+
+        Args:
+            pipeline (Sequence[Any]): Handlers exposing `on_event(event)`.
+            event (MarketEvent): Event to process. Handler exceptions are counted and re-raised.
+        """
+        if not self.enabled:
+            for handler in pipeline:
+                handler.on_event(event)
+            return
+
+        clock = time.perf_counter_ns
+        marks = [clock()]
+        try:
+            for handler in pipeline:
+                handler.on_event(event)
+                marks.append(clock())
+        except Exception:
+            marks.append(clock())
+            with self._lock:
+                self._record(pipeline, marks)
+                self._errors[type(pipeline[len(marks) - 2]).__name__] += 1
+            raise
+
+        with self._lock:
+            self._record(pipeline, marks)
+            if event.triggered_machine is not None:
+                self._histogram(self.SIGNAL).record((marks[-1] - marks[0]) // 1000)
+                if self.track_event_age and event.timestamp:
+                    self._histogram(self.EVENT_AGE).record(int((time.time() - event.timestamp) * 1_000_000))
+
+    def _record(self, pipeline: Sequence[Any], marks: List[int]) -> None:
+        """Records the handler durations between consecutive clock marks (lock held)."""
+        for handler, before, after in zip(pipeline, marks, marks[1:]):
+            self._histogram(type(handler).__name__).record((after - before) // 1000)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._histograms.clear()
+            self._errors.clear()
+
+    def get_stats(self) -> Dict[str, Dict[str, float]]:
+        """Summary per handler (and per signal latency): count, errors, mean, p50, p90, p99, max."""
+        with self._lock:
+            stats = {}
+            for name, histogram in self._histograms.items():
+                stats[name] = histogram.summary()
+                stats[name]['errors'] = self._errors.get(name, 0)
+            return stats
+
+    def dump(self, path: Optional[str] = None) -> None:
+        """
+        Logs a per-handler latency table and optionally writes the stats as JSON.
+
+        Args:
+            path (Optional[str]): JSON file to write; logs only when None.
+        """
+        stats = self.get_stats()
+        lines = [f"{'handler':<28}{'count':>9}{'errors':>8}{'mean_us':>10}{'p50_us':>9}{'p99_us':>9}{'max_us':>10}"]
+        for name, row in stats.items():
+            lines.append(f"{name:<28}{row['count']:>9}{row['errors']:>8}{row['mean_us']:>10}{row['p50_us']:>9}{row['p99_us']:>9}{row['max_us']:>10}")
+        logger.info("[PipelineMetrics] Handler latency:\n" + "\n".join(lines))
+        if path:
+            with open(path, 'w') as f:
+                json.dump(stats, f, indent=2)
+            logger.info(f"[PipelineMetrics] Wrote latency stats to {path}")
@@ -12,11 +12,13 @@ class SentimentHandler:
         if event.type in (MessageType.MARKET_UPDATE, MessageType.SENTIMENT_UPDATE):
             sentiment = event.sentiment
             if sentiment:
-                regime = sentiment.regime
-                if regime is None:
-                    regime = self._determine_regime(sentiment)
-                    sentiment.regime = regime
-                self._current_regime = regime
+                self._current_regime = self.ensure_regime(sentiment)
+
+    def ensure_regime(self, sentiment: Sentiment) -> str:
+        """Classifies `sentiment` once, storing the regime on it."""
+        if sentiment.regime is None:
+            sentiment.regime = self._determine_regime(sentiment)
+        return sentiment.regime
 
     def get_regime(self) -> str:
         return self._current_regime
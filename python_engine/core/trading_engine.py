@@ -6,10 +6,17 @@ from python_engine.models.data_models import MarketEvent, MessageType, VolumeBar
 from python_engine.core.market_structure_handler import MarketStructureHandler
 from python_engine.core.sentiment_handler import SentimentHandler
 from python_engine.core.option_chain_handler import OptionChainHandler
+from python_engine.core.oi_change_handler import OIChangeHandler
 from python_engine.core.pattern_matcher_handler import PatternMatcherHandler
+from python_engine.core.bar_history import BarHistoryStore
 from python_engine.core.execution_handler import ExecutionHandler
+from python_engine.core.event_bus import EventBus
+from python_engine.core.pipeline_metrics import PipelineMetrics
+from python_engine.utils.metrics_registry import MetricsRegistry, hit_ratio
 from python_engine.data.repository import DataRepository
 from python_engine.utils.atr_calculator import calculate_atr
+from python_engine.engine_config import Config
+from python_engine.utils.indicator_engine import INDICATORS
 
 # Standardized Logging
 logger = logging.getLogger(__name__)
@@ -36,10 +43,14 @@ class TradingEngine:
         self.order_orchestrator = order_orchestrator
 
         # Initialize Core Analysis Pipeline
-        self.market_structure = MarketStructureHandler()
+        self.market_structure = MarketStructureHandler(window=Config.get('structure_pivot_window', 5),
+                                                       windows=Config.get('structure_pivot_windows', (3, 5, 10)))
         self.sentiment_handler = SentimentHandler()
         self.option_chain_handler = OptionChainHandler()
-        self.pattern_matcher = PatternMatcherHandler(strategy_dir)
+        self.oi_change_handler = OIChangeHandler(window=Config.get('oi_change_window', 5), top_n=Config.get('oi_change_top_n', 3))
+        # Per-symbol bar history shared by every strategy in the pipeline
+        self.bar_history = BarHistoryStore(capacity=200, on_append=INDICATORS.on_bar)
+        self.pattern_matcher = PatternMatcherHandler(strategy_dir, bar_history=self.bar_history)
         self.execution_handler = ExecutionHandler(order_orchestrator, data_manager)
         from python_engine.core.trend_oi_strategy_handler import TrendOIStrategyHandler
         self.trend_oi_strategy = TrendOIStrategyHandler(order_orchestrator)
@@ -48,19 +59,25 @@ class TradingEngine:
         self.pipeline = [
             self.market_structure,
             self.option_chain_handler,
+            self.oi_change_handler,
             self.sentiment_handler,
             self.pattern_matcher,
             self.trend_oi_strategy,
             self.execution_handler
         ]
+        # Per-handler latency histograms, event and exception counts
+        self.metrics = PipelineMetrics(enabled=Config.get('pipeline_metrics', True))
 
-    def run_backtest(self, symbol: str, candles_df: pd.DataFrame) -> None:
+    def run_backtest(self, symbol: str, candles_df: pd.DataFrame, vectorized: Optional[bool] = None) -> None:
         """
         Executes a vectorized backtest over a dataframe of historical candles.
 
         Args:
             symbol (str): The symbol to backtest.
             candles_df (pd.DataFrame): Dataframe containing OHLCV data.
+            vectorized (Optional[bool]): Precompute pattern triggers for the whole range with
+                array operations instead of stepping every state machine per bar
+                (defaults to config "vectorized_patterns").
         """
         if candles_df is None or candles_df.empty:
             logger.warning("[TradingEngine] No data provided for backtest.")
@@ -68,73 +85,190 @@ class TradingEngine:
 
         logger.info(f"[TradingEngine] Starting vectorized backtest for {symbol} | {len(candles_df)} bars.")
 
+        # Indicator state from a previous run over this symbol must not leak into this one
+        INDICATORS.reset(symbol)
+        self.bar_history.reset(symbol)
+        self.oi_change_handler.reset(symbol)
+        # Seed pivots/hurdles from prior sessions so structure exists from the first bar
+        self._warm_up_structure(symbol, candles_df.index[0])
+
         # Vectorized pre-calculations
         candles_df = candles_df.copy()
         candles_df['atr'] = calculate_atr(candles_df)
 
-        last_date = None
-        current_option_chain = None
-
-        for timestamp, row in candles_df.iterrows():
-            curr_date = timestamp.date().strftime('%Y-%m-%d')
-
-            # Daily metadata caching
-            if curr_date != last_date:
-                current_option_chain = self.repository.get_option_chain(symbol, curr_date)
-                last_date = curr_date
-
-            # Efficient Sentiment Retrieval (Cached via Repository)
-            stats_dict = self.repository.get_closest_stats(symbol, timestamp)
-            sentiment = None
-            if stats_dict:
-                sentiment = Sentiment(
-                    pcr=stats_dict.get('pcr', 1.0),
-                    pcr_velocity=stats_dict.get('pcr_velocity', 0.0),
-                    oi_wall_above=stats_dict.get('oi_wall_above', 0.0),
-                    oi_wall_below=stats_dict.get('oi_wall_below', 0.0),
-                    smart_trend=stats_dict.get('smart_trend', 'Neutral'),
-                    advances=stats_dict.get('advances', 0),
-                    declines=stats_dict.get('declines', 0),
-                    volume_pcr=stats_dict.get('volume_pcr', 1.0),
-                    net_vol_rsi=stats_dict.get('net_vol_rsi', 50.0)
-                )
+        # Sentiment is aligned to every bar up front (one stats query + as-of join)
+        sentiments = self._build_sentiments(self.repository.get_aligned_stats(symbol, candles_df.index), len(candles_df))
 
-            # Construct Immutable MarketEvent for processing
-            event = MarketEvent(
-                type=MessageType.MARKET_UPDATE,
-                timestamp=int(timestamp.timestamp()),
+        bars = [
+            VolumeBar(
                 symbol=symbol,
-                candle=VolumeBar(
+                timestamp=int(timestamp.timestamp()),
+                open=row['open'],
+                high=row['high'],
+                low=row['low'],
+                close=row['close'],
+                volume=row['volume'],
+                atr=row['atr']
+            )
+            for timestamp, row in candles_df.iterrows()
+        ]
+
+        if vectorized is None:
+            vectorized = Config.get('vectorized_patterns', False)
+        if vectorized:
+            # Regimes are classified up front so the planner sees what SentimentHandler would set
+            for sentiment in sentiments:
+                if sentiment is not None:
+                    self.sentiment_handler.ensure_regime(sentiment)
+            n_triggers = self.pattern_matcher.plan_backtest(bars, sentiments)
+            logger.info(f"[TradingEngine] Vectorized pattern plan: {n_triggers} triggers over {len(bars)} bars.")
+
+        last_date = None
+        chain_frame = None
+
+        try:
+            for i, timestamp in enumerate(candles_df.index):
+                curr_date = timestamp.date().strftime('%Y-%m-%d')
+
+                # Daily metadata caching: one columnar chain per day, sliced per bar
+                if curr_date != last_date:
+                    chain_frame = self.repository.get_option_chain_frame(symbol, curr_date)
+                    last_date = curr_date
+
+                # Construct Immutable MarketEvent for processing
+                event = MarketEvent(
+                    type=MessageType.MARKET_UPDATE,
+                    timestamp=bars[i].timestamp,
                     symbol=symbol,
-                    timestamp=int(timestamp.timestamp()),
-                    open=row['open'],
-                    high=row['high'],
-                    low=row['low'],
-                    close=row['close'],
-                    volume=row['volume'],
-                    atr=row['atr']
-                ),
-                sentiment=sentiment,
-                option_chain=current_option_chain
+                    candle=bars[i],
+                    sentiment=sentiments[i],
+                    option_chain=chain_frame.snapshot_at(bars[i].timestamp) if chain_frame is not None else None
+                )
+
+                # Process through the sequential pipeline
+                self.dispatch(event)
+        finally:
+            if vectorized:
+                self.pattern_matcher.clear_plan()
+
+        dump = Config.get('dump_pipeline_metrics', False)
+        if dump:
+            self.metrics.dump(dump if isinstance(dump, str) else None)
+
+        candle_grid = getattr(self.data_manager, 'candle_grid', None)
+        if candle_grid is not None:
+            stats = candle_grid.get_stats()
+            log = logger.warning if stats['misses'] else logger.info
+            log(f"[TradingEngine] Option candle grid: {stats['hits']} hits, {stats['misses']} misses, {stats['loads']} day loads.")
+
+    def _warm_up_structure(self, symbol: str, first_timestamp: pd.Timestamp) -> None:
+        """
+        Seeds MarketStructureHandler with the trading days before the backtest range.
+
+        Args:
+            symbol (str): The symbol being backtested.
+            first_timestamp (pd.Timestamp): Timestamp of the first backtest bar.
+        """
+        days = Config.get('structure_warmup_days', 2)
+        if not days:
+            self.market_structure.reset()
+            return
+
+        first_day = first_timestamp.normalize()
+        prior = self.repository.get_historical_candles(
+            symbol,
+            from_date=(first_day - pd.Timedelta(days=days * 2 + 4)).strftime('%Y-%m-%d'),
+            to_date=(first_day - pd.Timedelta(days=1)).strftime('%Y-%m-%d')
+        )
+        if prior is None or prior.empty:
+            logger.info(f"[TradingEngine] No prior sessions for {symbol}; market structure starts cold.")
+            self.market_structure.reset()
+            return
+
+        sessions = prior['timestamp'].dt.normalize()
+        prior = prior[sessions.isin(sessions.drop_duplicates().iloc[-days:])]
+        n_pivots = self.market_structure.warm_up(
+            prior['high'].to_numpy(dtype=float),
+            prior['low'].to_numpy(dtype=float),
+            [int(ts.timestamp()) for ts in prior['timestamp']]
+        )
+        logger.info(f"[TradingEngine] Market structure warmed up from {len(prior)} prior bars | {n_pivots} pivots.")
+
+    @staticmethod
+    def _build_sentiments(stats: pd.DataFrame, n_bars: int) -> List[Optional[Sentiment]]:
+        """
+        Builds the per-bar Sentiment column from as-of aligned market stats.
+
+        Args:
+            stats (pd.DataFrame): Output of DataRepository.get_aligned_stats.
+            n_bars (int): Number of bars in the backtest.
+
+        Returns:
+            List[Optional[Sentiment]]: One entry per bar (None where no snapshot exists).
+        """
+        if stats is None or stats.empty or 'timestamp' not in stats.columns:
+            return [None] * n_bars
+
+        def column(name: str, default: Any) -> List[Any]:
+            return stats[name].tolist() if name in stats.columns else [default] * len(stats)
+
+        return [
+            Sentiment(pcr=pcr, pcr_velocity=vel, oi_wall_above=wall_above, oi_wall_below=wall_below,
+                      smart_trend=trend, advances=adv, declines=dec, volume_pcr=vol_pcr, net_vol_rsi=rsi)
+            if matched else None
+            for matched, pcr, vel, wall_above, wall_below, trend, adv, dec, vol_pcr, rsi in zip(
+                stats['timestamp'].notna().tolist(),
+                column('pcr', 1.0),
+                column('pcr_velocity', 0.0),
+                column('oi_wall_above', 0.0),
+                column('oi_wall_below', 0.0),
+                column('smart_trend', 'Neutral'),
+                column('advances', 0),
+                column('declines', 0),
+                column('volume_pcr', 1.0),
+                column('net_vol_rsi', 50.0),
             )
+        ]
 
-            # Process through the sequential pipeline
-            for handler in self.pipeline:
-                handler.on_event(event)
+    def dispatch(self, event: MarketEvent) -> None:
+        """Runs one event through the handler pipeline (timed per handler)."""
+        self.metrics.dispatch(self.pipeline, event)
 
-    async def run_live(self, event_queue: Any) -> None:
+    async def run_live(self, event_bus: EventBus) -> None:
         """
         Main asynchronous loop for live trading ingestion and processing.
 
         Args:
-            event_queue (Any): Asyncio queue consuming real-time market events.
+            event_bus (EventBus): Per-symbol queues fed by the live data sources; runs
+                until `event_bus.close()` is called.
         """
         logger.info("[TradingEngine] Live engine pipeline activated.")
-        while True:
-            event = await event_queue.get()
-            if event is None: break
+        await event_bus.run(self.dispatch)
+
+    def register_metrics(self, registry: MetricsRegistry, event_bus: Optional[EventBus] = None) -> None:
+        """
+        Registers the engine's telemetry providers (pipeline latency, database reads and
+        writes, caches, open positions, event queues) with a MetricsRegistry.
+
+        Args:
+            registry (MetricsRegistry): Registry that snapshots and publishes the stats.
+            event_bus (Optional[EventBus]): Live event queues to report per symbol.
+        """
+        registry.register('pipeline', self.metrics.get_stats, label='handler')
+        registry.register('positions', lambda: {'open_positions': len(getattr(self.order_orchestrator, '_open_positions', {}))})
+
+        db_manager = getattr(self.data_manager, 'db_manager', None)
+        if db_manager is not None:
+            registry.register('db_reads', db_manager.get_read_stats, label='query')
+            registry.register('db_writes', db_manager.get_write_stats, label='table')
+            registry.register('background_writer', lambda: (db_manager.get_write_behind().get_stats() if db_manager.get_write_behind() else {}))
 
-            for handler in self.pipeline:
-                handler.on_event(event)
+        candle_grid = getattr(self.data_manager, 'candle_grid', None)
+        if candle_grid is not None:
+            registry.register('candle_grid', lambda: hit_ratio(candle_grid.get_stats()))
+        sentiment_service = getattr(self.data_manager, 'sentiment_service', None)
+        if sentiment_service is not None:
+            registry.register('sentiment_cache', lambda: hit_ratio(sentiment_service.get_stats()))
 
-            event_queue.task_done()
+        if event_bus is not None:
+            registry.register('event_bus', event_bus.get_stats, label='symbol')
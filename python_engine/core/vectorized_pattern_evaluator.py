@@ -0,0 +1,286 @@
+import ast
+import logging
+from dataclasses import dataclass, fields
+from typing import Any, Dict, List, Optional, Sequence
+import numpy as np
+from python_engine.models.data_models import PatternDefinition, PatternState, Sentiment, VolumeBar
+from python_engine.utils.dot_dict import DotDict
+from python_engine.utils.expression_compiler import compile_expression
+from python_engine.utils.indicator_engine import INDICATORS
+
+logger = logging.getLogger(__name__)
+
+# Names that resolve to per-bar values and can be evaluated column-wise
+_CANDLE_NAMES = ('close', 'high', 'low', 'open', 'volume')
+_VECTOR_NAMES = set(_CANDLE_NAMES) | {'candle', 'sentiment'}
+_VECTOR_NODES = (
+    ast.Expression, ast.Compare, ast.BinOp, ast.UnaryOp, ast.Attribute, ast.Name, ast.Constant, ast.Load,
+    ast.Add, ast.Sub, ast.Mult, ast.UAdd, ast.USub,
+    ast.Eq, ast.NotEq, ast.Lt, ast.LtE, ast.Gt, ast.GtE,
+)
+_OBJECT_FIELDS = {'symbol', 'regime', 'smart_trend'}
+# Context names produced by pipeline handlers at event time, unknown when planning
+_STREAMING_NAMES = {'oi_changes'}
+
+@dataclass
+class PatternTrigger:
+    """Snapshot of a machine at the bar where its last phase completed."""
+    definition: PatternDefinition
+    state: PatternState
+    history: List[VolumeBar]
+    prev_candle: VolumeBar
+
+def _is_vectorizable(source: str) -> bool:
+    """True for stateless comparisons over candle/sentiment fields (no calls, no division)."""
+    try:
+        tree = ast.parse(source.strip(), mode='eval')
+    except SyntaxError:
+        return False
+    for node in ast.walk(tree):
+        if not isinstance(node, _VECTOR_NODES):
+            return False
+        if isinstance(node, ast.Compare) and len(node.ops) != 1:
+            return False
+        if isinstance(node, ast.Name) and node.id not in _VECTOR_NAMES:
+            return False
+        if isinstance(node, ast.Attribute) and not isinstance(node.value, ast.Name):
+            return False
+    return isinstance(tree.body, ast.Compare)
+
+def _references(source: str, name: str) -> bool:
+    return any(isinstance(n, ast.Name) and n.id == name for n in ast.walk(ast.parse(source.strip(), mode='eval')))
+
+class _Columns:
+    """Attribute access over per-bar arrays (stands in for a VolumeBar / Sentiment)."""
+    def __init__(self, columns: Dict[str, np.ndarray]):
+        self.__dict__.update(columns)
+
+class VectorizedPatternEvaluator:
+    """
+    Whole-session pattern evaluation for backtests.
+
+    Each phase's leading stateless conditions (single comparisons over candle and
+    sentiment fields, up to the first condition that is not one) are evaluated once as
+    boolean NumPy arrays over every bar. A scalar replica of PatternStateMachine.evaluate
+    then walks the bars in order, stepping every definition on each bar as the per-bar
+    pipeline does, and only evaluates expressions on bars those masks let through.
+    Walking all definitions bar-synchronously, feeding each bar to INDICATORS and keeping
+    the per-bar condition order means history-based conditions see exactly the
+    indicator state they would see per bar, so triggers match the per-bar machines,
+    including PatternMatcherHandler stopping at the first trigger of a bar.
+    """
+
+    def __init__(self, definitions: Dict[str, PatternDefinition], max_history: int = 200):
+        """
+        Args:
+            definitions (Dict[str, PatternDefinition]): Loaded strategies, in evaluation order.
+            max_history (int): Capacity of the shared per-symbol bar history.
+        """
+        self._definitions = definitions
+        self._max_history = max_history
+
+    @staticmethod
+    def supports(definitions: Dict[str, PatternDefinition]) -> bool:
+        """False if any expression reads a value only available while streaming events."""
+        for definition in definitions.values():
+            sources = [c for phase in definition.phases for c in (phase.conditions or [])]
+            sources += [e for phase in definition.phases for e in (phase.capture or {}).values()]
+            for source in sources:
+                try:
+                    if any(_references(source, name) for name in _STREAMING_NAMES):
+                        return False
+                except SyntaxError:
+                    continue
+        return True
+
+    def plan(self, bars: Sequence[VolumeBar], sentiments: Sequence[Optional[Sentiment]],
+             screener_data: Optional[Dict[str, float]] = None) -> Dict[int, PatternTrigger]:
+        """
+        Computes every trigger over a full backtest.
+
+        Args:
+            bars (Sequence[VolumeBar]): Candles in time order.
+            sentiments (Sequence[Optional[Sentiment]]): Sentiment per bar (None if missing).
+            screener_data (Optional[Dict[str, float]]): Screener values passed to every bar.
+
+        Returns:
+            Dict[int, PatternTrigger]: Bar index -> trigger for that bar.
+        """
+        n = len(bars)
+        if n == 0:
+            return {}
+        candle_cols = {f.name: self._column([getattr(b, f.name) for b in bars], f.name) for f in fields(VolumeBar)}
+        has_sentiment = np.array([s is not None for s in sentiments], dtype=bool)
+        sentiment_cols = {
+            f.name: self._column([getattr(s, f.name) if s is not None else None for s in sentiments], f.name)
+            for f in fields(Sentiment)
+        }
+        vector_context = {
+            'candle': _Columns(candle_cols),
+            'sentiment': _Columns(sentiment_cols),
+            **{name: candle_cols[name] for name in _CANDLE_NAMES},
+        }
+        vector_context['volume'] = candle_cols['volume'].astype(float)
+
+        runs = [self._DefinitionRun(self, definition, vector_context, has_sentiment, sentiments, n)
+                for definition in self._definitions.values()]
+        symbol = bars[0].symbol
+        triggers: Dict[int, PatternTrigger] = {}
+        # Indicator state is rebuilt from this session exactly as the per-bar pass builds it
+        INDICATORS.reset(symbol)
+        try:
+            for i in range(n):
+                # PatternMatcherHandler appends every bar to the shared history before evaluating
+                INDICATORS.on_bar(bars[i])
+                for run in runs:
+                    trigger = run.step(i, bars, sentiments, screener_data)
+                    if trigger is not None:
+                        # Definitions after the triggering one do not see this bar
+                        triggers[i] = trigger
+                        break
+        finally:
+            INDICATORS.reset(symbol)
+        return triggers
+
+    @staticmethod
+    def _column(values: List[Any], name: str) -> np.ndarray:
+        if name in _OBJECT_FIELDS:
+            return np.array(values, dtype=object)
+        try:
+            return np.array([np.nan if v is None else v for v in values], dtype=float)
+        except (TypeError, ValueError):
+            return np.array(values, dtype=object)
+
+    def _phase_masks(self, conditions: List[str], vector_context: Dict[str, Any], has_sentiment: np.ndarray, n: int):
+        """
+        Splits conditions into one combined boolean mask and the scalar remainder.
+
+        Only conditions ahead of the first scalar one go into the mask: the per-bar machine
+        stops at the first failing condition, so a scalar condition (which may create
+        indicator state) must run on exactly the bars where everything before it passed.
+        """
+        mask = np.ones(n, dtype=bool)
+        scalar = []
+        for condition in conditions or []:
+            if not scalar and _is_vectorizable(condition):
+                try:
+                    with np.errstate(all='ignore'):
+                        result = compile_expression(condition).evaluate(vector_context)
+                    if isinstance(result, np.ndarray) and result.dtype == bool and result.shape == (n,):
+                        if _references(condition, 'sentiment'):
+                            result = result & has_sentiment
+                        mask &= result
+                        continue
+                except Exception as e:
+                    logger.debug(f"[VectorizedPatternEvaluator] '{condition}' evaluated per bar: {e}")
+            scalar.append(condition)
+        return mask, scalar
+
+    class _DefinitionRun:
+        """Scalar replica of one definition's PatternStateMachine, stepped one bar at a time."""
+
+        def __init__(self, evaluator: 'VectorizedPatternEvaluator', definition: PatternDefinition,
+                     vector_context: Dict[str, Any], has_sentiment: np.ndarray,
+                     sentiments: Sequence[Optional[Sentiment]], n: int):
+            self.evaluator = evaluator
+            self.definition = definition
+            self.phases = definition.phases
+            self.masks, self.scalars = zip(*(evaluator._phase_masks(p.conditions, vector_context, has_sentiment, n)
+                                             for p in self.phases))
+            # Regime gate applied while waiting in the first phase
+            self.allowed = np.ones(n, dtype=bool)
+            for i, sentiment in enumerate(sentiments):
+                regime_config = definition.regime_config.get(sentiment.regime if sentiment else "SIDEWAYS")
+                if regime_config and hasattr(regime_config, 'allow_entry') and not regime_config.allow_entry:
+                    self.allowed[i] = False
+            self.state: Optional[PatternState] = None
+            self.phase_index = 0
+            self.prev: Optional[int] = None
+
+        def step(self, i: int, bars, sentiments, screener_data) -> Optional[PatternTrigger]:
+            phases = self.phases
+            if self.state is None:
+                self.state = PatternState(self.definition.pattern_id, bars[0].symbol, phases[0].id)
+            if self.phase_index == 0 and not self.allowed[i]:
+                # Gated entry: the machine returns before updating prev_candle
+                return None
+            if not self.masks[self.phase_index][i]:
+                # Stateless conditions already fail: same outcome as a failed evaluation
+                self.phase_index = self.evaluator._fail(self.state, phases, self.phase_index)
+                self.prev = i
+                return None
+
+            trigger = None
+            context = self.evaluator._context(bars, sentiments[i], screener_data, i, self.prev, self.state)
+            if self.evaluator._check(self.scalars[self.phase_index], context):
+                self.evaluator._capture(phases[self.phase_index].capture, context, self.state)
+                if self.phase_index < len(phases) - 1:
+                    self.phase_index += 1
+                    self.state.move_to(phases[self.phase_index].id)
+                else:
+                    trigger = PatternTrigger(
+                        definition=self.definition,
+                        state=self.evaluator._snapshot(self.state),
+                        history=context['history'],
+                        prev_candle=bars[i],
+                    )
+                    # ExecutionHandler resets the machine after executing the trigger
+                    self.state.reset(phases[0].id)
+                    self.phase_index = 0
+            else:
+                self.phase_index = self.evaluator._fail(self.state, phases, self.phase_index)
+            self.prev = i
+            return trigger
+
+    @staticmethod
+    def _fail(state: PatternState, phases, phase_index: int) -> int:
+        state.increment_timeout()
+        if state.is_timed_out(phases[phase_index].timeout):
+            state.reset(phases[0].id)
+            return 0
+        return phase_index
+
+    def _context(self, bars, sentiment, screener_data, i, prev, state) -> Dict[str, Any]:
+        candle = bars[i]
+        return {
+            'candle': candle,
+            'sentiment': sentiment,
+            'vars': DotDict(state.captured_variables),
+            'screener': screener_data or {},
+            'prev_candle': bars[prev] if prev is not None else candle,
+            # The shared per-symbol history holds every bar, including ones this strategy skipped
+            'history': bars[max(0, i - self._max_history + 1):i + 1],
+            'volume': float(candle.volume),
+            'close': candle.close,
+            'high': candle.high,
+            'low': candle.low,
+            'open': candle.open,
+        }
+
+    @staticmethod
+    def _check(conditions: List[str], context: Dict[str, Any]) -> bool:
+        for condition in conditions:
+            try:
+                if not compile_expression(condition).evaluate(context):
+                    return False
+            except Exception as e:
+                logging.error(f"Error evaluating condition '{condition}': {e}")
+                return False
+        return True
+
+    @staticmethod
+    def _capture(captures: Dict[str, str], context: Dict[str, Any], state: PatternState) -> None:
+        for name, expression in (captures or {}).items():
+            try:
+                value = compile_expression(expression).evaluate(context)
+                if isinstance(value, (int, float)):
+                    state.capture(name, float(value))
+            except Exception as e:
+                logging.error(f"Error capturing variable '{name}': {e}")
+
+    @staticmethod
+    def _snapshot(state: PatternState) -> PatternState:
+        snapshot = PatternState(state.pattern_id, state.symbol, state.current_phase_id)
+        snapshot.captured_variables = dict(state.captured_variables)
+        snapshot.timeout_counter = state.timeout_counter
+        return snapshot
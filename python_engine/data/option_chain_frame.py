@@ -0,0 +1,131 @@
+from collections.abc import Sequence
+from dataclasses import fields
+from typing import Iterator, List, Optional
+import numpy as np
+import pandas as pd
+from python_engine.models.data_models import OptionChainData
+
+class OptionChainFrame:
+    """
+    One trading day of option chain snapshots stored column-wise.
+
+    Every numeric field is a (minutes x strikes) NumPy array: row `m` holds, for each
+    strike, the latest snapshot received at or before that minute (strikes are carried
+    forward until they are quoted again, the same "latest per strike" view
+    OptionChainHandler used to rebuild from the day's rows). `snapshot_at` returns a
+    zero-copy view of one row.
+    """
+
+    _NON_NUMERIC = {'timestamp', 'ts_min', 'strike'}
+
+    def __init__(self, df: pd.DataFrame):
+        """
+        Args:
+            df (pd.DataFrame): Option chain rows for one day (timestamp, strike, fields...).
+        """
+        ts = pd.to_datetime(df['timestamp'])
+        df = df.assign(_ns=ts.values.astype('datetime64[ns]'), _minute=ts.values.astype('datetime64[m]').astype('int64'))
+        df = df[df['strike'].notna()].sort_values('_ns', kind='stable')
+        df = df.drop_duplicates(['_minute', 'strike'], keep='last')
+
+        self.minutes, row = np.unique(df['_minute'].to_numpy(), return_inverse=True)
+        self.strikes, col = np.unique(df['strike'].to_numpy(dtype=float), return_inverse=True)
+        shape = (len(self.minutes), len(self.strikes))
+
+        # Carry each strike's last quoted row forward to later minutes
+        quoted = np.zeros(shape, dtype=bool)
+        quoted[row, col] = True
+        source_row = np.maximum.accumulate(np.where(quoted, np.arange(shape[0])[:, None], -1), axis=0)
+        self.present = source_row >= 0
+        gather = (np.maximum(source_row, 0), np.arange(shape[1])[None, :])
+
+        self.fields: List[str] = []
+        self._columns = {}
+        for name in df.columns:
+            if name in self._NON_NUMERIC or name.startswith('_') or not pd.api.types.is_numeric_dtype(df[name]):
+                continue
+            grid = np.full(shape, np.nan)
+            grid[row, col] = df[name].to_numpy(dtype=float)
+            grid = grid[gather]
+            grid[~self.present] = np.nan
+            grid.flags.writeable = False
+            self._columns[name] = grid
+            self.fields.append(name)
+        self.present.flags.writeable = False
+        self.strikes.flags.writeable = False
+
+    def __len__(self) -> int:
+        return len(self.minutes)
+
+    def snapshot_at(self, timestamp: int) -> Optional['OptionChainSnapshot']:
+        """
+        Chain as of `timestamp` (epoch seconds): the last minute at or before it.
+
+        Returns:
+            Optional[OptionChainSnapshot]: None before the day's first snapshot.
+        """
+        idx = int(np.searchsorted(self.minutes, int(timestamp) // 60, side='right')) - 1
+        return OptionChainSnapshot(self, idx) if idx >= 0 else None
+
+    def column(self, field: str) -> np.ndarray:
+        return self._columns[field]
+
+class OptionChainSnapshot(Sequence):
+    """
+    Read-only view of one minute of an OptionChainFrame.
+
+    `column(field)` and `present` are row views into the frame's arrays (no copy).
+    Iterating or indexing materializes OptionChainData objects for the quoted strikes,
+    so code written against a list of OptionChainData keeps working.
+    """
+
+    __slots__ = ('_frame', '_row')
+
+    def __init__(self, frame: OptionChainFrame, row: int):
+        self._frame = frame
+        self._row = row
+
+    @property
+    def minute(self) -> int:
+        """Epoch minute of the snapshot."""
+        return int(self._frame.minutes[self._row])
+
+    @property
+    def strikes(self) -> np.ndarray:
+        """All strikes of the day; combine with `present` for the quoted ones."""
+        return self._frame.strikes
+
+    @property
+    def fields(self) -> List[str]:
+        return self._frame.fields
+
+    @property
+    def present(self) -> np.ndarray:
+        return self._frame.present[self._row]
+
+    def column(self, field: str) -> np.ndarray:
+        return self._frame.column(field)[self._row]
+
+    def _quoted(self) -> np.ndarray:
+        return np.flatnonzero(self.present)
+
+    def __len__(self) -> int:
+        return int(np.count_nonzero(self.present))
+
+    def __getitem__(self, index):
+        quoted = self._quoted()
+        if isinstance(index, slice):
+            return [self._materialize(i) for i in quoted[index]]
+        return self._materialize(quoted[index])
+
+    def __iter__(self) -> Iterator[OptionChainData]:
+        for i in self._quoted():
+            yield self._materialize(i)
+
+    def _materialize(self, col: int) -> OptionChainData:
+        values = {'strike': float(self._frame.strikes[col])}
+        for f in fields(OptionChainData):
+            if f.name != 'strike' and f.name in self._frame.fields:
+                value = self._frame.column(f.name)[self._row, col]
+                values[f.name] = None if np.isnan(value) else float(value)
+        return OptionChainData(**{f.name: values.get(f.name) for f in fields(OptionChainData)})
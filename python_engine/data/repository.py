@@ -4,7 +4,9 @@ from typing import Optional, Dict, Any, List
 from functools import lru_cache
 from datetime import datetime
 from data_sourcing.database_manager import DatabaseManager
+from data_sourcing.archive_manager import ArchiveManager
 from python_engine.utils.symbol_master import MASTER as SymbolMaster
+from python_engine.data.option_chain_frame import OptionChainFrame
 
 # Standardized Logging
 logger = logging.getLogger(__name__)
@@ -25,13 +27,14 @@ class DataRepository:
             cls._instance = super(DataRepository, cls).__new__(cls)
             cls._instance.db = DatabaseManager()
             cls._instance.db.initialize_database()
+            cls._instance.archive = ArchiveManager(db_manager=cls._instance.db)
         return cls._instance
 
     def get_historical_candles(self, symbol: str, exchange: str = 'NSE',
                                interval: str = '1m', from_date: Optional[str] = None,
                                to_date: Optional[str] = None) -> Optional[pd.DataFrame]:
         """
-        Retrieves historical candles from the database.
+        Retrieves historical candles from SQLite, transparently merged with the Parquet archive.
 
         Args:
             symbol (str): Ticker symbol.
@@ -46,6 +49,8 @@ class DataRepository:
         try:
             canonical_symbol = SymbolMaster.get_canonical_ticker(symbol)
             df = self.db.get_historical_candles(canonical_symbol, exchange, interval, from_date, to_date)
+            storage_key = SymbolMaster.get_upstox_key(canonical_symbol) or canonical_symbol
+            df = self.archive.merge_candles(df, storage_key, exchange, interval, from_date, to_date)
             if df is not None and not df.empty:
                 df['timestamp'] = pd.to_datetime(df['timestamp'])
                 return df.sort_values('timestamp')
@@ -71,25 +76,84 @@ class DataRepository:
             logger.error(f"Error fetching market stats for {symbol}: {e}")
             return pd.DataFrame()
 
-    def get_option_chain(self, symbol: str, date_str: str) -> Optional[List[Dict[str, Any]]]:
+    def get_option_chain(self, symbol: str, date_str: str,
+                         columns: Optional[List[str]] = None) -> Optional[List[Dict[str, Any]]]:
         """
         Retrieves option chain snapshot for a specific date.
+        Archived (closed) days are served from Parquet; the hot set from SQLite.
 
         Args:
             symbol (str): Canonical symbol.
             date_str (str): Target date (YYYY-MM-DD).
+            columns (Optional[List[str]]): Restrict the archive read to these columns.
 
         Returns:
             Optional[List[Dict[str, Any]]]: List of option strike records.
         """
         try:
-            df = self.db.get_option_chain(symbol, date_str)
+            df = self._load_option_chain(symbol, date_str, columns)
             if df is not None and not df.empty:
                 return df.to_dict('records')
         except Exception as e:
             logger.error(f"Error fetching option chain for {symbol} on {date_str}: {e}")
         return None
 
+    def get_option_chain_frame(self, symbol: str, date_str: str) -> Optional[OptionChainFrame]:
+        """
+        Loads a day of option chain snapshots as a columnar OptionChainFrame.
+
+        Args:
+            symbol (str): Canonical symbol.
+            date_str (str): Target date (YYYY-MM-DD).
+
+        Returns:
+            Optional[OptionChainFrame]: The day's chain, or None if there is no data.
+        """
+        try:
+            df = self._load_option_chain(symbol, date_str)
+            if df is not None and not df.empty:
+                return OptionChainFrame(df)
+        except Exception as e:
+            logger.error(f"Error building option chain frame for {symbol} on {date_str}: {e}")
+        return None
+
+    def _load_option_chain(self, symbol: str, date_str: str,
+                           columns: Optional[List[str]] = None) -> Optional[pd.DataFrame]:
+        """Archived (closed) days are served from Parquet, with SQLite rows (re-enriched or late) taking precedence."""
+        df = self.db.get_option_chain(symbol, date_str)
+        if self.archive.enabled and self.archive.has_option_chain(symbol, date_str):
+            return self.archive.merge_option_chain(df, symbol, date_str, columns)
+        return df
+
+    def get_aligned_stats(self, symbol: str, timestamps: pd.DatetimeIndex) -> pd.DataFrame:
+        """
+        Loads market stats for the whole span of `timestamps` in one query and aligns
+        them to each timestamp with a backward as-of join (latest snapshot at or before
+        the bar's minute, within the same trading day).
+
+        Args:
+            symbol (str): Canonical symbol.
+            timestamps (pd.DatetimeIndex): Bar timestamps to align to.
+
+        Returns:
+            pd.DataFrame: One row per timestamp, in input order. Bars without a snapshot
+            have a null `timestamp` column.
+        """
+        if len(timestamps) == 0:
+            return pd.DataFrame()
+        ts = pd.DatetimeIndex(timestamps)
+        bars = pd.DataFrame({'_ts': ts.floor('min'), '_day': ts.normalize(), '_pos': range(len(ts))})
+        stats = self.get_market_stats(symbol, ts.min().normalize(), ts.max())
+        if stats is None or stats.empty:
+            return pd.DataFrame({'timestamp': [None] * len(ts)})
+
+        stats_ts = pd.to_datetime(stats['timestamp'])
+        stats = stats.assign(_ts=stats_ts.dt.floor('min'), _day=stats_ts.dt.normalize())
+        stats = stats.sort_values('_ts').drop_duplicates('_ts', keep='last')
+
+        aligned = pd.merge_asof(bars.sort_values('_ts'), stats, on='_ts', by='_day', direction='backward')
+        return aligned.sort_values('_pos').drop(columns=['_ts', '_day', '_pos']).reset_index(drop=True)
+
     @lru_cache(maxsize=1024)
     def get_closest_stats(self, symbol: str, timestamp: datetime) -> Optional[Dict[str, Any]]:
         """
@@ -3,14 +3,19 @@ import threading
 import time
 import pandas as pd
 import logging
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from datetime import datetime
 import upstox_client
-from python_engine.models.data_models import MarketEvent, MessageType, VolumeBar
+from python_engine.models.data_models import MarketEvent, MessageType
 from python_engine.engine_config import Config
 from python_engine.core.order_orchestrator import OrderOrchestrator
 from python_engine.core.trade_logger import TradeLog
 from python_engine.core.trading_engine import TradingEngine
+from python_engine.core.event_bus import EventBus
+from python_engine.core.bar_aggregator import BarAggregator
 from data_sourcing.data_manager import DataManager
+from python_engine.utils.metrics_registry import REGISTRY as Metrics
 from python_engine.utils.symbol_master import MASTER as SymbolMaster
 
 # Standardized Logging
@@ -23,12 +28,28 @@ class LiveTradingEngine:
         Config.load('config.json')
         self.access_token = Config.get('upstox_access_token')
         self.data_manager = DataManager(access_token=self.access_token)
+        if Config.get('db_write_behind', False):
+            # Candles, chain snapshots, stats and trades are group-committed off the pipeline thread
+            self.data_manager.db_manager.enable_write_behind(flush_interval=Config.get('db_flush_interval', 1.0))
         self.trade_log = TradeLog('live_trades.csv')
         self.order_orchestrator = OrderOrchestrator(self.trade_log, self.data_manager, "live")
         self.engine = TradingEngine(self.order_orchestrator, self.data_manager, Config.get('strategies_dir'))
+        # Bounded per-symbol queues in front of the pipeline (ordered, coalesced, lag-tracked)
+        self.event_bus = EventBus(max_depth=Config.get('event_queue_depth', 256))
+        self.engine.metrics.track_event_age = True
+        # Engine telemetry, published to a file the UI serves at /metrics
+        self.metrics_file = Config.get('metrics_file', 'engine_metrics.json')
+        self.engine.register_metrics(Metrics, self.event_bus)
         self.symbols = ["NSE_INDEX|Nifty 50", "NSE_INDEX|Nifty Bank"]
         self.subscribed_instruments = ["NSE_INDEX|Nifty 50", "NSE_INDEX|Nifty Bank"]
-        self._last_min = {}
+        self._tickers = {}
+        self._local_bars = {}
+        # Ticks -> 1m (and optional longer) bars in memory; REST candles are only used to reconcile
+        self.bar_aggregator = BarAggregator(self.on_bar, intervals=Config.get('live_bar_intervals', [1]),
+                                            grace=Config.get('bar_close_grace', 1.0))
+        self._executor = ThreadPoolExecutor(max_workers=Config.get('live_io_workers', 4), thread_name_prefix='live-io')
+        self._symbol_locks = {}
+        Metrics.register('bar_aggregator', self.bar_aggregator.get_stats)
 
     def _get_subscriptions(self):
         subs = set(self.symbols)
@@ -49,66 +70,111 @@ class LiveTradingEngine:
             if key: valid_subs.append(key)
         return list(set(valid_subs))
 
+    @staticmethod
+    def _get(obj, *names):
+        """First present field among `names` on a decoded feed message (dict or protobuf object)."""
+        for name in names:
+            value = obj.get(name) if isinstance(obj, dict) else getattr(obj, name, None)
+            if value is not None:
+                return value
+        return None
+
+    def _parse_tick(self, feed, current_ts):
+        """(ltp, ts_seconds, ltq, vtt) from an ltpc or full-feed entry, or None."""
+        full_feed = self._get(feed, 'full_feed', 'fullFeed')
+        section = self._get(full_feed, 'market_ff', 'marketFF', 'index_ff', 'indexFF') if full_feed is not None else None
+        ltpc = self._get(section if section is not None else feed, 'ltpc')
+        if ltpc is None:
+            return None
+        ltp = self._get(ltpc, 'ltp')
+        if not ltp:
+            return None
+        ltt = self._get(ltpc, 'ltt') or current_ts
+        ts = int(ltt) / 1000 if ltt else time.time()
+        vtt = self._get(section, 'vtt') if section is not None else None
+        return float(ltp), ts, float(self._get(ltpc, 'ltq') or 0), float(vtt) if vtt else None
+
     def on_message(self, message):
-        feeds = getattr(message, 'feeds', {})
+        feeds = self._get(message, 'feeds')
         if not feeds: return
+        current_ts = self._get(message, 'current_ts', 'currentTs')
 
         for key, feed in feeds.items():
-            logger.info(f'Message from {key}')
-            full_feed = getattr(feed, 'full_feed', None)
-            if not full_feed: continue
-
-            market_ohlc = getattr(full_feed, 'market_ohlc', None)
-            if not market_ohlc: continue
-
-            ohlc_list = getattr(market_ohlc, 'ohlc', [])
-            candle_1m = next((o for o in ohlc_list if getattr(o, 'interval', '') == 'I1'), None)
-            if not candle_1m: continue
-
-            ts = int(candle_1m.ts)
-            ticker = SymbolMaster.get_ticker_from_key(key)
-            if ticker not in self._last_min:
-                self._last_min[ticker] = ts
-                continue
-
-            if ts > self._last_min[ticker]:
-                self._last_min[ticker] = ts
-                logger.info(f"New 1m candle for {ticker} at {ts}")
-                self.loop.call_soon_threadsafe(lambda k=key, t=ticker: asyncio.create_task(self.process_candle(k, t)))
-
-    async def process_candle(self, key, ticker):
+            tick = self._parse_tick(feed, current_ts)
+            if tick is None: continue
+            ltp, ts, ltq, vtt = tick
+            self.bar_aggregator.on_tick(key, ltp, ts, quantity=ltq, total_volume=vtt)
+
+    def on_bar(self, key, interval, bar):
+        """Closed bar from the aggregator (feed thread or timer): hand it to the event loop."""
+        ticker = self._tickers.get(key)
+        if ticker is None:
+            ticker = self._tickers[key] = SymbolMaster.get_ticker_from_key(key) or key
+        bar.symbol = ticker
+        if interval != 1:
+            self.loop.call_soon_threadsafe(lambda b=bar, t=ticker, i=interval: asyncio.create_task(self.store_bar(t, f'{i}m', b)))
+            return
+        logger.info(f"New 1m candle for {ticker} at {bar.timestamp}")
+        self._local_bars[key] = bar
+        if key in self.symbols:
+            self.loop.call_soon_threadsafe(lambda b=bar, t=ticker: asyncio.create_task(self.process_candle(t, b)))
+        else:
+            # Option legs: a plain bar for position management, no sentiment lookups
+            self.event_bus.publish(MarketEvent(type=MessageType.CANDLE_UPDATE, timestamp=int(bar.timestamp), symbol=ticker, candle=bar))
+            self.loop.call_soon_threadsafe(lambda b=bar, t=ticker: asyncio.create_task(self.store_bar(t, '1m', b)))
+
+    async def _run_blocking(self, fn, *args, **kwargs):
+        """Runs a blocking SDK / SQLite call on the bounded I/O executor."""
+        return await self.loop.run_in_executor(self._executor, partial(fn, *args, **kwargs))
+
+    async def store_bar(self, ticker, interval, bar):
+        df = pd.DataFrame([{
+            'timestamp': pd.Timestamp(datetime.fromtimestamp(bar.timestamp)),
+            'open': bar.open, 'high': bar.high, 'low': bar.low, 'close': bar.close, 'volume': bar.volume
+        }])
+        await self._run_blocking(self.data_manager.db_manager.store_historical_candles, ticker, 'NSE', interval, df)
+
+    async def process_candle(self, ticker, bar):
+        # Tasks for one symbol acquire its lock in bar order (FIFO), so bar N is published before N+1
+        async with self._symbol_locks.setdefault(ticker, asyncio.Lock()):
+            await self._process_candle(ticker, bar)
+
+    async def _process_candle(self, ticker, bar):
         try:
-            resp = self.data_manager.upstox_client.get_intra_day_candle_data(key, '1m')
-            if resp and hasattr(resp, 'data') and len(resp.data.candles) >= 2:
-                c = resp.data.candles[1]
-                ts_dt = pd.to_datetime(c[0])
-                df = pd.DataFrame([{
-                    'timestamp': ts_dt,
-                    'open': float(c[1]), 'high': float(c[2]), 'low': float(c[3]), 'close': float(c[4]),
-                    'volume': int(c[5])
-                }])
-                self.data_manager.db_manager.store_historical_candles(ticker, 'NSE', '1m', df)
-
-                sentiment = self.data_manager.get_current_sentiment(ticker, timestamp=ts_dt.timestamp(), mode='live')
-
-                event = MarketEvent(
-                    type=MessageType.MARKET_UPDATE,
-                    timestamp=int(ts_dt.timestamp()),
-                    symbol=ticker,
-                    candle=VolumeBar(
-                        symbol=ticker,
-                        timestamp=int(ts_dt.timestamp()),
-                        open=float(c[1]), high=float(c[2]), low=float(c[3]), close=float(c[4]),
-                        volume=int(c[5])
-                    ),
-                    sentiment=sentiment
-                )
-                logger.info(f"Processing Event for {ticker} | Price: {c[4]} | PCR: {sentiment.pcr} | Vol PCR: {sentiment.volume_pcr}")
-                for handler in self.engine.pipeline:
-                    handler.on_event(event)
+            _, sentiment = await asyncio.gather(
+                self.store_bar(ticker, '1m', bar),
+                self._run_blocking(self.data_manager.get_current_sentiment, ticker,
+                                   timestamp=bar.timestamp, mode='live', spot=bar.close)
+            )
+            event = MarketEvent(type=MessageType.MARKET_UPDATE, timestamp=int(bar.timestamp), symbol=ticker,
+                                candle=bar, sentiment=sentiment)
+            logger.info(f"Processing Event for {ticker} | Price: {bar.close} | PCR: {sentiment.pcr} | Vol PCR: {sentiment.volume_pcr}")
+            self.event_bus.publish(event)
         except Exception as e:
             logger.error(f"Error processing candle for {ticker}: {e}")
 
+    async def reconcile(self):
+        """Overwrites locally built index candles with the exchange's REST candles (off the critical path)."""
+        for key in self.symbols:
+            try:
+                ticker = SymbolMaster.get_canonical_ticker(key)
+                resp = await self._run_blocking(self.data_manager.upstox_client.get_intra_day_candle_data, key, '1m')
+                if not (resp and hasattr(resp, 'data') and resp.data.candles):
+                    continue
+                candles = resp.data.candles
+                df = pd.DataFrame([{
+                    'timestamp': pd.to_datetime(c[0]),
+                    'open': float(c[1]), 'high': float(c[2]), 'low': float(c[3]), 'close': float(c[4]), 'volume': int(c[5])
+                } for c in candles])
+                await self._run_blocking(self.data_manager.db_manager.store_historical_candles, ticker, 'NSE', '1m', df)
+
+                local = self._local_bars.get(key)
+                remote = next((c for c in candles if int(pd.to_datetime(c[0]).timestamp()) == int(local.timestamp)), None) if local else None
+                if remote and abs(float(remote[4]) - local.close) > 1e-6:
+                    logger.warning(f"[LiveTradingEngine] {ticker} {remote[0]} close differs: local {local.close} vs exchange {remote[4]}")
+            except Exception as e:
+                logger.error(f"Error reconciling candles for {key}: {e}")
+
     def start_websocket(self):
         conf = upstox_client.Configuration()
         conf.access_token = self.access_token
@@ -124,8 +190,24 @@ class LiveTradingEngine:
     async def start(self):
         logger.info(f"Starting Live Engine for {len(self.subscribed_instruments)} instruments")
         self.start_websocket()
-        while True:
-            await asyncio.sleep(1)
+        reconcile_interval = Config.get('bar_reconcile_interval', 300)
+        next_reconcile = time.time() + reconcile_interval
+        pipeline = asyncio.create_task(self.engine.run_live(self.event_bus))
+        Metrics.start_publisher(self.metrics_file, Config.get('metrics_publish_interval', 5))
+        try:
+            while True:
+                await asyncio.sleep(1)
+                # Quiet instruments: close minutes no later tick has closed
+                self.bar_aggregator.close_due()
+                if reconcile_interval and time.time() >= next_reconcile:
+                    next_reconcile = time.time() + reconcile_interval
+                    asyncio.create_task(self.reconcile())
+        finally:
+            self.event_bus.close()
+            await pipeline
+            Metrics.stop_publisher(self.metrics_file)
+            self._executor.shutdown(wait=True)
+            self.data_manager.db_manager.disable_write_behind()
 
 async def run_live():
     engine = LiveTradingEngine(asyncio.get_running_loop())
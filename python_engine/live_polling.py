@@ -1,5 +1,7 @@
 import asyncio
 import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 import logging
 from datetime import datetime
 from python_engine.models.data_models import MarketEvent, MessageType, VolumeBar
@@ -7,7 +9,10 @@ from python_engine.engine_config import Config
 from python_engine.core.order_orchestrator import OrderOrchestrator
 from python_engine.core.trade_logger import TradeLog
 from python_engine.core.trading_engine import TradingEngine
+from python_engine.core.event_bus import EventBus
 from data_sourcing.data_manager import DataManager
+from python_engine.utils.metrics_registry import REGISTRY as Metrics
+from data_sourcing.stats_enricher import LiveStatsEnricher
 from python_engine.utils.symbol_master import MASTER as SymbolMaster
 
 logging.basicConfig(level=logging.INFO, format='[%(asctime)s] [%(levelname)s] - %(message)s')
@@ -18,20 +23,43 @@ class PollingLiveEngine:
         Config.load('config.json')
         self.access_token = Config.get('upstox_access_token')
         self.data_manager = DataManager(access_token=self.access_token)
+        if Config.get('db_write_behind', False):
+            # Candles, chain snapshots, stats and trades are group-committed off the pipeline thread
+            self.data_manager.db_manager.enable_write_behind(flush_interval=Config.get('db_flush_interval', 1.0))
         self.trade_log = TradeLog('live_trades.csv')
         self.order_orchestrator = OrderOrchestrator(self.trade_log, self.data_manager, "live")
         self.engine = TradingEngine(self.order_orchestrator, self.data_manager, Config.get('strategies_dir'))
+        # Bounded per-symbol queues in front of the pipeline (ordered, coalesced, lag-tracked)
+        self.event_bus = EventBus(max_depth=Config.get('event_queue_depth', 256))
+        self.engine.metrics.track_event_age = True
+        # Engine telemetry, published to a file the UI serves at /metrics
+        self.metrics_file = Config.get('metrics_file', 'engine_metrics.json')
+        self.engine.register_metrics(Metrics, self.event_bus)
         self.symbols = ["NSE_INDEX|Nifty 50", "NSE_INDEX|Nifty Bank"]
         self._last_processed_ts = {}
-        self._vol_history = {} # {ticker: [net_vol, ...]}
+        self.poll_interval = Config.get('poll_interval', 10)
+        # Blocking SDK and SQLite calls run here, off the event loop
+        self._executor = ThreadPoolExecutor(max_workers=Config.get('live_io_workers', 4), thread_name_prefix='live-io')
+        self._symbol_locks = {}
+        # Enriches each new chain snapshot into market_stats without re-processing the day
+        self.stats_enricher = LiveStatsEnricher(self.data_manager.db_manager, self.data_manager.calculate_atm_strike)
+
+    async def _run_blocking(self, fn, *args, **kwargs):
+        """Runs a blocking SDK / SQLite call on the bounded I/O executor."""
+        return await asyncio.get_running_loop().run_in_executor(self._executor, partial(fn, *args, **kwargs))
 
     async def poll_once(self):
-        for symbol in self.symbols:
+        """Polls every symbol concurrently; one slow underlying does not delay the others."""
+        await asyncio.gather(*(self.poll_symbol(symbol) for symbol in self.symbols))
+
+    async def poll_symbol(self, symbol):
+        # A poll still in flight for this symbol finishes first, so its events stay in order
+        async with self._symbol_locks.setdefault(symbol, asyncio.Lock()):
             try:
                 ticker = SymbolMaster.get_canonical_ticker(symbol)
                 key = SymbolMaster.get_upstox_key(symbol)
 
-                resp = self.data_manager.upstox_client.get_intra_day_candle_data(key, '1m')
+                resp = await self._run_blocking(self.data_manager.upstox_client.get_intra_day_candle_data, key, '1m')
                 if resp and hasattr(resp, 'data') and len(resp.data.candles) >= 2:
                     c = resp.data.candles[1] # Latest completed candle
                     ts_str = c[0]
@@ -42,41 +70,31 @@ class PollingLiveEngine:
 
                         logger.info(f"New completed candle for {ticker} at {ts_str}")
 
-                        # Store in DB
                         df = pd.DataFrame([{
                             'timestamp': ts_dt,
                             'open': float(c[1]), 'high': float(c[2]), 'low': float(c[3]), 'close': float(c[4]),
                             'volume': int(c[5])
                         }])
-                        self.data_manager.db_manager.store_historical_candles(ticker, 'NSE', '1m', df)
-
-                        # Fetch Sentiment
-                        # Fetch chain for volume calculation
-                        full_symbol = "NSE_INDEX|Nifty 50" if "NIFTY" in ticker else "NSE_INDEX|Nifty Bank"
-                        chain = self.data_manager.get_option_chain(full_symbol, mode='live')
-                        df_chain = pd.DataFrame(chain) if chain else pd.DataFrame()
-
-                        # Calculate Net Vol RSI in-memory
-                        total_call_vol = df_chain['call_volume'].sum() if 'call_volume' in df_chain.columns else 0
-                        total_put_vol = df_chain['put_volume'].sum() if 'put_volume' in df_chain.columns else 0
-                        net_vol = total_call_vol - total_put_vol
-
-                        if ticker not in self._vol_history: self._vol_history[ticker] = []
-                        self._vol_history[ticker].append(net_vol)
-                        if len(self._vol_history[ticker]) > 14: self._vol_history[ticker].pop(0)
-
-                        net_vol_rsi = 50.0
-                        if len(self._vol_history[ticker]) >= 2:
-                            series = pd.Series(self._vol_history[ticker])
-                            delta = series.diff().dropna()
-                            if not delta.empty:
-                                gain = (delta.where(delta > 0, 0)).mean()
-                                loss = (-delta.where(delta < 0, 0)).mean()
-                                rs = gain / (loss if loss > 0 else 0.001)
-                                net_vol_rsi = 100 - (100 / (1 + rs))
-
-                        sentiment = self.data_manager.get_current_sentiment(ticker, timestamp=ts_dt.timestamp(), mode='live')
-                        sentiment.net_vol_rsi = float(net_vol_rsi)
+                        # Store the candle and fetch the chain (for PCR velocity, Smart Trend, Net Vol RSI) together
+                        _, chain = await asyncio.gather(
+                            self._run_blocking(self.data_manager.db_manager.store_historical_candles, ticker, 'NSE', '1m', df),
+                            self._run_blocking(self.data_manager.get_option_chain, symbol, mode='live')
+                        )
+
+                        stats_row = await self._run_blocking(self.stats_enricher.on_snapshot, ticker, ts_dt, chain,
+                                                             spot=float(c[4]), spot_open=float(c[1]))
+
+                        sentiment = await self._run_blocking(self.data_manager.get_current_sentiment, ticker,
+                                                             timestamp=ts_dt.timestamp(), mode='live', spot=float(c[4]), chain=chain)
+                        if stats_row:
+                            # Take the fresh row's values: with write-behind on, the market_stats row the
+                            # service reads may still be queued (previous minute's PCR)
+                            sentiment.pcr = float(stats_row['pcr'])
+                            sentiment.volume_pcr = float(stats_row['volume_pcr'])
+                            # Same streaming Wilder RSI the backtest ingestion replays
+                            sentiment.net_vol_rsi = float(stats_row['net_vol_rsi'])
+                            sentiment.smart_trend = stats_row['smart_trend']
+                            sentiment.pcr_velocity = float(stats_row['pcr_velocity'])
 
                         event = MarketEvent(
                             type=MessageType.MARKET_UPDATE,
@@ -91,17 +109,31 @@ class PollingLiveEngine:
                         )
 
                         logger.info(f"Processing {ticker} | Price: {c[4]} | PCR: {sentiment.pcr} | Vol PCR: {sentiment.volume_pcr} | RSI: {sentiment.net_vol_rsi:.2f}")
-                        for handler in self.engine.pipeline:
-                            handler.on_event(event)
+                        self.event_bus.publish(event)
             except Exception as e:
                 logger.error(f"Error polling {symbol}: {e}")
 
+    async def _poll_loop(self, symbol, end_time):
+        while time.time() < end_time:
+            started = time.monotonic()
+            await self.poll_symbol(symbol)
+            await asyncio.sleep(max(0.0, self.poll_interval - (time.monotonic() - started)))
+
     async def start(self):
         logger.info("Starting Polling-based Live Engine (30-minute test)")
         end_time = time.time() + 1800 # 30 minutes
-        while time.time() < end_time:
-            await self.poll_once()
-            await asyncio.sleep(10) # Poll every 10 seconds
+        pipeline = asyncio.create_task(self.engine.run_live(self.event_bus))
+        Metrics.start_publisher(self.metrics_file, Config.get('metrics_publish_interval', 5))
+        try:
+            # One task per underlying, each on its own poll cadence
+            await asyncio.gather(*(self._poll_loop(symbol, end_time) for symbol in self.symbols))
+        finally:
+            self.event_bus.close()
+            await pipeline
+            Metrics.stop_publisher(self.metrics_file)
+            logger.info(f"[PollingLiveEngine] Event bus stats: {self.event_bus.get_stats()}")
+            self._executor.shutdown(wait=True)
+            self.data_manager.db_manager.disable_write_behind()
 
 import time
 if __name__ == "__main__":
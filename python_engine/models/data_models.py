@@ -1,5 +1,5 @@
 from dataclasses import dataclass, field
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Sequence
 from enum import Enum
 
 @dataclass
@@ -34,6 +34,33 @@ class OptionChainData:
     call_oi: int = 0
     put_oi: int = 0
 
+@dataclass
+class OIChange:
+    strike: float
+    call_delta_oi: float
+    put_delta_oi: float
+    call_status: str  # Addition / Unwinding / Neutral
+    put_status: str
+    oi_wall_type: Optional[str] = None  # Resistance (max Call OI) / Support (max Put OI)
+
+@dataclass
+class OIChangeMap:
+    timestamp: int
+    window_minutes: int
+    changes: List[OIChange]
+    top_call_additions: List[OIChange] = field(default_factory=list)
+    top_put_additions: List[OIChange] = field(default_factory=list)
+    top_call_unwindings: List[OIChange] = field(default_factory=list)
+    top_put_unwindings: List[OIChange] = field(default_factory=list)
+    resistance_wall: Optional[float] = None
+    support_wall: Optional[float] = None
+
+    def get(self, strike: float) -> Optional[OIChange]:
+        for change in self.changes:
+            if change.strike == strike:
+                return change
+        return None
+
 @dataclass
 class RegimeConfig:
     allow_entry: bool = True
@@ -107,7 +134,8 @@ class MarketEvent:
     symbol: Optional[str] = None
     candle: Optional[VolumeBar] = None
     sentiment: Optional[Sentiment] = None
-    option_chain: Optional[List[OptionChainData]] = None
+    option_chain: Optional[Sequence[OptionChainData]] = None
     screener_data: Optional[Dict[str, float]] = None
     triggered_machine: Optional['PatternStateMachine'] = None
     market_structure: Optional[Dict] = None
+    oi_changes: Optional[OIChangeMap] = None
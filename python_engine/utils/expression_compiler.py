@@ -0,0 +1,147 @@
+import ast
+import logging
+from functools import lru_cache
+from typing import Any, Dict
+from asteval import Interpreter
+from asteval.astutils import UNSAFE_ATTRS, safe_add, safe_lshift, safe_mult, safe_pow
+from python_engine.utils.mvel_functions import MVEL_FUNCTIONS
+
+logger = logging.getLogger(__name__)
+
+# Operators routed through asteval's guarded implementations (string/exponent/shift limits)
+_SAFE_BINOPS = {
+    ast.Add: '__safe_add',
+    ast.Mult: '__safe_mult',
+    ast.Pow: '__safe_pow',
+    ast.LShift: '__safe_lshift',
+}
+
+_GLOBALS: Dict[str, Any] = {
+    '__builtins__': {},
+    '__safe_add': safe_add,
+    '__safe_mult': safe_mult,
+    '__safe_pow': safe_pow,
+    '__safe_lshift': safe_lshift,
+    **MVEL_FUNCTIONS,
+}
+
+_ALLOWED_NODES = (
+    ast.Expression, ast.BoolOp, ast.And, ast.Or, ast.BinOp, ast.UnaryOp, ast.Compare, ast.IfExp,
+    ast.Call, ast.keyword, ast.Name, ast.Attribute, ast.Subscript, ast.Slice, ast.Constant,
+    ast.Tuple, ast.List, ast.Load,
+    ast.Add, ast.Sub, ast.Mult, ast.Div, ast.FloorDiv, ast.Mod, ast.Pow, ast.LShift, ast.RShift,
+    ast.BitAnd, ast.BitOr, ast.BitXor, ast.UAdd, ast.USub, ast.Not, ast.Invert,
+    ast.Eq, ast.NotEq, ast.Lt, ast.LtE, ast.Gt, ast.GtE, ast.In, ast.NotIn, ast.Is, ast.IsNot,
+)
+
+class UnsupportedExpression(Exception):
+    """Raised when an expression falls outside the natively compiled subset."""
+
+class _WhitelistCheck(ast.NodeVisitor):
+    def generic_visit(self, node):
+        if not isinstance(node, _ALLOWED_NODES):
+            raise UnsupportedExpression(type(node).__name__)
+        super().generic_visit(node)
+
+    def visit_Name(self, node):
+        if node.id.startswith('_'):
+            raise UnsupportedExpression(f"name {node.id}")
+
+    def visit_Attribute(self, node):
+        if node.attr.startswith('_') or node.attr in UNSAFE_ATTRS:
+            raise UnsupportedExpression(f"attribute {node.attr}")
+        self.visit(node.value)
+
+    def visit_Call(self, node):
+        # Only whitelisted MVEL functions may be called, and only by plain name
+        if not isinstance(node.func, ast.Name) or node.func.id not in MVEL_FUNCTIONS:
+            raise UnsupportedExpression("call outside MVEL_FUNCTIONS")
+        for arg in node.args:
+            self.visit(arg)
+        for kw in node.keywords:
+            if kw.arg is None:
+                raise UnsupportedExpression("**kwargs")
+            self.visit(kw.value)
+
+class _GuardOperators(ast.NodeTransformer):
+    def visit_BinOp(self, node):
+        self.generic_visit(node)
+        guard = _SAFE_BINOPS.get(type(node.op))
+        if guard is None:
+            return node
+        return ast.copy_location(
+            ast.Call(func=ast.Name(id=guard, ctx=ast.Load()), args=[node.left, node.right], keywords=[]),
+            node
+        )
+
+class CompiledExpression:
+    """
+    A strategy expression parsed and validated once, then evaluated many times.
+
+    Expressions inside the whitelisted subset (arithmetic, comparisons, boolean logic,
+    attribute/subscript access and calls to MVEL_FUNCTIONS) become a native code object
+    evaluated without builtins; `+`, `*`, `**` and `<<` go through asteval's guarded
+    operators. Anything else is pre-parsed by asteval and run by its interpreter, so
+    the sandbox is never weaker than plain `Interpreter.eval`.
+    """
+
+    def __init__(self, source: str):
+        self.source = source
+        self._code = None
+        self._node = None
+        self._interpreter = None
+        self.error = None
+        try:
+            tree = ast.parse(source.strip(), mode='eval')
+            _WhitelistCheck().visit(tree)
+            tree = ast.fix_missing_locations(_GuardOperators().visit(tree))
+            self._code = compile(tree, f"<strategy: {source}>", 'eval')
+        except (SyntaxError, UnsupportedExpression) as e:
+            logger.debug(f"[ExpressionCompiler] '{source}' uses the asteval fallback: {e}")
+            self._interpreter = Interpreter(symtable=dict(MVEL_FUNCTIONS))
+            try:
+                self._node = self._interpreter.parse(source)
+            except SyntaxError as syntax_error:
+                self.error = syntax_error
+
+    @property
+    def is_native(self) -> bool:
+        return self._code is not None
+
+    def evaluate(self, context: Dict[str, Any]) -> Any:
+        """
+        Evaluates the expression against `context`; raises on any evaluation error.
+
+        Args:
+            context (Dict[str, Any]): Names visible to the expression (candle, sentiment, ...).
+        """
+        if self._code is not None:
+            return eval(self._code, _GLOBALS, context)
+        if self.error is not None:
+            raise self.error
+        self._interpreter.symtable.update(context)
+        return self._interpreter.run(self._node, expr=self.source)
+
+@lru_cache(maxsize=None)
+def compile_expression(source: str) -> CompiledExpression:
+    """Returns the shared compiled form of `source` (compiled on first use)."""
+    return CompiledExpression(source)
+
+def compile_definition(definition) -> int:
+    """
+    Compiles every condition, capture and execution expression of a PatternDefinition.
+
+    Returns:
+        int: Number of expressions compiled.
+    """
+    sources = []
+    for phase in definition.phases:
+        sources.extend(phase.conditions or [])
+        sources.extend((phase.capture or {}).values())
+    if definition.execution:
+        sources.extend(e for e in (definition.execution.entry, definition.execution.sl, definition.execution.tp) if e)
+    for source in sources:
+        compiled = compile_expression(source)
+        if compiled.error is not None:
+            logger.error(f"[ExpressionCompiler] Invalid expression '{source}' in {definition.pattern_id}: {compiled.error}")
+    return len(sources)
@@ -0,0 +1,149 @@
+import numpy as np
+from scipy.special import ndtr
+
+_SQRT_2PI = np.sqrt(2 * np.pi)
+
+def _pdf(x):
+    return np.exp(-0.5 * x * x) / _SQRT_2PI
+
+class GreeksEngine:
+    """
+    Array counterpart of MathEngine: Black-Scholes prices, implied volatility and
+    Greeks for whole option chains at once.
+
+    Every argument may be a scalar or an array (broadcast together); `is_call` is a
+    boolean array selecting CE (True) or PE (False) per element. Conventions follow
+    MathEngine: theta is per calendar day, and an IV that cannot be solved is 0.0.
+    """
+
+    IV_LOWER = 1e-6
+    IV_UPPER = 10.0
+
+    @staticmethod
+    def black_scholes(S, K, T, r, sigma, is_call):
+        """Black-Scholes price for each element (requires T > 0 and sigma > 0)."""
+        sqrt_t = np.sqrt(T)
+        d1 = (np.log(S / K) + (r + 0.5 * sigma ** 2) * T) / (sigma * sqrt_t)
+        d2 = d1 - sigma * sqrt_t
+        discount = K * np.exp(-r * T)
+        call = S * ndtr(d1) - discount * ndtr(d2)
+        put = discount * ndtr(-d2) - S * ndtr(-d1)
+        return np.where(is_call, call, put)
+
+    @staticmethod
+    def implied_volatility(price, S, K, T, r, is_call, tol: float = 1e-8, max_iter: int = 100):
+        """
+        Solves implied volatility for every element together.
+
+        Newton steps use the analytic vega; a step that leaves the current bracket
+        (or has no usable vega) falls back to bisection, so each element converges
+        once its price lies within the no-arbitrage bounds.
+
+        An element that cannot be solved returns 0.0 rather than NaN, matching
+        MathEngine.calculate_iv: a non-positive price, spot or strike, T <= 0, or a
+        premium outside (price at IV_LOWER, price at IV_UPPER), e.g. at or below
+        intrinsic value. Callers treat 0.0 as "no IV" (greeks() then yields zeros).
+
+        Args:
+            price: Option premiums.
+            S: Spot prices.
+            K: Strikes.
+            T: Time to expiry in years.
+            r (float): Risk-free rate.
+            is_call: True for CE, False for PE.
+            tol (float): Convergence tolerance on the volatility step.
+            max_iter (int): Iteration cap.
+
+        Returns:
+            np.ndarray: Implied volatility per element, 0.0 where unsolvable.
+        """
+        price, S, K, T, is_call = np.broadcast_arrays(
+            np.asarray(price, dtype=float), np.asarray(S, dtype=float), np.asarray(K, dtype=float),
+            np.asarray(T, dtype=float), np.asarray(is_call, dtype=bool)
+        )
+        iv = np.zeros(price.shape)
+        with np.errstate(all='ignore'):
+            valid = (price > 0) & (T > 0) & (S > 0) & (K > 0)
+            idx = np.flatnonzero(valid)
+            if idx.size == 0:
+                return iv
+            p, s, k, t, c = price.ravel()[idx], S.ravel()[idx], K.ravel()[idx], T.ravel()[idx], is_call.ravel()[idx]
+
+            lo = np.full(idx.size, GreeksEngine.IV_LOWER)
+            hi = np.full(idx.size, GreeksEngine.IV_UPPER)
+            # A root exists only if the premium lies between the prices at both ends
+            solvable = (GreeksEngine.black_scholes(s, k, t, r, lo, c) < p) & (GreeksEngine.black_scholes(s, k, t, r, hi, c) > p)
+
+            # Brenner-Subrahmanyam starting point
+            sigma = np.clip(np.sqrt(2 * np.pi / t) * p / s, 0.05, 3.0)
+            active = solvable.copy()
+            converged = np.zeros(idx.size, dtype=bool)
+            for _ in range(max_iter):
+                if not active.any():
+                    break
+                a = np.flatnonzero(active)
+                sa, ta, sq = sigma[a], t[a], np.sqrt(t[a])
+                diff = GreeksEngine.black_scholes(s[a], k[a], ta, r, sa, c[a]) - p[a]
+                d1 = (np.log(s[a] / k[a]) + (r + 0.5 * sa ** 2) * ta) / (sa * sq)
+                vega = s[a] * _pdf(d1) * sq
+
+                # Price is increasing in sigma: tighten the bracket around the root
+                hi[a] = np.where(diff > 0, sa, hi[a])
+                lo[a] = np.where(diff < 0, sa, lo[a])
+
+                newton = sa - diff / vega
+                use_newton = np.isfinite(newton) & (vega > 1e-12) & (newton > lo[a]) & (newton < hi[a])
+                new_sigma = np.where(use_newton, newton, 0.5 * (lo[a] + hi[a]))
+
+                # Converged on the volatility itself: a price residual alone is meaningless for
+                # far-OTM or near-expiry premiums that are smaller than any fixed tolerance
+                done = (diff == 0) | (np.abs(new_sigma - sa) < tol)
+                sigma[a] = np.where(diff == 0, sa, new_sigma)
+                converged[a[done]] = True
+                active[a[done]] = False
+
+            iv.ravel()[idx[converged]] = sigma[converged]
+        return iv
+
+    @staticmethod
+    def greeks(S, K, T, r, sigma, is_call):
+        """
+        Delta, daily theta, gamma and vega (per 1% volatility) for every element.
+        Elements with T <= 0 or sigma <= 0 get zeros, as in MathEngine.calculate_greeks.
+
+        Returns:
+            Dict[str, np.ndarray]: Keys 'delta', 'theta', 'gamma', 'vega'.
+        """
+        S, K, T, sigma, is_call = np.broadcast_arrays(
+            np.asarray(S, dtype=float), np.asarray(K, dtype=float), np.asarray(T, dtype=float),
+            np.asarray(sigma, dtype=float), np.asarray(is_call, dtype=bool)
+        )
+        with np.errstate(all='ignore'):
+            valid = (T > 0) & (sigma > 0)
+            sqrt_t = np.sqrt(T)
+            d1 = (np.log(S / K) + (r + 0.5 * sigma ** 2) * T) / (sigma * sqrt_t)
+            d2 = d1 - sigma * sqrt_t
+            pdf_d1 = _pdf(d1)
+            discount = r * K * np.exp(-r * T)
+            decay = -(S * pdf_d1 * sigma) / (2 * sqrt_t)
+
+            delta = np.where(is_call, ndtr(d1), ndtr(d1) - 1)
+            theta = np.where(is_call, decay - discount * ndtr(d2), decay + discount * ndtr(-d2)) / 365
+            gamma = pdf_d1 / (S * sigma * sqrt_t)
+            vega = S * pdf_d1 * sqrt_t / 100
+
+        return {name: np.where(valid, values, 0.0) for name, values in
+                (('delta', delta), ('theta', theta), ('gamma', gamma), ('vega', vega))}
+
+    @staticmethod
+    def solve_chain(price, S, K, T, r, is_call):
+        """
+        Implied volatility plus Greeks for every element of a chain.
+
+        Returns:
+            Dict[str, np.ndarray]: Keys 'iv', 'delta', 'theta', 'gamma', 'vega'.
+        """
+        iv = GreeksEngine.implied_volatility(price, S, K, T, r, is_call)
+        result = GreeksEngine.greeks(S, K, T, r, iv, is_call)
+        result['iv'] = iv
+        return result
@@ -0,0 +1,316 @@
+import math
+import threading
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import Any, Callable, Dict, Tuple
+
+def _signature(bar) -> Tuple[float, ...]:
+    """OHLCV of a bar; a changed signature at the same timestamp is an in-place update."""
+    return (bar.open, bar.high, bar.low, bar.close, bar.volume)
+
+class _Rolling(ABC):
+    """Base class for per-stream indicator state; `push` is O(1) amortized."""
+    def __init__(self):
+        self.last_ts = None
+        self.last_signature = None
+
+    @abstractmethod
+    def push(self, bar) -> None:
+        """Adds a bar newer than every bar pushed so far."""
+
+    @abstractmethod
+    def replace_last(self, bar) -> None:
+        """Swaps the most recently pushed bar for an updated version of it (same timestamp)."""
+
+    @abstractmethod
+    def value(self) -> float:
+        """Indicator value as of the most recent bar."""
+
+class RollingMean(_Rolling):
+    """Windowed mean from a running sum."""
+    def __init__(self, period: int, field: str):
+        super().__init__()
+        self.period = max(int(period), 1)
+        self.field = field
+        self.window = deque()
+        self.total = 0.0
+
+    def push(self, bar) -> None:
+        x = getattr(bar, self.field, 0.0)
+        self.window.append(x)
+        self.total += x
+        if len(self.window) > self.period:
+            self.total -= self.window.popleft()
+
+    def replace_last(self, bar) -> None:
+        x = getattr(bar, self.field, 0.0)
+        self.total += x - self.window[-1]
+        self.window[-1] = x
+
+    def value(self) -> float:
+        return self.total / len(self.window) if self.window else 0.0
+
+class RollingStdev(_Rolling):
+    """Windowed sample standard deviation (Welford update with removal)."""
+    def __init__(self, period: int, field: str):
+        super().__init__()
+        self.period = max(int(period), 1)
+        self.field = field
+        self.window = deque()
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def push(self, bar) -> None:
+        x = float(getattr(bar, self.field, 0.0))
+        self.window.append(x)
+        n = len(self.window)
+        delta = x - self.mean
+        self.mean += delta / n
+        self.m2 += delta * (x - self.mean)
+        if n > self.period:
+            old = self.window.popleft()
+            n -= 1
+            delta = old - self.mean
+            self.mean -= delta / n
+            self.m2 -= delta * (old - self.mean)
+
+    def replace_last(self, bar) -> None:
+        # Rare (live bar updates): recompute the window's moments directly
+        self.window[-1] = float(getattr(bar, self.field, 0.0))
+        n = len(self.window)
+        self.mean = sum(self.window) / n
+        self.m2 = sum((x - self.mean) ** 2 for x in self.window)
+
+    def value(self) -> float:
+        n = len(self.window)
+        return math.sqrt(max(self.m2, 0.0) / (n - 1)) if n > 1 else 0.0
+
+class RollingExtreme(_Rolling):
+    """Windowed max (or min) with a monotonic deque."""
+    def __init__(self, period: int, field: str, highest: bool):
+        super().__init__()
+        self.period = max(int(period), 1)
+        self.field = field
+        self.highest = highest
+        self.candidates = deque()  # (index, value), monotonic in value
+        self.values = deque(maxlen=self.period)  # raw window, to rebuild candidates on replace_last
+        self.count = 0
+
+    def push(self, bar) -> None:
+        x = getattr(bar, self.field, 0.0)
+        self.values.append(x)
+        self._add(x)
+
+    def _add(self, x) -> None:
+        if self.highest:
+            while self.candidates and self.candidates[-1][1] <= x:
+                self.candidates.pop()
+        else:
+            while self.candidates and self.candidates[-1][1] >= x:
+                self.candidates.pop()
+        self.candidates.append((self.count, x))
+        self.count += 1
+        while self.candidates[0][0] <= self.count - 1 - self.period:
+            self.candidates.popleft()
+
+    def replace_last(self, bar) -> None:
+        self.values[-1] = getattr(bar, self.field, 0.0)
+        self.candidates.clear()
+        self.count -= len(self.values)
+        for x in self.values:
+            self._add(x)
+
+    def value(self) -> float:
+        return self.candidates[0][1] if self.candidates else 0.0
+
+class RecursiveEma(_Rolling):
+    """Exponential moving average carried across bars (seeded with the first value)."""
+    def __init__(self, period: int, field: str):
+        super().__init__()
+        self.alpha = 2 / (max(int(period), 1) + 1)
+        self.field = field
+        self.ema = None
+        self.prev_ema = None
+
+    def push(self, bar) -> None:
+        self.prev_ema = self.ema
+        self._apply(getattr(bar, self.field, 0.0))
+
+    def _apply(self, x: float) -> None:
+        self.ema = x if self.prev_ema is None else x * self.alpha + self.prev_ema * (1 - self.alpha)
+
+    def replace_last(self, bar) -> None:
+        self._apply(getattr(bar, self.field, 0.0))
+
+    def value(self) -> float:
+        return self.ema if self.ema is not None else 0.0
+
+class WilderRsi(_Rolling):
+    """RSI with Wilder smoothing, seeded by the simple average of the first `period` changes."""
+    def __init__(self, period: int, field: str = 'close'):
+        super().__init__()
+        self.period = max(int(period), 1)
+        self.field = field
+        self.prev = None
+        self.seed_gain = 0.0
+        self.seed_loss = 0.0
+        self.changes = 0
+        self.avg_gain = None
+        self.avg_loss = None
+        self._before_last = None
+
+    def _snapshot(self) -> Tuple[Any, ...]:
+        return (self.prev, self.seed_gain, self.seed_loss, self.changes, self.avg_gain, self.avg_loss)
+
+    def push(self, bar) -> None:
+        self._before_last = self._snapshot()
+        self.update(getattr(bar, self.field, 0.0))
+
+    def replace_last(self, bar) -> None:
+        self.prev, self.seed_gain, self.seed_loss, self.changes, self.avg_gain, self.avg_loss = self._before_last
+        self.update(getattr(bar, self.field, 0.0))
+
+    def update(self, x: float) -> float:
+        """Pushes a raw value (no bar) and returns the updated RSI."""
+        if self.prev is not None:
+            change = x - self.prev
+            gain, loss = (change, 0.0) if change > 0 else (0.0, -change)
+            self.changes += 1
+            if self.avg_gain is None:
+                self.seed_gain += gain
+                self.seed_loss += loss
+                if self.changes == self.period:
+                    self.avg_gain = self.seed_gain / self.period
+                    self.avg_loss = self.seed_loss / self.period
+            else:
+                self.avg_gain = (self.avg_gain * (self.period - 1) + gain) / self.period
+                self.avg_loss = (self.avg_loss * (self.period - 1) + loss) / self.period
+        self.prev = x
+        return self.value()
+
+    def value(self) -> float:
+        if self.avg_gain is None:
+            return 50.0
+        if self.avg_loss == 0:
+            return 100.0
+        return 100.0 - (100.0 / (1.0 + self.avg_gain / self.avg_loss))
+
+class SessionVwap(_Rolling):
+    """Cumulative VWAP over typical price, reset at each new trading day."""
+    def __init__(self):
+        super().__init__()
+        self.session = None
+        self.pv = 0.0
+        self.v = 0.0
+        self.last_close = 0.0
+        self._before_last = None
+
+    def push(self, bar) -> None:
+        self._before_last = (self.session, self.pv, self.v, self.last_close)
+        self._apply(bar)
+
+    def replace_last(self, bar) -> None:
+        self.session, self.pv, self.v, self.last_close = self._before_last
+        self._apply(bar)
+
+    def _apply(self, bar) -> None:
+        session = int(bar.timestamp) // 86400
+        if session != self.session:
+            self.session, self.pv, self.v = session, 0.0, 0.0
+        tp = (bar.high + bar.low + bar.close) / 3.0
+        self.pv += tp * bar.volume
+        self.v += bar.volume
+        self.last_close = bar.close
+
+    def value(self) -> float:
+        return self.pv / self.v if self.v > 0 else self.last_close
+
+class IndicatorEngine:
+    """
+    Stateful indicators keyed by (symbol, indicator, period, field).
+
+    A state is created (and seeded from the caller's bar history) the first time an
+    indicator is asked for. From then on every bar appended to the symbol's
+    BarHistoryStore is pushed into it through `on_bar`, whether or not any strategy
+    reads the indicator on that bar, so its value does not depend on which callers
+    happened to ask when. A bar that replaces the last one (same timestamp, live
+    update) is swapped in with `replace_last`. For histories not fed through a store,
+    `get` catches up on the bars it has not seen; when more bars have passed than the
+    history holds, the state is rebuilt from the history. A history that moves
+    backwards in time (a new backtest over the same symbol) also rebuilds the state.
+    """
+
+    def __init__(self):
+        self._states: Dict[Tuple[Any, ...], _Rolling] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def supports(history) -> bool:
+        last = history[-1]
+        return hasattr(last, 'symbol') and hasattr(last, 'timestamp')
+
+    @staticmethod
+    def _advance(state: _Rolling, bar) -> bool:
+        """Pushes or swaps in `bar`; False if it is older than the state (time reversal)."""
+        ts = bar.timestamp
+        if ts > state.last_ts:
+            state.push(bar)
+        elif ts == state.last_ts:
+            signature = _signature(bar)
+            if signature == state.last_signature:
+                return True
+            state.replace_last(bar)
+        else:
+            return False
+        state.last_ts = ts
+        state.last_signature = _signature(bar)
+        return True
+
+    @classmethod
+    def _seed(cls, factory: Callable[[], _Rolling], history) -> _Rolling:
+        state = factory()
+        for bar in history:
+            state.push(bar)
+        last = history[-1]
+        state.last_ts = last.timestamp
+        state.last_signature = _signature(last)
+        return state
+
+    def get(self, history, key: Tuple[Any, ...], factory: Callable[[], _Rolling]) -> float:
+        last = history[-1]
+        ts = last.timestamp
+        full_key = (last.symbol,) + key
+        with self._lock:
+            state = self._states.get(full_key)
+            if state is None or ts < state.last_ts:
+                state = self._states[full_key] = self._seed(factory, history)
+            elif ts == state.last_ts:
+                self._advance(state, last)
+            else:
+                k = len(history)
+                while k > 0 and history[k - 1].timestamp > state.last_ts:
+                    k -= 1
+                if k == 0:
+                    # More bars passed than the history holds: the missing ones cannot be replayed
+                    state = self._states[full_key] = self._seed(factory, history)
+                else:
+                    for bar in history[k:]:
+                        self._advance(state, bar)
+            return state.value()
+
+    def on_bar(self, bar) -> None:
+        """Pushes a bar just appended to a symbol's history into every state of that symbol."""
+        with self._lock:
+            for full_key in [k for k in self._states if k[0] == bar.symbol]:
+                if not self._advance(self._states[full_key], bar):
+                    del self._states[full_key]
+
+    def reset(self, symbol: str = None) -> None:
+        with self._lock:
+            if symbol is None:
+                self._states.clear()
+            else:
+                for key in [k for k in self._states if k[0] == symbol]:
+                    del self._states[key]
+
+INDICATORS = IndicatorEngine()
@@ -1,4 +1,5 @@
 import math
+import numpy as np
 from scipy.stats import norm
 from scipy.optimize import newton
 
@@ -90,3 +91,22 @@ class MathEngine:
             if oi_change < 0: return "Unwinding"
 
         return "Neutral"
+
+    @staticmethod
+    def get_smart_trends(price_change, oi_change):
+        """
+        Vectorized get_smart_trend over arrays of Price and OI changes.
+        """
+        price_change = np.asarray(price_change, dtype=float)
+        oi_change = np.asarray(oi_change, dtype=float)
+        price_change, oi_change = np.broadcast_arrays(price_change, oi_change)
+        conditions = [
+            (price_change > 0) & (oi_change > 0),
+            (price_change < 0) & (oi_change > 0),
+            (price_change < 0) & (oi_change < 0),
+            (price_change > 0) & (oi_change < 0),
+            (price_change == 0) & (oi_change > 0),
+            (price_change == 0) & (oi_change < 0),
+        ]
+        choices = ["Long Buildup", "Short Buildup", "Long Unwinding", "Short Covering", "Buildup", "Unwinding"]
+        return np.select(conditions, choices, default="Neutral").astype(object)
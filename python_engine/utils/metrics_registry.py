@@ -0,0 +1,188 @@
+import functools
+import json
+import logging
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Parsed snapshot files by path: (mtime, snapshot)
+_SNAPSHOT_CACHE: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+
+class MetricsRegistry:
+    """
+    Process-wide telemetry shared between the engine and the UI.
+
+    Components register providers (callables returning their current stats), and
+    remote clients record call counts, latency and errors through `track_call`. A
+    snapshot collects everything into one JSON-serializable dict. The engine process
+    writes it to a file (`start_publisher`, atomic replace every few seconds) and the
+    FastAPI process reads that file and renders it (`read_snapshot`, `to_prometheus`),
+    so a scrape never touches the engine.
+
+    Providers return either flat metrics ({metric: number}) or metrics per label value
+    ({label_value: {metric: number}}); `label` names the label in the second case.
+    """
+
+    def __init__(self):
+        self._providers: Dict[str, Tuple[Callable[[], Dict[str, Any]], Optional[str]]] = {}
+        self._calls: Dict[Tuple[str, str], Dict[str, float]] = {}
+        self._lock = threading.Lock()
+        self._publisher: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def register(self, name: str, provider: Callable[[], Dict[str, Any]], label: Optional[str] = None) -> None:
+        """
+        Args:
+            name (str): Metric family prefix (e.g. 'pipeline', 'db_writes').
+            provider (Callable[[], Dict[str, Any]]): Returns the component's current stats.
+            label (Optional[str]): Label name when the stats are keyed per label value.
+        """
+        with self._lock:
+            self._providers[name] = (provider, label)
+
+    def unregister(self, name: str) -> None:
+        with self._lock:
+            self._providers.pop(name, None)
+
+    def record_call(self, client: str, method: str, seconds: float, error: bool) -> None:
+        with self._lock:
+            stats = self._calls.get((client, method))
+            if stats is None:
+                stats = self._calls[(client, method)] = {'calls': 0, 'errors': 0, 'seconds': 0.0, 'max_seconds': 0.0}
+            stats['calls'] += 1
+            stats['errors'] += int(error)
+            stats['seconds'] += seconds
+            if seconds > stats['max_seconds']:
+                stats['max_seconds'] = seconds
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Current stats of every provider plus the remote call counters."""
+        with self._lock:
+            providers = list(self._providers.items())
+            calls = {f"{client}.{method}": dict(stats) for (client, method), stats in self._calls.items()}
+        sections = {'api_calls': {'label': 'call', 'values': calls}}
+        for name, (provider, label) in providers:
+            try:
+                sections[name] = {'label': label, 'values': provider()}
+            except Exception as e:
+                logger.debug(f"[MetricsRegistry] Provider {name} failed: {e}")
+        return {'timestamp': time.time(), 'pid': os.getpid(), 'sections': sections}
+
+    def publish(self, path: str) -> None:
+        """Writes the snapshot to `path` atomically (readers never see a partial file)."""
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, 'w') as f:
+            json.dump(self.snapshot(), f, default=float)
+        os.replace(tmp, path)
+
+    def start_publisher(self, path: str, interval: float = 5.0) -> None:
+        """Publishes the snapshot to `path` every `interval` seconds on a daemon thread."""
+        if self._publisher is not None and self._publisher.is_alive():
+            return
+        self._stop.clear()
+
+        def run():
+            while not self._stop.is_set():
+                try:
+                    self.publish(path)
+                except Exception as e:
+                    logger.warning(f"[MetricsRegistry] Could not publish metrics to {path}: {e}")
+                self._stop.wait(interval)
+
+        self._publisher = threading.Thread(target=run, name='metrics-publisher', daemon=True)
+        self._publisher.start()
+        logger.info(f"[MetricsRegistry] Publishing metrics to {path} every {interval}s")
+
+    def stop_publisher(self, path: Optional[str] = None) -> None:
+        """Stops the publisher, writing one final snapshot when `path` is given."""
+        self._stop.set()
+        if self._publisher is not None:
+            self._publisher.join(timeout=5)
+            self._publisher = None
+        if path:
+            try:
+                self.publish(path)
+            except Exception as e:
+                logger.warning(f"[MetricsRegistry] Could not publish metrics to {path}: {e}")
+
+    @staticmethod
+    def read_snapshot(path: str) -> Optional[Dict[str, Any]]:
+        """Loads a published snapshot; the parsed file is reused until its mtime changes."""
+        try:
+            mtime = os.stat(path).st_mtime
+        except OSError:
+            return None
+        cached = _SNAPSHOT_CACHE.get(path)
+        if cached is None or cached[0] != mtime:
+            try:
+                with open(path) as f:
+                    cached = _SNAPSHOT_CACHE[path] = (mtime, json.load(f))
+            except (OSError, ValueError):
+                return cached[1] if cached else None
+        return cached[1]
+
+    @staticmethod
+    def to_prometheus(snapshot: Dict[str, Any], prefix: str = 'sos') -> str:
+        """
+        Renders a snapshot in the Prometheus text exposition format.
+
+        Every numeric leaf becomes `<prefix>_<section>_<metric>`, labelled with the
+        section's label when its stats are keyed per label value.
+        """
+        lines = []
+        for section, body in sorted(snapshot.get('sections', {}).items()):
+            label, values = body.get('label'), body.get('values') or {}
+            families: Dict[str, list] = {}
+            if label:
+                for key, metrics in values.items():
+                    for metric, value in (metrics or {}).items():
+                        families.setdefault(metric, []).append((key, value))
+            else:
+                for metric, value in values.items():
+                    families.setdefault(metric, []).append((None, value))
+            for metric, samples in sorted(families.items()):
+                name = _metric_name(f"{prefix}_{section}_{metric}")
+                emitted = False
+                for key, value in samples:
+                    if isinstance(value, bool) or not isinstance(value, (int, float)):
+                        continue
+                    if not emitted:
+                        lines.append(f"# TYPE {name} gauge")
+                        emitted = True
+                    labels = f'{{{label}="{_escape(key)}"}}' if label else ''
+                    lines.append(f"{name}{labels} {float(value)!r}")
+        return "\n".join(lines) + "\n"
+
+def _metric_name(name: str) -> str:
+    return ''.join(c if c.isalnum() or c == '_' else '_' for c in name)
+
+def _escape(value: Any) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def track_call(client: str) -> Callable:
+    """
+    Decorator recording calls, latency and errors of a remote client method in REGISTRY.
+    An exception or a None result (how these clients report failures) counts as an error.
+    """
+    def decorator(fn: Callable) -> Callable:
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            result = None
+            try:
+                result = fn(*args, **kwargs)
+                return result
+            finally:
+                REGISTRY.record_call(client, fn.__name__, time.perf_counter() - start, result is None)
+        return wrapper
+    return decorator
+
+def hit_ratio(stats: Dict[str, Any]) -> Dict[str, Any]:
+    """Adds `hit_ratio` (hits / (hits + misses)) to a cache's stats dict."""
+    lookups = stats.get('hits', 0) + stats.get('misses', 0)
+    return dict(stats, hit_ratio=stats.get('hits', 0) / lookups if lookups else 0.0)
+
+REGISTRY = MetricsRegistry()
@@ -1,37 +1,61 @@
 import math
 import statistics
+from python_engine.utils.indicator_engine import (
+    INDICATORS, RollingMean, RollingStdev, RollingExtreme, RecursiveEma, WilderRsi, SessionVwap
+)
 
 def _extract_last_n(history, n, field):
+    if hasattr(history, 'column') and field.lower() in ('open', 'high', 'low', 'close', 'volume', 'atr'):
+        # Ring-buffer history: slice the column view instead of materializing bars
+        return history.column(field.lower())[-n:].tolist()
     sub_list = history[-n:]
     return [getattr(bar, field.lower(), 0.0) for bar in sub_list]
 
+# Indicators below resolve to rolling state in INDICATORS (per symbol/indicator/period/field);
+# the list-based versions are kept for histories that do not carry bar identity.
+
 def stdev(history, period, field):
     if len(history) < 2:
         return 0.0
+    if INDICATORS.supports(history):
+        f = field.lower()
+        return INDICATORS.get(history, ('stdev', period, f), lambda: RollingStdev(period, f))
     values = _extract_last_n(history, period, field)
     return statistics.stdev(values) if len(values) > 1 else 0.0
 
 def highest(history, period, field):
     if not history:
         return 0.0
+    if INDICATORS.supports(history):
+        f = field.lower()
+        return INDICATORS.get(history, ('highest', period, f), lambda: RollingExtreme(period, f, highest=True))
     values = _extract_last_n(history, period, field)
     return max(values) if values else 0.0
 
 def lowest(history, period, field):
     if not history:
         return 0.0
+    if INDICATORS.supports(history):
+        f = field.lower()
+        return INDICATORS.get(history, ('lowest', period, f), lambda: RollingExtreme(period, f, highest=False))
     values = _extract_last_n(history, period, field)
     return min(values) if values else 0.0
 
 def moving_avg(history, period, field):
     if not history:
         return 0.0
+    if INDICATORS.supports(history):
+        f = field.lower()
+        return INDICATORS.get(history, ('sma', period, f), lambda: RollingMean(period, f))
     values = _extract_last_n(history, period, field)
     return statistics.mean(values) if values else 0.0
 
 def ema(history, period, field):
     if not history:
         return 0.0
+    if INDICATORS.supports(history):
+        f = field.lower()
+        return INDICATORS.get(history, ('ema', period, f), lambda: RecursiveEma(period, f))
     values = _extract_last_n(history, min(len(history), period * 2), field)
     if not values:
         return 0.0
@@ -44,6 +68,8 @@ def ema(history, period, field):
 def vwap(history):
     if not history:
         return 0.0
+    if INDICATORS.supports(history):
+        return INDICATORS.get(history, ('vwap',), SessionVwap)
     total_pv = 0.0
     total_v = 0.0
     # VWAP is usually reset daily, but for historical context we can calculate over window
@@ -55,6 +81,8 @@ def vwap(history):
     return total_pv / total_v if total_v > 0 else history[-1].close
 
 def rsi(history, period=14):
+    if history and INDICATORS.supports(history):
+        return INDICATORS.get(history, ('rsi', period, 'close'), lambda: WilderRsi(period))
     if len(history) < period:
         return 50.0
     closes = _extract_last_n(history, period + 1, 'close')
@@ -0,0 +1,28 @@
+from datetime import datetime, timedelta, timezone
+from python_engine.core.bar_aggregator import BarAggregator
+
+IST = timezone(timedelta(hours=5, minutes=30))
+SESSION_OPEN = datetime(2025, 1, 6, 9, 15, tzinfo=IST).timestamp()
+
+def run_session(intervals):
+    bars = []
+    aggregator = BarAggregator(lambda symbol, interval, bar: bars.append((interval, bar)), intervals=intervals)
+    for minute in range(375):
+        aggregator.on_tick('TEST', 100.0 + minute, SESSION_OPEN + 60 * minute + 5, quantity=1)
+    aggregator.close_due(now=SESSION_OPEN + 376 * 60)
+    return bars
+
+def labels(bars, interval):
+    return [datetime.fromtimestamp(bar.timestamp, IST).strftime('%H:%M') for i, bar in bars if i == interval]
+
+def test_longer_intervals_start_at_session_open():
+    bars = run_session((5, 30, 60))
+    assert len(labels(bars, 1)) == 375
+    assert labels(bars, 5)[:3] == ['09:15', '09:20', '09:25'] and len(labels(bars, 5)) == 75
+    assert labels(bars, 30)[:3] == ['09:15', '09:45', '10:15'] and labels(bars, 30)[-1] == '15:15'
+    assert labels(bars, 60) == ['09:15', '10:15', '11:15', '12:15', '13:15', '14:15', '15:15']
+
+    hourly = [bar for i, bar in bars if i == 60]
+    assert (hourly[0].open, hourly[0].close, hourly[0].volume) == (100.0, 159.0, 60)
+    # The session's last bucket is shorter and closes at 15:29
+    assert (hourly[-1].open, hourly[-1].close, hourly[-1].volume) == (460.0, 474.0, 15)
@@ -0,0 +1,54 @@
+import time
+import numpy as np
+from python_engine.utils.greeks_engine import GreeksEngine
+from python_engine.utils.math_engine import MathEngine
+
+SPOT = 22000.0
+RATE = 0.07
+MONEYNESS = [0.7, 0.8, 0.9, 0.95, 0.98, 1.0, 1.02, 1.05, 1.1, 1.2, 1.3]
+# One minute, one hour, one day ... one year to expiry
+EXPIRIES = [1 / (365 * 24 * 60), 1 / (365 * 24), 1 / 365, 2 / 365, 7 / 365, 30 / 365, 90 / 365, 1.0]
+VOLS = [0.08, 0.15, 0.3, 0.6]
+
+def make_grid():
+    K, T, sigma, is_call = np.meshgrid(SPOT * np.array(MONEYNESS), EXPIRIES, VOLS, [True, False], indexing='ij')
+    K, T, sigma, is_call = (a.ravel() for a in (K, T, sigma, is_call))
+    price = GreeksEngine.black_scholes(SPOT, K, T, RATE, sigma, is_call)
+    intrinsic = np.where(is_call, np.maximum(SPOT - K * np.exp(-RATE * T), 0), np.maximum(K * np.exp(-RATE * T) - SPOT, 0))
+    # Premiums whose time value is lost in float rounding carry no volatility information
+    identifiable = price - intrinsic > 1e-9 * price
+    return price, K, T, sigma, is_call, identifiable
+
+def baseline(price, K, T, is_call):
+    return np.array([MathEngine.calculate_iv(p, SPOT, k, t, RATE, 'CE' if c else 'PE')
+                     for p, k, t, c in zip(price, K, T, is_call)])
+
+def test_matches_scalar_newton_across_grid():
+    price, K, T, sigma, is_call, identifiable = make_grid()
+
+    start = time.perf_counter()
+    iv = GreeksEngine.implied_volatility(price, SPOT, K, T, RATE, is_call)
+    vectorized_time = time.perf_counter() - start
+    start = time.perf_counter()
+    scalar = baseline(price, K, T, is_call)
+    scalar_time = time.perf_counter() - start
+    print(f"\n{price.size} options: scalar {scalar_time * 1e3:.1f} ms, vectorized {vectorized_time * 1e3:.2f} ms "
+          f"({scalar_time / vectorized_time:.0f}x)")
+
+    # Every identifiable premium is recovered, including deep ITM/OTM and minutes to expiry
+    assert np.all(np.abs(iv[identifiable] - sigma[identifiable]) < 1e-4)
+    # Wherever the scalar Newton solver converges, both agree
+    converged = identifiable & (scalar > 0)
+    assert converged.sum() > identifiable.sum() / 2
+    assert np.all(np.abs(iv[converged] - scalar[converged]) < 1e-4)
+    assert scalar_time > 5 * vectorized_time
+
+def test_unsolvable_inputs_return_zero():
+    price = np.array([0.0, -1.0, 10.0, 10.0, 100.0, 3000.0, 1e6])
+    K = np.array([22000.0, 22000.0, 22000.0, 22000.0, 22000.0, 19000.0, 22000.0])
+    T = np.array([0.1, 0.1, 0.0, -0.1, 0.1, 0.1, 0.1])
+    # Rows 5 and 6: premium below intrinsic value, premium above the spot
+    iv = GreeksEngine.implied_volatility(price, SPOT, K, T, RATE, True)
+    assert np.array_equal(iv, np.zeros(price.size))
+    greeks = GreeksEngine.greeks(SPOT, K, T, RATE, iv, True)
+    assert all(np.array_equal(values, np.zeros(price.size)) for values in greeks.values())
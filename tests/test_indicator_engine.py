@@ -0,0 +1,76 @@
+import dataclasses
+import numpy as np
+import pytest
+from python_engine.core.bar_history import BarHistoryStore
+from python_engine.models.data_models import VolumeBar
+from python_engine.utils import mvel_functions as F
+from python_engine.utils.indicator_engine import INDICATORS, IndicatorEngine, SessionVwap, _Rolling
+
+SESSION_START = 1736121600  # 2025-01-06 00:00 UTC
+
+def make_bars(n, seed=1):
+    rng = np.random.default_rng(seed)
+    close = 40 + np.cumsum(rng.normal(0, 0.3, n))
+    volume = rng.integers(100, 1000, n)
+    return [VolumeBar(symbol='TEST', timestamp=SESSION_START + 60 * i, open=close[i], high=close[i] + 0.2,
+                      low=close[i] - 0.2, close=close[i], volume=int(volume[i])) for i in range(n)]
+
+def indicators(history):
+    return (F.vwap(history), F.ema(history, 50, 'close'), F.rsi(history, 14),
+            F.highest(history, 20, 'high'), F.stdev(history, 20, 'close'), F.moving_avg(history, 20, 'close'))
+
+def run(bars, call_at):
+    INDICATORS.reset()
+    store = BarHistoryStore(200, on_append=INDICATORS.on_bar)
+    values = None
+    for i, bar in enumerate(bars):
+        store.append(bar)
+        if i in call_at:
+            values = indicators(store.view('TEST'))
+    return values
+
+def test_values_do_not_depend_on_call_pattern():
+    bars = make_bars(1000)
+    every_bar = run(bars, set(range(len(bars))))
+    sparse = run(bars, {0, 300, 600, 999})
+    assert np.allclose(every_bar, sparse)
+
+    # Recursive states carry the whole session, beyond the 200-bar window
+    reference = SessionVwap()
+    for bar in bars:
+        reference.push(bar)
+    assert sparse[0] == pytest.approx(reference.value())
+
+def test_in_place_bar_update_replaces_last_bar():
+    bars = make_bars(100)
+    INDICATORS.reset()
+    store = BarHistoryStore(200, on_append=INDICATORS.on_bar)
+    for bar in bars:
+        store.append(bar)
+    before = indicators(store.view('TEST'))
+
+    updated = dataclasses.replace(bars[-1], close=bars[-1].close + 5, high=bars[-1].high + 5, volume=5000)
+    store.append(updated)
+    after = indicators(store.view('TEST'))
+
+    INDICATORS.reset()
+    expected = indicators(bars[:-1] + [updated])
+    assert np.allclose(after, expected)
+    assert not np.allclose(before, after)
+
+def test_missing_override_fails_at_construction():
+    class Incomplete(_Rolling):
+        def push(self, bar):
+            pass
+
+    with pytest.raises(TypeError):
+        Incomplete()
+
+def test_gap_longer_than_history_rebuilds_state():
+    bars = make_bars(600)
+    engine = IndicatorEngine()
+    engine.get(bars[:10], ('vwap',), SessionVwap)
+    # Bars 10..399 were never seen and are not in the window: the state is rebuilt from it
+    window = bars[400:600]
+    pv = sum((b.high + b.low + b.close) / 3.0 * b.volume for b in window)
+    assert engine.get(window, ('vwap',), SessionVwap) == pytest.approx(pv / sum(b.volume for b in window))
@@ -0,0 +1,77 @@
+import numpy as np
+from python_engine.core.market_structure_handler import MarketStructureHandler
+from python_engine.models.data_models import MarketEvent, MessageType, Sentiment, VolumeBar
+
+SESSION_START = 1736134200  # 2025-01-06 09:15 IST
+
+def make_bars(n, seed=1):
+    rng = np.random.default_rng(seed)
+    close = 22000 + np.cumsum(rng.normal(0, 8, n))
+    # Rounded prices so equal highs/lows (ties) occur
+    high = np.round(close + rng.uniform(0, 6, n))
+    low = np.round(close - rng.uniform(0, 6, n))
+    return [VolumeBar(symbol='TEST', timestamp=SESSION_START + 60 * i, open=close[i], high=high[i], low=low[i],
+                      close=close[i], volume=1000) for i in range(n)]
+
+def stream(handler, bars):
+    structures = []
+    for bar in bars:
+        sentiment = Sentiment(pcr=1.0, advances=25, declines=25,
+                              oi_wall_above=round(bar.close + 40, -1), oi_wall_below=round(bar.close - 40, -1))
+        event = MarketEvent(type=MessageType.MARKET_UPDATE, timestamp=bar.timestamp, candle=bar, sentiment=sentiment)
+        handler.on_event(event)
+        structures.append(event.market_structure)
+    return structures
+
+def reference_pivots(bars, window):
+    """Pivot rule of the original array-append handler: checks start once the window slides."""
+    highs, lows = [], []
+    span = 2 * window + 1
+    for end in range(span, len(bars)):
+        frame = bars[end - span + 1:end + 1]
+        mid = frame[window]
+        if all(mid.high >= b.high for b in frame) and (not highs or highs[-1][1] != mid.timestamp):
+            highs.append((mid.high, mid.timestamp))
+        if all(mid.low <= b.low for b in frame) and (not lows or lows[-1][1] != mid.timestamp):
+            lows.append((mid.low, mid.timestamp))
+    return highs[-10:], lows[-10:]
+
+def pivots(handler, window=None):
+    highs, lows = handler.window_pivots[window or handler.window]
+    return [(p['price'], p['timestamp']) for p in highs], [(p['price'], p['timestamp']) for p in lows]
+
+def test_streaming_matches_reference_rule():
+    bars = make_bars(600)
+    for window in (2, 5):
+        handler = MarketStructureHandler(window=window)
+        for n in (2 * window + 1, 2 * window + 2, 600):
+            handler.reset()
+            stream(handler, bars[:n])
+            assert pivots(handler) == reference_pivots(bars[:n], window)
+
+def test_every_window_follows_reference_rule():
+    bars = make_bars(600, seed=3)
+    handler = MarketStructureHandler(window=5, windows=(3, 10))
+    structures = stream(handler, bars)
+    assert handler.windows == (3, 5, 10)
+    for window in handler.windows:
+        assert pivots(handler, window) == reference_pivots(bars, window)
+
+    # Extra windows do not change the primary window's hurdles and regime
+    single = stream(MarketStructureHandler(window=5), bars)
+    assert [{k: v for k, v in s.items() if k != 'regimes'} for s in structures] == \
+           [{k: v for k, v in s.items() if k != 'regimes'} for s in single]
+    assert structures[-1]['regimes'] == {w: handler.get_structure_sentiment(w) for w in (3, 5, 10)}
+
+def test_warm_up_continues_like_streaming():
+    bars = make_bars(800, seed=2)
+    for split in (5, 11, 12, 22, 400):
+        streamed = MarketStructureHandler(windows=(3, 10))
+        expected = stream(streamed, bars)
+
+        warmed = MarketStructureHandler(windows=(3, 10))
+        warmed.warm_up(np.array([b.high for b in bars[:split]]), np.array([b.low for b in bars[:split]]),
+                       np.array([b.timestamp for b in bars[:split]]))
+        assert stream(warmed, bars[split:]) == expected[split:]
+        for window in warmed.windows:
+            assert pivots(warmed, window) == pivots(streamed, window)
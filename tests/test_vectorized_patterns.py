@@ -0,0 +1,88 @@
+import json
+import os
+import shutil
+import numpy as np
+import pytest
+from python_engine.core.pattern_matcher_handler import PatternMatcherHandler
+from python_engine.models.data_models import MarketEvent, MessageType, Sentiment, VolumeBar
+from python_engine.utils.indicator_engine import INDICATORS
+
+STRATEGIES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'strategies')
+SESSION_START = 1736134200  # 2025-01-06 09:15 IST
+REGIMES = ['COMPLETE_BULLISH', 'BULLISH', 'SIDEWAYS', 'BEARISH', 'COMPLETE_BEARISH']
+
+# Conditions mixing indicator calls (recursive and windowed state) with plain comparisons
+INDICATOR_STRATEGY = {
+    "pattern_id": "TEST_INDICATOR_PULLBACK",
+    "regime_config": {"SIDEWAYS": {"allow_entry": False}},
+    "phases": [
+        {"id": "setup", "timeout": 5,
+         "conditions": ["close > open", "close > ema(history, 20, 'close')", "sentiment.net_vol_rsi > 45"],
+         "capture": {"setup_high": "high"}},
+        {"id": "trigger", "timeout": 4,
+         "conditions": ["rsi(history, 14) > 50", "close > vars.setup_high", "close > vwap(history)"],
+         "capture": {"entry_price": "close"}},
+    ],
+    "execution": {"side": "BUY", "entry": "ATM_CALL", "sl": "0.5 * candle.atr", "tp": "1.5 * candle.atr",
+                  "option_selection": "ATM"},
+}
+
+def make_session(n, seed):
+    rng = np.random.default_rng(seed)
+    close = 22000 + np.cumsum(rng.normal(0, 8, n))
+    bars, sentiments = [], []
+    for i in range(n):
+        o = close[i] + rng.normal(0, 4)
+        bars.append(VolumeBar(symbol='NSE_INDEX|Nifty 50', timestamp=SESSION_START + 60 * i, open=o,
+                              high=max(o, close[i]) + 3, low=min(o, close[i]) - 3, close=close[i],
+                              volume=int(rng.integers(1000, 5000))))
+        if rng.random() < 0.05:
+            sentiments.append(None)
+            continue
+        sentiments.append(Sentiment(
+            pcr=1.0, advances=25, declines=25,
+            oi_wall_above=close[i] + rng.normal(-10, 15), oi_wall_below=close[i] + rng.normal(10, 15),
+            regime=REGIMES[int(rng.integers(len(REGIMES)))],
+            volume_pcr=float(rng.uniform(0.5, 1.5)), net_vol_rsi=float(rng.uniform(20, 80)),
+        ))
+    return bars, sentiments
+
+def per_bar_triggers(strategies_dir, bars, sentiments):
+    INDICATORS.reset()
+    handler = PatternMatcherHandler(strategies_dir)
+    triggers = []
+    for i, (bar, sentiment) in enumerate(zip(bars, sentiments)):
+        event = MarketEvent(type=MessageType.CANDLE_UPDATE, timestamp=bar.timestamp, candle=bar, sentiment=sentiment)
+        handler.on_event(event)
+        machine = event.triggered_machine
+        if machine:
+            triggers.append((i, machine.definition.pattern_id, dict(machine.state.captured_variables)))
+            # ExecutionHandler resets the machine after executing
+            machine.state.reset(machine.definition.phases[0].id)
+    return triggers
+
+def planned_triggers(strategies_dir, bars, sentiments):
+    INDICATORS.reset()
+    handler = PatternMatcherHandler(strategies_dir)
+    handler.plan_backtest(bars, sentiments)
+    index = {bar.timestamp: i for i, bar in enumerate(bars)}
+    return sorted((index[ts], trigger.definition.pattern_id, dict(trigger.state.captured_variables))
+                  for (_, ts), trigger in handler._planned_triggers.items())
+
+@pytest.mark.parametrize('seed', [1, 2, 3])
+def test_plan_matches_per_bar_on_shipped_strategies(seed):
+    bars, sentiments = make_session(1500, seed)
+    expected = per_bar_triggers(STRATEGIES_DIR, bars, sentiments)
+    assert expected, "session should exercise the strategies"
+    assert planned_triggers(STRATEGIES_DIR, bars, sentiments) == expected
+
+@pytest.mark.parametrize('seed', [1, 2])
+def test_plan_matches_per_bar_with_indicator_conditions(tmp_path, seed):
+    for name in os.listdir(STRATEGIES_DIR):
+        if name.endswith('.json'):
+            shutil.copy(os.path.join(STRATEGIES_DIR, name), tmp_path)
+    (tmp_path / 'test_indicator_pullback.json').write_text(json.dumps(INDICATOR_STRATEGY))
+    bars, sentiments = make_session(1500, seed)
+    expected = per_bar_triggers(str(tmp_path), bars, sentiments)
+    assert any(pattern_id == INDICATOR_STRATEGY['pattern_id'] for _, pattern_id, _ in expected)
+    assert planned_triggers(str(tmp_path), bars, sentiments) == expected
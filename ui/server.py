@@ -1,8 +1,9 @@
 import os
+import time
 import pandas as pd
-from datetime import datetime
+from datetime import datetime, timedelta
 from fastapi import FastAPI, Request, Query
-from fastapi.responses import HTMLResponse, JSONResponse
+from fastapi.responses import HTMLResponse, JSONResponse, PlainTextResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 from python_engine.utils.symbol_master import MASTER as SymbolMaster
@@ -12,6 +13,8 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from data_sourcing.data_manager import DataManager
 from data_sourcing.database_manager import DatabaseManager
+from python_engine.engine_config import Config
+from python_engine.utils.metrics_registry import REGISTRY as Metrics, MetricsRegistry, hit_ratio
 
 app = FastAPI()
 app.mount("/static", StaticFiles(directory="ui/static"), name="static")
@@ -21,6 +24,22 @@ templates = Jinja2Templates(directory="ui/templates")
 SymbolMaster.initialize()
 dm = DataManager()
 DB_PATH = 'sos_master_data.db'
+# Pooled WAL connection: UI reads run concurrently with engine/ingestion writes
+db_manager = DatabaseManager(DB_PATH)
+
+# Telemetry: the engine publishes its snapshot to METRICS_FILE; this process adds its own reads and API calls
+if os.path.exists('config.json'):
+    Config.load('config.json')
+METRICS_FILE = Config.get('metrics_file', 'engine_metrics.json')
+ENGINE_STALE_AFTER = 3 * Config.get('metrics_publish_interval', 5)
+Metrics.register('db_reads', DatabaseManager.get_read_stats, label='query')
+Metrics.register('db_writes', DatabaseManager.get_write_stats, label='table')
+Metrics.register('candle_grid', lambda: hit_ratio(dm.candle_grid.get_stats()))
+Metrics.register('sentiment_cache', lambda: hit_ratio(dm.sentiment_service.get_stats()))
+
+@app.on_event("shutdown")
+def close_db_connections():
+    DatabaseManager.close_all()
 
 @app.get("/", response_class=HTMLResponse)
 async def get_dashboard(request: Request):
@@ -71,24 +90,15 @@ async def get_candles(
 async def get_atm_options(symbol: str, date: str):
     try:
         canonical = SymbolMaster.get_upstox_key(symbol)
-        db_manager = DatabaseManager(DB_PATH)
 
-        query = f"SELECT close FROM historical_candles WHERE symbol = '{canonical}' AND DATE(timestamp) = '{date}' ORDER BY timestamp DESC LIMIT 1"
-        with db_manager as db:
-            df = pd.read_sql(query, db.conn)
-
-        if df.empty:
+        # Archive-aware read: closed days pruned from SQLite are served from Parquet
+        df = dm.get_historical_candles(canonical, from_date=date, to_date=date, mode='backtest', n_bars=1000)
+        if (df is None or df.empty) and date == datetime.now().strftime('%Y-%m-%d'):
             # Try to fetch one candle if today
-            if date == datetime.now().strftime('%Y-%m-%d'):
-                temp_df = dm.get_historical_candles(canonical, from_date=date, to_date=date, mode='live', n_bars=1)
-                if temp_df is not None and not temp_df.empty:
-                    spot = temp_df.iloc[-1]['close']
-                else:
-                    return JSONResponse(content={"error": "No spot price found"}, status_code=404)
-            else:
-                return JSONResponse(content={"error": "No spot price found"}, status_code=404)
-        else:
-            spot = df.iloc[0]['close']
+            df = dm.get_historical_candles(canonical, from_date=date, to_date=date, mode='live', n_bars=1)
+        if df is None or df.empty:
+            return JSONResponse(content={"error": "No spot price found"}, status_code=404)
+        spot = df.iloc[-1]['close']
 
         dm.load_and_cache_fno_instruments(target_date=date)
         ce_key, ce_name = dm.get_atm_option_details(symbol, 'BUY', spot, target_date=date)
@@ -104,14 +114,17 @@ async def get_atm_options(symbol: str, date: str):
 
 @app.get("/api/trades")
 async def get_trades(symbol: str = None, date: str = None):
-    db_manager = DatabaseManager(DB_PATH)
     query = "SELECT * FROM trades"
-    conditions = []
+    conditions, params = [], []
     if symbol:
         canonical = SymbolMaster.get_upstox_key(symbol) or symbol
-        conditions.append(f"(symbol = '{canonical}' OR instrument_key = '{canonical}')")
+        conditions.append("(symbol = ? OR instrument_key = ?)")
+        params += [canonical, canonical]
     if date:
-        conditions.append(f"DATE(entry_time) = '{date}'")
+        # Half-open range keeps idx_trades_entry_time usable (DATE(entry_time) would not)
+        next_day = (datetime.strptime(date, '%Y-%m-%d') + timedelta(days=1)).strftime('%Y-%m-%d')
+        conditions.append("entry_time >= ? AND entry_time < ?")
+        params += [date, next_day]
 
     if conditions:
         query += " WHERE " + " AND ".join(conditions)
@@ -119,7 +132,7 @@ async def get_trades(symbol: str = None, date: str = None):
     query += " ORDER BY entry_time DESC"
 
     with db_manager as db:
-        df = pd.read_sql(query, db.conn)
+        df = pd.read_sql(query, db.conn, params=params)
 
     # Convert timestamps for JSON and handle NaN
     trades = []
@@ -143,6 +156,31 @@ async def get_trades(symbol: str = None, date: str = None):
 
     return JSONResponse(content={"trades": trades})
 
+def _collect_metrics():
+    """Engine snapshot (from the published file), this process's snapshot, and engine liveness."""
+    engine = MetricsRegistry.read_snapshot(METRICS_FILE)
+    age = time.time() - engine['timestamp'] if engine else None
+    status = {
+        'up': int(age is not None and age <= ENGINE_STALE_AFTER),
+        'snapshot_age_seconds': round(age, 3) if age is not None else -1,
+    }
+    return engine, Metrics.snapshot(), status
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """Prometheus text format: sos_engine_* from the engine process, sos_ui_* from this one."""
+    engine, ui, status = _collect_metrics()
+    text = MetricsRegistry.to_prometheus({'sections': {'status': {'label': None, 'values': status}}}, prefix='sos_engine')
+    if engine:
+        text += MetricsRegistry.to_prometheus(engine, prefix='sos_engine')
+    text += MetricsRegistry.to_prometheus(ui, prefix='sos_ui')
+    return PlainTextResponse(text, media_type="text/plain; version=0.0.4")
+
+@app.get("/api/metrics")
+async def get_metrics_json():
+    engine, ui, status = _collect_metrics()
+    return JSONResponse(content={"engine": engine, "engine_status": status, "ui": ui})
+
 if __name__ == "__main__":
     import uvicorn
     # Port 3000 is required for live preview in this environment